@@ -2,18 +2,25 @@
 # -*- coding: utf-8 -*-
 import csv
 import copy
+import time
 import argparse
 import itertools
-from collections import Counter
 from collections import deque
 
 import cv2 as cv
 import numpy as np
 import mediapipe as mp
 
-from utils import CvFpsCalc
-from model import KeyPointClassifier
+from utils import PerfStats
+from utils import LandmarkRecorder
+from utils import TraceRecorder
+from utils import LandmarkSmoother, SMOOTHING_METHODS
+from utils import RuntimeConfig
+from utils import CameraCapture, CAPTURE_BACKENDS
+from utils import RollingStats
+from model import CascadeKeyPointClassifier, KeyPointClassifier
 from model import PointHistoryClassifier
+from model import StreamingPointHistoryRecognizer
 
 
 def get_args():
@@ -22,16 +29,66 @@ def get_args():
     parser.add_argument("--device", type=int, default=0)
     parser.add_argument("--width", help='cap width', type=int, default=960)
     parser.add_argument("--height", help='cap height', type=int, default=540)
+    parser.add_argument("--capture_backend",
+                        help='camera capture backend',
+                        choices=sorted(CAPTURE_BACKENDS),
+                        default='auto')
+    parser.add_argument("--fourcc",
+                        help='camera pixel format (empty string keeps the driver default)',
+                        type=str,
+                        default='MJPG')
+    parser.add_argument("--buffer_size",
+                        help='driver-side frame buffers (CAP_PROP_BUFFERSIZE)',
+                        type=int,
+                        default=1)
+    parser.add_argument("--fps", help='target camera fps', type=float, default=None)
+    parser.add_argument("--no_capture_thread",
+                        help='read frames on the main loop instead of keeping only the newest one',
+                        action='store_true')
 
     parser.add_argument('--use_static_image_mode', action='store_true')
-    parser.add_argument("--min_detection_confidence",
-                        help='min_detection_confidence',
+    # TFLite / MediaPipe / OpenCV 的线程与加速选项（含 --min_detection_confidence 等），
+    # 未指定时依次取环境变量 GESTURE_<名称大写> 和默认值
+    RuntimeConfig.add_arguments(parser)
+
+    parser.add_argument("--record",
+                        help='record raw landmarks to a binary log (.hglm) for replay',
+                        type=str,
+                        default=None)
+    parser.add_argument("--smoothing",
+                        help='landmark smoothing filter',
+                        choices=SMOOTHING_METHODS,
+                        default='one_euro')
+    parser.add_argument("--min_cutoff",
+                        help='One Euro filter min cutoff frequency (Hz)',
+                        type=float,
+                        default=1.0)
+    parser.add_argument("--beta",
+                        help='One Euro filter speed coefficient',
+                        type=float,
+                        default=5.0)
+    parser.add_argument("--cascade_model",
+                        help='larger static model with the same labels, used only when the '
+                             'default model is uncertain or changes its prediction',
+                        type=str,
+                        default=None)
+    parser.add_argument("--cascade_threshold",
+                        help='escalate to the cascade model below this top score',
                         type=float,
-                        default=0.7)
-    parser.add_argument("--min_tracking_confidence",
-                        help='min_tracking_confidence',
+                        default=0.8)
+    parser.add_argument("--dynamic_window",
+                        help='finger gesture sliding window length (frames)',
                         type=int,
-                        default=0.5)
+                        default=16)
+    parser.add_argument("--dynamic_stride",
+                        help='run the finger gesture model every N frames',
+                        type=int,
+                        default=1)
+    parser.add_argument("--trace",
+                        help='record a per-stage timeline and write it as Chrome trace JSON '
+                             '(on exit, or when pressing t)',
+                        type=str,
+                        default=None)
 
     args = parser.parse_args()
 
@@ -47,28 +104,52 @@ def main():
     cap_height = args.height
 
     use_static_image_mode = args.use_static_image_mode
-    min_detection_confidence = args.min_detection_confidence
-    min_tracking_confidence = args.min_tracking_confidence
+
+    # 実行時設定（スレッド数・XNNPACK・MediaPipe設定） ####################
+    runtime = RuntimeConfig().update_from_env().update_from_args(args).apply()
+    print(f"runtime: {runtime.describe()}")
 
     use_brect = True
 
+    # ランドマーク録画 #########################################################
+    recorder = LandmarkRecorder(args.record) if args.record else None
+
+    # ランドマーク平滑化 #######################################################
+    smoother = LandmarkSmoother(args.smoothing, min_cutoff=args.min_cutoff,
+                                beta=args.beta)
+
+    # タイムライン記録 #########################################################
+    tracer = TraceRecorder() if args.trace else None
+
     # カメラ準備 ###############################################################
-    cap = cv.VideoCapture(cap_device)
-    cap.set(cv.CAP_PROP_FRAME_WIDTH, cap_width)
-    cap.set(cv.CAP_PROP_FRAME_HEIGHT, cap_height)
+    cap = CameraCapture(cap_device, cap_width, cap_height,
+                        backend=args.capture_backend,
+                        fourcc=args.fourcc,
+                        buffer_size=args.buffer_size,
+                        fps=args.fps,
+                        threaded=not args.no_capture_thread,
+                        tracer=tracer)
+    print(f"camera: {cap.describe()}")
 
     # モデルロード #############################################################
     mp_hands = mp.solutions.hands
     hands = mp_hands.Hands(
         static_image_mode=use_static_image_mode,
         max_num_hands=1,
-        min_detection_confidence=min_detection_confidence,
-        min_tracking_confidence=min_tracking_confidence,
+        **runtime.hands_options()
     )
 
-    keypoint_classifier = KeyPointClassifier()
+    classifier_options = runtime.classifier_options()
+    keypoint_classifier = KeyPointClassifier(**classifier_options)
+    if args.cascade_model:
+        keypoint_classifier = CascadeKeyPointClassifier(
+            keypoint_classifier, KeyPointClassifier(args.cascade_model, **classifier_options),
+            threshold=args.cascade_threshold)
 
-    point_history_classifier = PointHistoryClassifier()
+    point_history_classifier = PointHistoryClassifier(**classifier_options)
+    # 確信度で重み付けした集計（フレームごとのIDの多数決の代わり）
+    finger_gesture_recognizer = StreamingPointHistoryRecognizer(
+        point_history_classifier, window=args.dynamic_window, stride=args.dynamic_stride)
 
     # ラベル読み込み ###########################################################
     with open('model/keypoint_classifier/static_gesture_model/avazahedi/keypoint_classifier_label.csv',
@@ -85,100 +166,141 @@ def main():
             row[0] for row in point_history_classifier_labels
         ]
 
-    # FPS計測モジュール ########################################################
-    cvFpsCalc = CvFpsCalc(buffer_len=10)
+    # FPS・処理時間計測モジュール ##############################################
+    perf = PerfStats(window=120, tracer=tracer)
+    # キャプチャから認識結果までの遅延
+    latency = RollingStats(window=120)
 
-    # 座標履歴 #################################################################
+    # 座標履歴（描画・学習データ保存用） #######################################
     history_length = 16
     point_history = deque(maxlen=history_length)
 
-    # フィンガージェスチャー履歴 ################################################
-    finger_gesture_history = deque(maxlen=history_length)
+    # フレームバッファ（初回フレームで確保し、以降は毎フレーム再利用） ##########
+    debug_buffer = None  # ミラー済みBGR（描画・表示用）
+    rgb_buffer = None  # ミラー済みRGB（検出用）
 
     #  ########################################################################
     mode = 0
 
     while True:
-        fps = cvFpsCalc.get()
+        fps = perf.tick()
 
         # キー処理(ESC：終了) #################################################
-        key = cv.waitKey(10)
+        with perf.stage('ui'):
+            key = cv.waitKey(10)
         if key == 27:  # ESC
             break
+        if key == 116 and tracer is not None:  # t
+            dump_trace(tracer, args.trace)
         number, mode = select_mode(key, mode)
 
         # カメラキャプチャ #####################################################
-        ret, image = cap.read()
-        if not ret:
-            break
-        image = cv.flip(image, 1)  # ミラー表示
-        debug_image = copy.deepcopy(image)
+        with perf.stage('capture'):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            timestamp = time.time()
+            if debug_buffer is None or debug_buffer.shape != frame.shape:
+                debug_buffer = np.empty_like(frame)
+                rgb_buffer = np.empty_like(frame)
+            # ミラー表示（確保済みバッファへ直接書き込み、描画もこのバッファ上で行う）
+            debug_image = cv.flip(frame, 1, dst=debug_buffer)
 
         # 検出実施 #############################################################
-        image = cv.cvtColor(image, cv.COLOR_BGR2RGB)
+        with perf.stage('detect'):
+            image = cv.cvtColor(debug_image, cv.COLOR_BGR2RGB, dst=rgb_buffer)
+
+            image.flags.writeable = False
+            results = hands.process(image)
+            image.flags.writeable = True
 
-        image.flags.writeable = False
-        results = hands.process(image)
-        image.flags.writeable = True
+        if recorder is not None:
+            record_landmarks(recorder, image, results)
 
         #  ####################################################################
         if results.multi_hand_landmarks is not None:
             for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
                                                   results.multi_handedness):
-                # 外接矩形の計算
-                brect = calc_bounding_rect(debug_image, hand_landmarks)
-                # ランドマークの計算
-                landmark_list = calc_landmark_list(debug_image, hand_landmarks)
-
-                # 相対座標・正規化座標への変換
-                pre_processed_landmark_list = pre_process_landmark(
-                    landmark_list)
-                pre_processed_point_history_list = pre_process_point_history(
-                    debug_image, point_history)
-                # 学習データ保存
-                logging_csv(number, mode, pre_processed_landmark_list,
-                            pre_processed_point_history_list)
-
-                # ハンドサイン分類
-                hand_sign_id = keypoint_classifier(pre_processed_landmark_list)
-                if hand_sign_id == 2:  # 指差しサイン
-                    point_history.append(landmark_list[8])  # 人差指座標
-                else:
-                    point_history.append([0, 0])
-
-                # フィンガージェスチャー分類
-                finger_gesture_id = 0
-                point_history_len = len(pre_processed_point_history_list)
-                if point_history_len == (history_length * 2):
-                    finger_gesture_id = point_history_classifier(
-                        pre_processed_point_history_list)
-
-                # 直近検出の中で最多のジェスチャーIDを算出
-                finger_gesture_history.append(finger_gesture_id)
-                most_common_fg_id = Counter(
-                    finger_gesture_history).most_common()
+                with perf.stage('classify'):
+                    # 外接矩形の計算
+                    brect = calc_bounding_rect(debug_image, hand_landmarks)
+                    # ランドマークの計算
+                    landmark_list = calc_landmark_list(debug_image, hand_landmarks,
+                                                       smoother, timestamp)
+
+                    # 相対座標・正規化座標への変換
+                    pre_processed_landmark_list = pre_process_landmark(
+                        landmark_list)
+                    # 軌跡の正規化は学習データ保存（動的ジェスチャー）時のみ行う
+                    pre_processed_point_history_list = None
+                    if mode == 2:
+                        pre_processed_point_history_list = pre_process_point_history(
+                            debug_image, point_history)
+                    # 学習データ保存
+                    logging_csv(number, mode, pre_processed_landmark_list,
+                                pre_processed_point_history_list)
+
+                    # ハンドサイン分類
+                    hand_sign_id = keypoint_classifier(pre_processed_landmark_list)
+                    if hand_sign_id == 2:  # 指差しサイン
+                        trajectory_point = landmark_list[8]  # 人差指座標
+                    else:
+                        trajectory_point = [0, 0]
+                    point_history.append(trajectory_point)
+
+                    # フィンガージェスチャー分類（stride フレームごとに推論し、確信度で集計）
+                    finger_gesture_id, _ = finger_gesture_recognizer.update(
+                        trajectory_point, debug_image.shape[1], debug_image.shape[0])
 
                 # 描画
-                debug_image = draw_bounding_rect(use_brect, debug_image, brect)
-                debug_image = draw_landmarks(debug_image, landmark_list)
-                debug_image = draw_info_text(
-                    debug_image,
-                    brect,
-                    handedness,
-                    keypoint_classifier_labels[hand_sign_id],
-                    point_history_classifier_labels[most_common_fg_id[0][0]],
-                )
+                with perf.stage('draw'):
+                    debug_image = draw_bounding_rect(use_brect, debug_image, brect)
+                    debug_image = draw_landmarks(debug_image, landmark_list)
+                    debug_image = draw_info_text(
+                        debug_image,
+                        brect,
+                        handedness,
+                        keypoint_classifier_labels[hand_sign_id],
+                        point_history_classifier_labels[finger_gesture_id],
+                    )
         else:
             point_history.append([0, 0])
+            # 手が検出されないフレームはウィンドウを進めるだけで推論しない
+            finger_gesture_recognizer.push(
+                [0, 0], debug_image.shape[1], debug_image.shape[0], infer=False)
 
-        debug_image = draw_point_history(debug_image, point_history)
-        debug_image = draw_info(debug_image, fps, mode, number)
+        latency.add((time.perf_counter_ns() - cap.capture_ns) / 1e6)
+
+        with perf.stage('draw'):
+            debug_image = draw_point_history(debug_image, point_history)
+            debug_image = draw_info(debug_image, fps, mode, number, perf, latency)
 
         # 画面反映 #############################################################
-        cv.imshow('Hand Gesture Recognition', debug_image)
+        with perf.stage('ui'):
+            cv.imshow('Hand Gesture Recognition', debug_image)
 
+    capture_stats = cap.get_stats()
     cap.release()
     cv.destroyAllWindows()
+    print(f"capture: {capture_stats['grabbed']} frames grabbed at {capture_stats['grab_fps']:.1f} fps, "
+          f"{capture_stats['dropped']} dropped as stale")
+    if latency.count:
+        print(f"capture-to-result latency: mean {latency.mean:.1f} ms, p95 {latency.percentile(95):.1f} ms")
+    if recorder is not None:
+        recorder.close()
+        print(f"recorded {recorder.frame_count} frames to {recorder.path}")
+    if tracer is not None:
+        dump_trace(tracer, args.trace)
+    if args.cascade_model:
+        stats = keypoint_classifier.get_stats()
+        print(f"cascade: {stats['frames']} frames, fast hit rate {stats['fast_hit_rate']:.1%}, "
+              f"{stats['ms_per_frame']:.3f} ms/frame")
+
+
+def dump_trace(tracer, path):
+    event_count = tracer.dump(path)
+    print(f"wrote {event_count} trace events to {path} "
+          f"(open in chrome://tracing or https://ui.perfetto.dev)")
 
 
 def select_mode(key, mode):
@@ -194,6 +316,18 @@ def select_mode(key, mode):
     return number, mode
 
 
+def record_landmarks(recorder, image, results):
+    image_height, image_width = image.shape[0], image.shape[1]
+    landmarks = None
+    handedness = None
+    if results.multi_hand_landmarks is not None:
+        landmarks = [[lm.x, lm.y, lm.z]
+                     for lm in results.multi_hand_landmarks[0].landmark]
+        handedness = results.multi_handedness[0].classification[0].label
+    recorder.write_frame(time.time(), image_width, image_height, landmarks,
+                         handedness)
+
+
 def calc_bounding_rect(image, landmarks):
     image_width, image_height = image.shape[1], image.shape[0]
 
@@ -212,20 +346,17 @@ def calc_bounding_rect(image, landmarks):
     return [x, y, x + w, y + h]
 
 
-def calc_landmark_list(image, landmarks):
+def calc_landmark_list(image, landmarks, smoother=None, timestamp=None):
     image_width, image_height = image.shape[1], image.shape[0]
 
-    landmark_point = []
-
-    # キーポイント
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-        # landmark_z = landmark.z
-
-        landmark_point.append([landmark_x, landmark_y])
+    # キーポイント(正規化座標のまま平滑化してから画素座標に変換)
+    points = np.array([[landmark.x, landmark.y] for landmark in landmarks.landmark])
+    if smoother is not None:
+        points = smoother(points, timestamp)
+    landmark_x = np.minimum((points[:, 0] * image_width).astype(np.int32), image_width - 1)
+    landmark_y = np.minimum((points[:, 1] * image_height).astype(np.int32), image_height - 1)
 
-    return landmark_point
+    return np.stack([landmark_x, landmark_y], axis=1).tolist()
 
 
 def pre_process_landmark(landmark_list):
@@ -522,7 +653,7 @@ def draw_point_history(image, point_history):
     return image
 
 
-def draw_info(image, fps, mode, number):
+def draw_info(image, fps, mode, number, perf=None, latency=None):
     cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
                1.0, (0, 0, 0), 4, cv.LINE_AA)
     cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
@@ -537,6 +668,28 @@ def draw_info(image, fps, mode, number):
             cv.putText(image, "NUM:" + str(number), (10, 110),
                        cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
                        cv.LINE_AA)
+
+    # 直近フレームのp95処理時間と最も時間のかかる処理段階
+    if perf is not None and perf.frame.count:
+        stage, share = perf.dominant_stage()
+        perf_string = "p95:{:.1f}ms".format(perf.frame.percentile(95))
+        if stage is not None:
+            perf_string += " {}:{:.0%}".format(stage, share)
+        position = (10, image.shape[0] - 10)
+        cv.putText(image, perf_string, position, cv.FONT_HERSHEY_SIMPLEX,
+                   0.6, (0, 0, 0), 4, cv.LINE_AA)
+        cv.putText(image, perf_string, position, cv.FONT_HERSHEY_SIMPLEX,
+                   0.6, (255, 255, 255), 2, cv.LINE_AA)
+
+    # キャプチャから認識結果までの遅延（今回値とp95）
+    if latency is not None and latency.count:
+        latency_string = "latency:{:.1f}ms p95:{:.1f}ms".format(
+            latency.last, latency.percentile(95))
+        position = (10, image.shape[0] - 35)
+        cv.putText(image, latency_string, position, cv.FONT_HERSHEY_SIMPLEX,
+                   0.6, (0, 0, 0), 4, cv.LINE_AA)
+        cv.putText(image, latency_string, position, cv.FONT_HERSHEY_SIMPLEX,
+                   0.6, (255, 255, 255), 2, cv.LINE_AA)
     return image
 
 
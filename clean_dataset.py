@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+数据集质量检查与清洗工具
+采集模式每帧写入一行，keypoint.csv / point_history.csv 中会积累大量几乎相同的连续样本，
+以及没有指向手势时的全零轨迹。本工具一次读取整个CSV（分块向量化解析），检查：
+- 格式错误的行（列数不符、无法解析）
+- 退化样本：包含NaN/Inf、全零、所有值相同
+- 完全重复和近似重复：特征量化到网格后哈希，同标签同网格视为重复；同标签的连续样本与最近保留的样本差异小于网格也视为重复
+- 标签异常：距离自身类别中心明显比距离另一类别中心更远的样本（默认只报告，--drop_outliers 时删除）
+然后写出清洗后的数据集（保留原始行文本，只删除问题行）
+
+示例:
+    python clean_dataset.py model/keypoint_classifier/keypoint.csv
+    python clean_dataset.py model/point_history_classifier/point_history.csv --quantum 0.01 --dry_run
+    python clean_dataset.py keypoint.csv --output keypoint_clean.csv --drop_outliers
+"""
+
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+
+CHUNK_LINES = 200000
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='数据集质量检查与清洗')
+    parser.add_argument('dataset', help='CSV数据集，每行格式为 [标签, 特征1, ..., 特征N]')
+    parser.add_argument('--output', default=None, help='清洗后的数据集路径，默认 <文件名>_clean.csv')
+    parser.add_argument('--quantum', type=float, default=0.02,
+                        help='近似重复的量化网格大小，0表示只删除完全重复')
+    parser.add_argument('--outlier_ratio', type=float, default=1.5,
+                        help='标签异常判定：到自身类别中心的距离 / 到最近其他类别中心的距离 超过该值')
+    parser.add_argument('--drop_outliers', action='store_true', help='同时删除标签异常样本')
+    parser.add_argument('--dry_run', action='store_true', help='只输出报告，不写文件')
+    return parser.parse_args()
+
+
+def iter_lines(path):
+    """逐行读取非空行（清洗时按相同规则写回，行号保持一致）"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def read_dataset(path, chunk_lines=CHUNK_LINES):
+    """
+    分块读取CSV
+
+    返回:
+        tuple: (features (N, F) float32, labels (N,) int64, malformed (N,) bool)
+               格式错误的行特征为NaN、标签为-1
+    """
+    features, labels, malformed = [], [], []
+    num_columns = None
+    chunk = []
+
+    def parse(lines):
+        lines_array = np.array([line.strip() for line in lines])
+        bad = np.char.count(lines_array, ',') != num_columns - 1
+        values = np.full((len(lines), num_columns), np.nan, dtype=np.float64)
+        good_lines = lines_array[~bad]
+        if len(good_lines):
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error', DeprecationWarning)
+                    parsed = np.fromstring(','.join(good_lines), dtype=np.float64, sep=',')
+                if parsed.size != len(good_lines) * num_columns:
+                    raise ValueError('parse error')
+                values[~bad] = parsed.reshape(len(good_lines), num_columns)
+            except (ValueError, DeprecationWarning):
+                # 存在无法解析的值时逐行解析，只标记出错的行
+                for row, line in zip(np.flatnonzero(~bad), good_lines):
+                    try:
+                        values[row] = np.array(line.split(','), dtype=np.float64)
+                    except ValueError:
+                        bad[row] = True
+        label_column = values[:, 0]
+        bad |= ~np.isfinite(label_column) | (label_column < 0) | (label_column != np.round(label_column))
+        features.append(values[:, 1:].astype(np.float32))
+        labels.append(np.where(bad, -1, np.nan_to_num(label_column, nan=-1)).astype(np.int64))
+        malformed.append(bad)
+
+    for line in iter_lines(path):
+        if num_columns is None:
+            num_columns = line.count(',') + 1
+        chunk.append(line)
+        if len(chunk) >= chunk_lines:
+            parse(chunk)
+            chunk = []
+    if chunk:
+        parse(chunk)
+    if num_columns is None:
+        return np.empty((0, 0), np.float32), np.empty(0, np.int64), np.empty(0, bool)
+    return np.concatenate(features), np.concatenate(labels), np.concatenate(malformed)
+
+
+def find_degenerate(features, malformed):
+    """退化样本：NaN/Inf、全零、所有值相同"""
+    with np.errstate(invalid='ignore'):
+        non_finite = ~np.isfinite(features).all(axis=1) & ~malformed
+        all_zero = np.isfinite(features).all(axis=1) & (np.abs(features).max(axis=1) == 0)
+        constant = ~all_zero & ~non_finite & ~malformed & (np.ptp(features, axis=1) == 0)
+    return {'non_finite': non_finite, 'all_zero': all_zero, 'constant': constant}
+
+
+def find_duplicates(features, labels, valid, quantum):
+    """
+    重复样本（保留首次出现的样本）
+
+    返回:
+        tuple: (exact, near) 布尔掩码
+    """
+    rows = np.flatnonzero(valid)
+    exact = np.zeros(len(labels), dtype=bool)
+    near = np.zeros(len(labels), dtype=bool)
+    if len(rows) == 0:
+        return exact, near
+
+    def first_occurrence(keys):
+        """keys 为 (n, k) 数组，返回每行是否为首次出现"""
+        keys = np.ascontiguousarray(keys)
+        view = keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+        _, first_index = np.unique(view, return_index=True)
+        first = np.zeros(len(keys), dtype=bool)
+        first[first_index] = True
+        return first
+
+    selected = features[rows]
+    exact_keys = np.column_stack([labels[rows].astype(np.float32), selected])
+    exact[rows] = ~first_occurrence(exact_keys)
+
+    if quantum > 0:
+        # 量化到网格后哈希：同标签、同网格的样本视为近似重复
+        cells = np.clip(np.round(selected / quantum), -32768, 32767).astype(np.int16)
+        near_keys = np.column_stack([labels[rows].astype(np.int16), cells])
+        near[rows] = ~first_occurrence(near_keys) & ~exact[rows]
+
+        # 网格边界两侧的连续样本：与最近一个保留的样本同标签且每个值差异小于网格大小
+        near[rows] |= find_consecutive(selected, labels[rows], exact[rows] | near[rows], quantum)
+    return exact, near
+
+
+def find_consecutive(selected, labels, dropped, quantum):
+    """
+    与最近一个保留的样本（而不是前一行）比较的连续近似重复
+
+    逐行与前一行比较时，缓慢移动的手势每帧变化都小于网格，会被连锁删除到只剩一行；
+    与最近保留的样本比较时，累计变化超过网格的样本会被保留
+
+    参数:
+        selected: 有效样本的特征 (n, k)，按文件顺序
+        labels: 有效样本的标签 (n,)
+        dropped: 已被其他规则删除的样本（不作为比较基准）
+        quantum (float): 网格大小
+
+    返回:
+        np.ndarray: 布尔掩码 (n,)
+    """
+    consecutive = np.zeros(len(labels), dtype=bool)
+    # 只有与前一行同标签的样本才可能与最近保留的样本同标签且相邻
+    label_runs = np.flatnonzero(np.diff(labels) != 0) + 1
+    for start, stop in zip(np.r_[0, label_runs], np.r_[label_runs, len(labels)]):
+        kept = None
+        for index in range(start, stop):
+            if kept is not None and np.abs(selected[index] - kept).max() < quantum:
+                consecutive[index] = not dropped[index]
+                continue
+            if not dropped[index]:
+                kept = selected[index]
+    return consecutive
+
+
+def find_label_outliers(features, labels, valid, ratio):
+    """标签异常：到自身类别中心的距离超过到最近其他类别中心距离的 ratio 倍"""
+    outliers = np.zeros(len(labels), dtype=bool)
+    rows = np.flatnonzero(valid)
+    classes = np.unique(labels[rows])
+    if len(classes) < 2:
+        return outliers
+
+    selected = features[rows].astype(np.float64)
+    class_index = np.searchsorted(classes, labels[rows])
+    sums = np.zeros((len(classes), features.shape[1]))
+    np.add.at(sums, class_index, selected)
+    centroids = sums / np.bincount(class_index, minlength=len(classes))[:, None]
+
+    # 平方距离 ||x||² - 2x·c + ||c||²，一次矩阵乘法完成
+    distances = (np.square(selected).sum(axis=1)[:, None] - 2 * selected @ centroids.T
+                 + np.square(centroids).sum(axis=1)[None, :])
+    distances = np.sqrt(np.maximum(distances, 0))
+    own = distances[np.arange(len(rows)), class_index]
+    distances[np.arange(len(rows)), class_index] = np.inf
+    other = distances.min(axis=1)
+    outliers[rows] = own > ratio * other
+    return outliers
+
+
+def write_cleaned(path, output, keep):
+    """按保留掩码写出原始行"""
+    kept = 0
+    with open(output, 'w', encoding='utf-8', newline='') as f:
+        for row, line in enumerate(iter_lines(path)):
+            if keep[row]:
+                f.write(line if line.endswith('\n') else line + '\n')
+                kept += 1
+    return kept
+
+
+def print_class_table(labels, keep):
+    classes = np.unique(labels[labels >= 0])
+    print('类别    清洗前    清洗后')
+    for label in classes:
+        mask = labels == label
+        print(f'{label:>4}  {mask.sum():>8}  {(mask & keep).sum():>8}')
+
+
+def main():
+    args = get_args()
+
+    start = time.perf_counter()
+    features, labels, malformed = read_dataset(args.dataset)
+    total = len(labels)
+    if total == 0:
+        raise SystemExit('数据集为空')
+    read_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    degenerate = find_degenerate(features, malformed)
+    valid = ~malformed
+    for mask in degenerate.values():
+        valid &= ~mask
+    exact, near = find_duplicates(features, labels, valid, args.quantum)
+    outliers = find_label_outliers(features, labels, valid & ~exact & ~near, args.outlier_ratio)
+    scan_seconds = time.perf_counter() - start
+
+    remove = malformed | exact | near
+    for mask in degenerate.values():
+        remove |= mask
+    if args.drop_outliers:
+        remove |= outliers
+    keep = ~remove
+
+    print(f"数据集: {args.dataset}（{total} 行，{features.shape[1]} 维特征）")
+    print(f"读取 {read_seconds:.2f}s，检查 {scan_seconds:.2f}s")
+    report = [
+        ('格式错误', malformed),
+        ('包含NaN/Inf', degenerate['non_finite']),
+        ('全零', degenerate['all_zero']),
+        ('所有值相同', degenerate['constant']),
+        ('完全重复', exact),
+        (f'近似重复（网格 {args.quantum:g}）', near),
+        (f'标签异常（{"删除" if args.drop_outliers else "仅报告"}）', outliers),
+    ]
+    for name, mask in report:
+        count = int(mask.sum())
+        print(f"  {name}: {count} 行（{count / total:.1%}）")
+    print(f"保留 {int(keep.sum())} 行（{keep.sum() / total:.1%}）")
+    print_class_table(labels, keep)
+
+    if args.dry_run:
+        return
+
+    output = args.output or os.path.splitext(args.dataset)[0] + '_clean.csv'
+    write_cleaned(args.dataset, output, keep)
+    before, after = os.path.getsize(args.dataset), os.path.getsize(output)
+    print(f"清洗后的数据集已写入: {output}（{before / 1024:.0f} KB -> {after / 1024:.0f} KB）")
+
+
+if __name__ == '__main__':
+    main()
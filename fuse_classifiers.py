@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+多模型融合工具
+将多个标签集相同的分类器（.keras 或 .tflite）合并为一个TFLite模型：
+共享同一个输入，各子模型并列计算后对输出概率取（加权）平均，
+集成推理只需一次 invoke，而不是N个解释器各推理一次。
+TFLite模型按算子还原为Keras层（支持全连接 + Softmax 的结构，包括动态范围量化和全整数量化模型）。
+输出融合模型与逐个推理再平均的结果差异，以及两者的单样本延迟
+
+示例:
+    python fuse_classifiers.py --models a/keypoint_classifier.tflite b/keypoint_classifier.tflite \
+        --output model/keypoint_classifier/keypoint_classifier_ensemble.tflite
+    python fuse_classifiers.py --task keypoint --models m1.keras m2.keras m3.tflite --weights 2 1 1 \
+        --dataset model/keypoint_classifier/keypoint.csv
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from train_classifier import (
+    RANDOM_SEED, TASKS, export_tflite, load_samples, make_classifier,
+    make_dataset, resolve_dataset_files,
+)
+
+# TFLite融合激活函数编号 -> Keras激活函数
+FUSED_ACTIVATIONS = {0: None, 1: 'relu', 3: 'relu6', 4: 'tanh'}
+# 还原时忽略的算子（输入量化/输出反量化，还原后的模型为浮点计算）
+PASSTHROUGH_OPS = {'QUANTIZE', 'DEQUANTIZE'}
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='分类器多模型融合')
+    parser.add_argument('--task', choices=sorted(TASKS), default='keypoint', help='分类任务')
+    parser.add_argument('--models', nargs='+', required=True, help='待融合的模型（.keras / .tflite），至少两个')
+    parser.add_argument('--weights', nargs='+', type=float, default=None, help='各模型的平均权重，默认相等')
+    parser.add_argument('--output', required=True, help='融合后的TFLite保存路径')
+    parser.add_argument('--keras_output', default=None, help='同时保存融合后的Keras模型（.keras）')
+    parser.add_argument('--quantization', choices=('float', 'dynamic'), default='float',
+                        help='融合模型的量化方式（dynamic 为权重int8）')
+    parser.add_argument('--dataset', nargs='+', default=None,
+                        help='CSV数据集（可多个或通配符），提供时在验证集上对比准确率，否则使用随机输入')
+    parser.add_argument('--samples', type=int, default=1000, help='对比使用的样本数')
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    return parser.parse_args()
+
+
+def tflite_to_keras(tflite_path, name):
+    """
+    将全连接结构的TFLite分类器还原为Keras模型
+
+    权重为int8时按量化参数反量化（逐通道或逐张量）；融合激活函数从模型的flatbuffer中读取
+
+    参数:
+        tflite_path (str): TFLite模型路径
+        name (str): Keras模型名称（融合时用作子模型前缀）
+
+    返回:
+        tf.keras.Model: 输入 (num_features,)，输出与原模型相同的概率
+    """
+    from tensorflow.lite.python import schema_py_generated as schema
+
+    with open(tflite_path, 'rb') as f:
+        operators = schema.ModelT.InitFromPackedBuf(f.read(), 0).subgraphs[0].operators
+
+    # 不使用默认委托，保留原始算子列表（顺序与flatbuffer中的算子一致）
+    interpreter = tf.lite.Interpreter(
+        model_path=tflite_path,
+        experimental_op_resolver_type=tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES,
+    )
+    interpreter.allocate_tensors()
+    tensors = {detail['index']: detail for detail in interpreter.get_tensor_details()}
+
+    def constant(index):
+        value = interpreter.get_tensor(index)
+        params = tensors[index]['quantization_parameters']
+        if not np.issubdtype(value.dtype, np.integer) or len(params['scales']) == 0:
+            return value.astype(np.float32)
+        scales = params['scales'].astype(np.float32)
+        zero_points = params['zero_points'].astype(np.float32)
+        if len(scales) > 1:
+            # 逐通道量化：第0维为输出通道
+            shape = (-1,) + (1,) * (value.ndim - 1)
+            scales, zero_points = scales.reshape(shape), zero_points.reshape(shape)
+        return (value.astype(np.float32) - zero_points) * scales
+
+    num_features = int(interpreter.get_input_details()[0]['shape'][-1])
+    inputs = tf.keras.Input(shape=(num_features,), name=f'{name}_input')
+    outputs = inputs
+    for position, op in enumerate(interpreter._get_ops_details()):
+        op_name = op['op_name']
+        if op_name in PASSTHROUGH_OPS:
+            continue
+        if op_name == 'FULLY_CONNECTED':
+            activation_code = operators[position].builtinOptions.fusedActivationFunction
+            if activation_code not in FUSED_ACTIVATIONS:
+                raise ValueError(f'{tflite_path}: 不支持的融合激活函数 {activation_code}')
+            kernel = constant(op['inputs'][1])
+            layer = tf.keras.layers.Dense(kernel.shape[0], activation=FUSED_ACTIVATIONS[activation_code],
+                                          use_bias=op['inputs'][2] >= 0, name=f'{name}_dense_{position}')
+            outputs = layer(outputs)
+            weights = [kernel.T]
+            if op['inputs'][2] >= 0:
+                weights.append(constant(op['inputs'][2]))
+            layer.set_weights(weights)
+        elif op_name == 'SOFTMAX':
+            outputs = tf.keras.layers.Softmax(name=f'{name}_softmax_{position}')(outputs)
+        else:
+            raise ValueError(f'{tflite_path}: 不支持的算子 {op_name}（仅支持全连接 + Softmax 结构）')
+    return tf.keras.Model(inputs, outputs, name=name)
+
+
+def load_member(path, index):
+    """加载一个待融合的模型（.keras 直接加载，.tflite 还原为Keras）"""
+    name = f'member_{index}'
+    if path.endswith('.tflite'):
+        return tflite_to_keras(path, name)
+    model = tf.keras.models.load_model(path)
+    model.name = name
+    return model
+
+
+def fuse_models(models, weights=None):
+    """
+    构建共享输入、输出概率加权平均的融合模型
+
+    参数:
+        models (list): Keras模型列表（输入维度和类别数必须一致）
+        weights (list): 各模型的权重，默认相等
+
+    返回:
+        tf.keras.Model: 融合模型
+    """
+    num_features = {int(model.input_shape[-1]) for model in models}
+    num_classes = {int(model.output_shape[-1]) for model in models}
+    if len(num_features) != 1 or len(num_classes) != 1:
+        raise ValueError(f'模型不兼容：输入维度 {sorted(num_features)}，类别数 {sorted(num_classes)}')
+    if weights is None:
+        weights = [1.0] * len(models)
+    if len(weights) != len(models):
+        raise ValueError('--weights 的数量必须与模型数量一致')
+    total = float(sum(weights))
+
+    inputs = tf.keras.Input(shape=(num_features.pop(),), name='landmarks')
+    branches = []
+    for model, weight in zip(models, weights):
+        output = model(inputs)
+        branches.append(tf.keras.layers.Rescaling(weight / total, name=f'{model.name}_weight')(output))
+    outputs = tf.keras.layers.Add(name='ensemble')(branches)
+    return tf.keras.Model(inputs, outputs, name='ensemble')
+
+
+def read_label_file(model_path):
+    """读取模型旁边的标签文件（不存在时返回None）"""
+    directory = os.path.dirname(model_path)
+    for file_name in os.listdir(directory or '.'):
+        if file_name.endswith('_label.csv'):
+            with open(os.path.join(directory, file_name), encoding='utf-8-sig') as f:
+                return [line.strip() for line in f if line.strip()]
+    return None
+
+
+def median_latency_us(function, features, runs=1000):
+    """单样本推理延迟的中位数（微秒）"""
+    timings = []
+    for index in range(runs):
+        sample = features[index % len(features)]
+        start = time.perf_counter()
+        function(sample)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1e6)
+
+
+def main():
+    args = get_args()
+    config = TASKS[args.task]
+    if len(args.models) < 2:
+        raise SystemExit('至少需要两个模型')
+
+    # 标签集检查：模型旁边有标签文件时必须一致
+    label_sets = {path: read_label_file(path) for path in args.models}
+    known = {tuple(labels) for labels in label_sets.values() if labels is not None}
+    if len(known) > 1:
+        raise SystemExit('模型的标签文件不一致：' + '，'.join(
+            f'{path}={labels}' for path, labels in label_sets.items() if labels is not None))
+
+    members = [load_member(path, index) for index, path in enumerate(args.models)]
+    for path, member in zip(args.models, members):
+        print(f"{path}: 输入 {member.input_shape[-1]}，类别数 {member.output_shape[-1]}，参数 {member.count_params()}")
+    fused = fuse_models(members, args.weights)
+    if int(fused.input_shape[-1]) != config['num_features']:
+        raise SystemExit(f"输入维度 {fused.input_shape[-1]} 与任务 {args.task} 不符")
+
+    size = export_tflite(fused, args.output, quantization=args.quantization)
+    print(f"融合TFLite已保存: {args.output}（{size / 1024:.1f} KB，{len(members)} 个模型）")
+    if args.keras_output:
+        fused.save(args.keras_output)
+        print(f"融合Keras模型已保存: {args.keras_output}")
+
+    # 对比：逐个解释器推理后加权平均 vs 融合模型一次推理
+    labels = None
+    if args.dataset:
+        split = dict(train_size=0.75, seed=args.seed, cache='none')
+        features, labels = load_samples(
+            make_dataset(resolve_dataset_files(args.dataset), config['num_features'], 'val', **split),
+            args.samples)
+    else:
+        rng = np.random.default_rng(args.seed)
+        features = rng.uniform(-1.0, 1.0, (args.samples, config['num_features'])).astype(np.float32)
+    if len(features) == 0:
+        raise SystemExit('数据集为空')
+
+    weights = np.asarray(args.weights or [1.0] * len(members), dtype=np.float32)
+    weights /= weights.sum()
+    fused_classifier = make_classifier(args.task, args.output)
+    fused_scores = fused_classifier.predict_scores(features)
+    if all(path.endswith('.tflite') for path in args.models):
+        classifiers = [make_classifier(args.task, path) for path in args.models]
+        separate_scores = sum(weight * classifier.predict_scores(features)
+                              for weight, classifier in zip(weights, classifiers))
+        separate_latency = median_latency_us(
+            lambda sample: [classifier(sample) for classifier in classifiers], features)
+    else:
+        separate_scores = sum(weight * member.predict(features, verbose=0)
+                              for weight, member in zip(weights, members))
+        separate_latency = None
+
+    agreement = float(np.mean(np.argmax(fused_scores, axis=1) == np.argmax(separate_scores, axis=1)))
+    print(f"对比（{len(features)} 个样本）：概率最大差异 {np.abs(fused_scores - separate_scores).max():.2e}，"
+          f"预测一致率 {agreement:.4f}")
+    if labels is not None:
+        print(f"融合模型准确率 {np.mean(np.argmax(fused_scores, axis=1) == labels):.4f}")
+    fused_latency = median_latency_us(fused_classifier, features)
+    if separate_latency is not None:
+        print(f"单样本延迟：逐个推理 {separate_latency:.1f} µs，融合模型 {fused_latency:.1f} µs")
+    else:
+        print(f"融合模型单样本延迟 {fused_latency:.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
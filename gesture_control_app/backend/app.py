@@ -7,13 +7,18 @@
 功能：提供RESTful API接口，处理手势识别、文件上传、配置管理等
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify
 from flask_cors import CORS
 import cv2 as cv
 import numpy as np
 import base64
+import argparse
 import os
 import sys
+import time
+from werkzeug.exceptions import NotFound
+from werkzeug.http import parse_content_range_header
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
 
 # 添加项目根目录到系统路径
@@ -22,6 +27,13 @@ sys.path.append(project_root)
 
 from gesture_control_app.backend.gesture_service import GestureRecognitionService
 from gesture_control_app.backend.config_manager import ConfigManager
+from gesture_control_app.backend.image_encoder import AnnotatedImageEncoder
+from gesture_control_app.backend.session_manager import SessionManager
+from gesture_control_app.backend.frame_scheduler import FrameScheduler, DROP_OVERLOADED, DROP_TIMEOUT
+from gesture_control_app.backend.asset_streaming import send_asset
+from gesture_control_app.backend.asset_index import AssetIndex
+from gesture_control_app.backend.upload_store import ContentAddressedStore, UploadError, UploadOffsetError
+from utils import ConfidenceVoter, LandmarkSmoother, PerfStats, RuntimeConfig, TraceRecorder
 
 app = Flask(__name__)
 CORS(app)  # 允许跨域请求
@@ -30,11 +42,73 @@ CORS(app)  # 允许跨域请求
 UPLOAD_FOLDER = os.path.join(project_root, 'assets')
 ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'avi', 'mkv', 'mov', 'webm'}
 ALLOWED_PPT_EXTENSIONS = {'pptx', 'ppt', 'pdf'}
-app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB
+RECORDING_FOLDER = os.path.join(project_root, 'recordings')
+MAX_BATCH_FRAMES = 256
+MAX_UPLOAD_SIZE = int(os.environ.get('GESTURE_MAX_UPLOAD_SIZE', str(4 * 1024 * 1024 * 1024)))  # 分块上传总大小上限：4GB
+# 上传类型 -> (可见目录, 允许的扩展名, 显示名称)
+UPLOAD_TYPES = {
+    'video': ('videos', ALLOWED_VIDEO_EXTENSIONS, '视频'),
+    'ppt': ('presentations', ALLOWED_PPT_EXTENSIONS, 'PPT'),
+}
+app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB（单个请求上限，更大的文件使用分块上传）
 
 # 初始化服务
-gesture_service = GestureRecognitionService()
+# 时间线记录器：默认关闭，可通过 /api/trace/start 或环境变量 GESTURE_TRACE=1 开启
+tracer = TraceRecorder(capacity=int(os.environ.get('GESTURE_TRACE_CAPACITY', '65536')),
+                       enabled=os.environ.get('GESTURE_TRACE', '0') == '1')
+# 关键点平滑：one_euro（默认）| ema | none，每个会话复制一份独立状态的平滑器
+smoother = LandmarkSmoother(
+    method=os.environ.get('GESTURE_SMOOTHING', 'one_euro'),
+    min_cutoff=float(os.environ.get('GESTURE_SMOOTHING_MIN_CUTOFF', '1.0')),
+    beta=float(os.environ.get('GESTURE_SMOOTHING_BETA', '5.0')),
+)
+# 动态手势流式识别：窗口长度（帧）与推理步长，步长大于1时模型调用次数成比例减少
+dynamic_options = {
+    'window': int(os.environ.get('GESTURE_DYNAMIC_WINDOW', '16')),
+    'stride': int(os.environ.get('GESTURE_DYNAMIC_STRIDE', '1')),
+}
+# 静态手势置信度加权投票：同一手势连续帧的累计置信度达到阈值时提前确认（0为只用窗口内加权多数）
+static_voter = ConfidenceVoter(
+    window=16, commit_threshold=float(os.environ.get('GESTURE_STATIC_COMMIT_THRESHOLD', '2.5')))
+# 静态手势级联分类：设置 GESTURE_STATIC_CASCADE_MODEL（与默认模型标签相同的大模型）后，
+# 默认模型最高概率低于阈值或与上一帧结果不同时才交给大模型复核
+static_cascade = None
+if os.environ.get('GESTURE_STATIC_CASCADE_MODEL'):
+    static_cascade = {
+        'model_path': os.environ['GESTURE_STATIC_CASCADE_MODEL'],
+        'threshold': float(os.environ.get('GESTURE_STATIC_CASCADE_THRESHOLD', '0.8')),
+    }
 config_manager = ConfigManager()
+# 运行时配置（TFLite线程数/XNNPACK/解释器池、MediaPipe复杂度和置信度、OpenCV线程数）：
+# 默认值 < 配置文件的 runtime 段 < 环境变量 GESTURE_<名称大写>；
+# 解释器不是线程安全的，并发请求各自借用一个，后端默认每个模型分配 CPU核数（最多4个）个解释器
+runtime_config = RuntimeConfig(interpreter_pool_size=min(4, os.cpu_count() or 1))
+runtime_config.update(config_manager.get_config('runtime'), 'config').update_from_env().apply()
+print(f"[Runtime] {runtime_config.describe()}")
+gesture_service = GestureRecognitionService(tracer=tracer, smoother=smoother,
+                                            dynamic_options=dynamic_options,
+                                            static_voter=static_voter,
+                                            static_cascade=static_cascade,
+                                            runtime=runtime_config)
+upload_store = ContentAddressedStore(UPLOAD_FOLDER)
+asset_index = AssetIndex(UPLOAD_FOLDER, {
+    folder: extensions for folder, extensions, _ in UPLOAD_TYPES.values()
+}, store=upload_store)
+asset_index.start()
+image_encoder = AnnotatedImageEncoder(gesture_service.draw_landmarks_on_image)
+# 会话被淘汰或关闭时丢弃其排队帧和调度队列（MediaPipe资源由会话管理器关闭）
+session_manager = SessionManager(
+    gesture_service, on_close=lambda session: frame_scheduler.forget(session.session_id))
+# 单帧识别接口的滚动性能统计（帧处理耗时与各阶段耗时）
+perf_stats = PerfStats(window=int(os.environ.get('GESTURE_METRICS_WINDOW', '300')))
+
+# 服务模式：sync（请求线程内直接处理）或 async（有界队列 + 旧帧丢弃）
+SERVE_MODE = os.environ.get('GESTURE_SERVE_MODE', 'sync')
+FRAME_WAIT_TIMEOUT = float(os.environ.get('GESTURE_FRAME_TIMEOUT', '5'))
+frame_scheduler = FrameScheduler(
+    max_queue_size=int(os.environ.get('GESTURE_QUEUE_SIZE', '1')),
+    max_workers=int(os.environ.get('GESTURE_INFERENCE_WORKERS', '4')),
+)
 
 
 def allowed_file(filename, allowed_extensions):
@@ -49,40 +123,374 @@ def health_check():
     return jsonify({'status': 'ok', 'message': '服务运行正常'})
 
 
+def decode_image(image_data):
+    """解码base64图像（支持data URL前缀），失败时返回None"""
+    image_bytes = base64.b64decode(image_data.split(',')[1] if ',' in image_data else image_data)
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    return cv.imdecode(nparr, cv.IMREAD_COLOR)
+
+
+def parse_frame_id(data):
+    """解析异步模式下的帧序号 frame_id（可选），不是整数时抛出 ValueError"""
+    frame_id = data.get('frame_id')
+    if frame_id is None:
+        return None
+    try:
+        return int(frame_id)
+    except (TypeError, ValueError):
+        raise ValueError('frame_id 必须为整数')
+
+
+def dispatch_frame(data, job_fn, finish_fn=None, frame_id=None):
+    """
+    按当前服务模式执行一帧的处理任务
+    
+    Args:
+        data: 请求JSON，可包含 session_id
+        job_fn: 处理函数 job_fn(service) -> (payload, status_code)
+        finish_fn: 可选的后处理 finish_fn(payload)，在会话锁之外、于请求线程中执行（仅成功的帧），
+                   不依赖会话状态的工作（如标注图像编码）放在这里，可与同一会话下一帧的处理并行
+        frame_id: 已由 parse_frame_id 解析的帧序号（异步模式下用于丢弃乱序的旧帧）
+    
+    Returns:
+        Flask响应
+    """
+    session = session_manager.get(data.get('session_id'))
+    
+    def run():
+        # 会话锁串行化同一会话的帧处理及录制等控制操作（MediaPipe图不支持并发调用）
+        start = time.perf_counter()
+        with session.lock:
+            payload, status = job_fn(session.service)
+            session.frames_processed += 1
+        perf_stats.record_frame((time.perf_counter() - start) * 1000)
+        return payload, status
+    
+    if SERVE_MODE != 'async':
+        payload, status = run()
+        if finish_fn is not None and status == 200:
+            finish_fn(payload)
+        return jsonify(payload), status
+    
+    job = frame_scheduler.submit(session.session_id, run, frame_id=frame_id)
+    if not job.wait(FRAME_WAIT_TIMEOUT) and not frame_scheduler.cancel(job):
+        # 已开始处理的帧无法取消：等待其完成后照常返回结果
+        job.wait()
+    
+    queue_depth = frame_scheduler.queue_depth(session.session_id)
+    if job.status == 'dropped':
+        payload = {
+            'dropped': True,
+            'reason': job.drop_reason,
+            'frame_id': job.frame_id,
+            'queue_depth': queue_depth,
+        }
+        status = 503 if job.drop_reason in (DROP_OVERLOADED, DROP_TIMEOUT) else 200
+        response = jsonify(payload)
+        response.status_code = status
+        if status == 503:
+            response.headers['Retry-After'] = '1'
+    else:
+        if job.error is not None:
+            raise job.error
+        perf_stats.record('queue_wait', job.queue_wait_ms)
+        payload, status = job.result
+        if finish_fn is not None and status == 200:
+            finish_fn(payload)
+        payload['dropped'] = False
+        payload['frame_id'] = job.frame_id
+        payload['queue_wait_ms'] = job.queue_wait_ms
+        response = jsonify(payload)
+        response.status_code = status
+    response.headers['X-Queue-Depth'] = str(queue_depth)
+    return response
+
+
 @app.route('/api/gesture/recognize', methods=['POST'])
 def recognize_gesture():
     """
     手势识别接口
     接收base64编码的图像，返回识别结果
+    可通过 image_format / image_quality / preview_width 选择标注图像的返回方式
+    可通过 session_id 区分客户端会话，异步模式下可通过 frame_id 标记帧顺序
     """
     try:
         data = request.json
-        image_data = data.get('image', '')
-        
-        # 解码base64图像
-        image_bytes = base64.b64decode(image_data.split(',')[1] if ',' in image_data else image_data)
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv.imdecode(nparr, cv.IMREAD_COLOR)
         
-        if image is None:
-            return jsonify({'error': '无效的图像数据'}), 400
+        try:
+            encode_options = image_encoder.parse_options(data)
+            timestamp = float(data['timestamp']) if data.get('timestamp') is not None else None
+            frame_id = parse_frame_id(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
         
-        # 处理图像并识别手势
-        result = gesture_service.process_frame(image)
+        frame = {}
         
-        # 如果需要返回带关键点的图像
-        if data.get('draw_landmarks', False) and result['hand_detected']:
-            annotated_image = image.copy()
-            annotated_image = gesture_service.draw_landmarks_on_image(
-                annotated_image, result['landmarks']
-            )
+        def job(service):
+            # 解码放在任务内部，被丢弃的帧不再消耗解码开销
+            start = time.perf_counter()
+            with tracer.span('decode'):
+                image = decode_image(data.get('image', ''))
+            perf_stats.record('decode', (time.perf_counter() - start) * 1000)
             
-            # 编码为base64
-            _, buffer = cv.imencode('.jpg', annotated_image)
-            image_base64 = base64.b64encode(buffer).decode('utf-8')
-            result['annotated_image'] = f"data:image/jpeg;base64,{image_base64}"
+            if image is None:
+                return {'error': '无效的图像数据'}, 400
+            
+            # 处理图像并识别手势
+            start = time.perf_counter()
+            result = service.process_frame(image, timestamp)
+            perf_stats.record('recognize', (time.perf_counter() - start) * 1000)
+            frame['image'] = image
+            return result, 200
+        
+        def encode(result):
+            # 如果需要返回带关键点的图像，释放会话锁后在请求线程中绘制并编码
+            # （同一会话的下一帧可同时开始识别）；解码出的图像仅属于本次请求，可直接作为画布使用
+            if encode_options['format'] != 'none' and result['hand_detected']:
+                start = time.perf_counter()
+                with tracer.span('encode'):
+                    result.update(image_encoder.encode(frame['image'], result['landmarks'], encode_options))
+                perf_stats.record('encode', (time.perf_counter() - start) * 1000)
+        
+        return dispatch_frame(data, job, encode, frame_id)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def parse_landmark_input(data):
+    """
+    解析客户端提交的关键点
+    
+    Returns:
+        tuple: (landmarks, handedness, image_width, image_height)，未检测到手时 landmarks 为None
+    
+    Raises:
+        ValueError: 参数不合法
+    """
+    try:
+        image_width = int(data.get('image_width', 0))
+        image_height = int(data.get('image_height', 0))
+    except (TypeError, ValueError):
+        raise ValueError('image_width / image_height 必须为整数')
+    if image_width <= 0 or image_height <= 0:
+        raise ValueError('缺少有效的 image_width / image_height')
+    
+    raw_landmarks = data.get('landmarks')
+    if raw_landmarks is None:
+        return None, None, image_width, image_height
+    
+    try:
+        landmarks = np.asarray(raw_landmarks, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError('landmarks 必须为数值数组')
+    if landmarks.shape not in ((21, 2), (21, 3)):
+        raise ValueError(f'landmarks 形状应为 21x3 或 21x2，实际为 {"x".join(map(str, landmarks.shape))}')
+    if not np.isfinite(landmarks).all():
+        raise ValueError('landmarks 包含无效数值')
+    
+    # 默认为MediaPipe归一化坐标，也接受像素坐标
+    if not data.get('normalized', True):
+        landmarks = landmarks.copy()
+        landmarks[:, 0] /= image_width
+        landmarks[:, 1] /= image_height
+    
+    handedness = data.get('handedness')
+    if handedness not in (None, 'Left', 'Right'):
+        raise ValueError('handedness 只能为 Left 或 Right')
+    
+    return landmarks, handedness, image_width, image_height
+
+
+@app.route('/api/gesture/recognize_landmarks', methods=['POST'])
+def recognize_landmarks():
+    """
+    关键点输入的手势识别接口
+    接收客户端（如浏览器端MediaPipe）检测出的21个关键点，跳过图像传输、解码和检测，
+    仅执行平滑、预处理、分类和投票，与图像接口共享同一会话状态
+    """
+    try:
+        data = request.json
+        
+        try:
+            landmarks, handedness, image_width, image_height = parse_landmark_input(data)
+            timestamp = float(data['timestamp']) if data.get('timestamp') is not None else None
+            frame_id = parse_frame_id(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        def job(service):
+            start = time.perf_counter()
+            result = service.process_landmarks(landmarks, handedness, image_width,
+                                               image_height, timestamp)
+            perf_stats.record('recognize_landmarks', (time.perf_counter() - start) * 1000)
+            return result, 200
+        
+        return dispatch_frame(data, job, frame_id=frame_id)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/gesture/recognize_batch', methods=['POST'])
+def recognize_batch():
+    """
+    多帧批量识别接口
+    接收同一会话按时间顺序排列的多帧图像，按顺序检测后批量分类，一次返回全部结果
+    批量请求不参与异步模式的丢帧，始终完整处理
+    """
+    try:
+        data = request.json
+        frames = data.get('frames') or []
+        
+        if not isinstance(frames, list) or len(frames) == 0:
+            return jsonify({'error': '缺少 frames'}), 400
+        if len(frames) > MAX_BATCH_FRAMES:
+            return jsonify({'error': f'单次最多 {MAX_BATCH_FRAMES} 帧'}), 400
         
-        return jsonify(result)
+        images = []
+        timestamps = []
+        for index, frame in enumerate(frames):
+            if not isinstance(frame, dict):
+                return jsonify({'error': f'第 {index} 帧必须为对象'}), 400
+            image = decode_image(frame.get('image', ''))
+            if image is None:
+                return jsonify({'error': f'第 {index} 帧图像数据无效'}), 400
+            images.append(image)
+            timestamp = frame.get('timestamp')
+            if timestamp is not None:
+                try:
+                    timestamp = float(timestamp)
+                except (TypeError, ValueError):
+                    return jsonify({'error': f'第 {index} 帧 timestamp 无效'}), 400
+            timestamps.append(timestamp)
+        # 时间戳须全部提供或全部省略：部分缺失时无法确定各帧间隔
+        missing = [index for index, timestamp in enumerate(timestamps) if timestamp is None]
+        if len(missing) == len(timestamps):
+            timestamps = None
+        elif missing:
+            return jsonify({'error': f'timestamp 必须全部提供或全部省略，第 {missing[0]} 帧缺少 timestamp'}), 400
+        
+        session = session_manager.get(data.get('session_id'))
+        start = time.perf_counter()
+        with session.lock:
+            results = session.service.process_batch(images, timestamps)
+            session.frames_processed += len(results)
+        
+        return jsonify({
+            'session_id': session.session_id,
+            'frame_count': len(results),
+            'processing_ms': round((time.perf_counter() - start) * 1000, 2),
+            'results': results,
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/session/<session_id>', methods=['DELETE'])
+def close_session(session_id):
+    """关闭识别会话（默认会话仅重置历史状态）"""
+    frame_scheduler.forget(session_id)
+    removed = session_manager.remove(session_id)
+    return jsonify({'session_id': session_id, 'closed': removed})
+
+
+@app.route('/api/serving/status', methods=['GET'])
+def serving_status():
+    """服务模式、调度统计与会话信息"""
+    return jsonify({
+        'mode': SERVE_MODE,
+        'scheduler': frame_scheduler.get_stats(),
+        'sessions': session_manager.list_sessions(),
+        'metrics': perf_stats.snapshot(),
+    })
+
+
+@app.route('/api/runtime', methods=['GET'])
+def get_runtime():
+    """生效的运行时配置（每项的值与来源）以及OpenCV实际线程数"""
+    return jsonify(runtime_config.effective())
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    单帧识别接口的滚动性能统计
+    返回最近窗口内每帧处理耗时与各阶段耗时的均值和 p50/p95/p99，以及累计耗时占比最高的阶段；
+    启用级联分类时附带各阶段命中率（static_cascade）；interpreter_pools 为各模型解释器池的争用统计
+    """
+    metrics = perf_stats.snapshot()
+    metrics['interpreter_pools'] = gesture_service.get_interpreter_pool_stats()
+    if hasattr(gesture_service.keypoint_classifier, 'get_stats'):
+        metrics['static_cascade'] = gesture_service.keypoint_classifier.get_stats()
+    return jsonify(metrics)
+
+
+@app.route('/api/trace/start', methods=['POST'])
+def start_trace():
+    """开始记录时间线（默认清空之前的事件）"""
+    data = request.get_json(silent=True) or {}
+    if data.get('clear', True):
+        tracer.clear()
+    tracer.enabled = True
+    return jsonify({'tracing': True, 'capacity': tracer.capacity})
+
+
+@app.route('/api/trace/stop', methods=['POST'])
+def stop_trace():
+    """停止记录时间线（已记录的事件保留，可继续下载）"""
+    tracer.enabled = False
+    return jsonify({'tracing': False, 'event_count': tracer.event_count})
+
+
+@app.route('/api/trace', methods=['GET'])
+def download_trace():
+    """
+    下载 Chrome Trace JSON
+    可在 chrome://tracing 或 https://ui.perfetto.dev 中打开，查看各帧在解码、检测、分类、编码阶段的交错情况
+    """
+    try:
+        response = jsonify(tracer.to_chrome_trace())
+        response.headers['Content-Disposition'] = 'attachment; filename=gesture_trace.json'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/recording/start', methods=['POST'])
+def start_recording():
+    """
+    开始录制会话的原始关键点
+    录制文件保存在 recordings/ 目录，可使用 replay_landmarks.py 离线回放
+    """
+    try:
+        data = request.json or {}
+        session = session_manager.get(data.get('session_id'))
+        filename = secure_filename(data.get('filename') or
+                                   f"{session.session_id}_{time.strftime('%Y%m%d_%H%M%S')}.hglm")
+        if not filename:
+            return jsonify({'error': '无效的文件名'}), 400
+        
+        os.makedirs(RECORDING_FOLDER, exist_ok=True)
+        with session.lock:
+            path = session.service.start_recording(os.path.join(RECORDING_FOLDER, filename))
+        return jsonify({'message': '开始录制', 'session_id': session.session_id, 'path': path})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/recording/stop', methods=['POST'])
+def stop_recording():
+    """停止录制，返回录制的帧数"""
+    try:
+        data = request.json or {}
+        session = session_manager.get(data.get('session_id'))
+        with session.lock:
+            frame_count = session.service.stop_recording()
+        return jsonify({'message': '录制已停止', 'session_id': session.session_id,
+                        'frame_count': frame_count})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -165,9 +573,32 @@ def get_gesture_action():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/upload/video', methods=['POST'])
-def upload_video():
-    """上传视频文件"""
+def resolve_upload_type(file_type):
+    """上传类型 -> (可见目录, 允许的扩展名, 显示名称)，无效时返回None"""
+    return UPLOAD_TYPES.get(file_type)
+
+
+def publish_upload(sha256, folder, filename, pinned=False):
+    """将内容对象发布为可见文件，并立即更新文件索引（pinned 见 ContentAddressedStore.link）"""
+    upload_store.link(sha256, folder, filename, pinned)
+    asset_index.update_file(folder, filename, sha256)
+
+
+def upload_response(file_type, filename, sha256, size, deduplicated):
+    """生成上传成功的响应"""
+    folder, _, display_name = UPLOAD_TYPES[file_type]
+    return jsonify({
+        'message': f'{display_name}上传成功',
+        'filename': filename,
+        'path': f'/assets/{folder}/{filename}',
+        'sha256': sha256,
+        'size': size,
+        'deduplicated': deduplicated,
+    })
+
+
+def handle_form_upload(file_type):
+    """处理multipart表单上传：按块写入存储并计算哈希，相同内容只保存一份"""
     try:
         if 'file' not in request.files:
             return jsonify({'error': '没有文件'}), 400
@@ -177,83 +608,237 @@ def upload_video():
         if file.filename == '':
             return jsonify({'error': '文件名为空'}), 400
         
-        if file and allowed_file(file.filename, ALLOWED_VIDEO_EXTENSIONS):
+        folder, extensions, _ = UPLOAD_TYPES[file_type]
+        if file and allowed_file(file.filename, extensions):
             filename = secure_filename(file.filename)
-            video_folder = os.path.join(UPLOAD_FOLDER, 'videos')
-            os.makedirs(video_folder, exist_ok=True)
-            
-            file_path = os.path.join(video_folder, filename)
-            file.save(file_path)
-            
-            return jsonify({
-                'message': '视频上传成功',
-                'filename': filename,
-                'path': f'/assets/videos/{filename}'
-            })
+            sha256, size, deduplicated = upload_store.save_stream(
+                file.stream, expected_sha256=request.form.get('sha256'))
+            publish_upload(sha256, folder, filename, pinned=True)
+            return upload_response(file_type, filename, sha256, size, deduplicated)
         else:
             return jsonify({'error': '不支持的文件类型'}), 400
     
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/upload/video', methods=['POST'])
+def upload_video():
+    """上传视频文件"""
+    return handle_form_upload('video')
+
+
 @app.route('/api/upload/ppt', methods=['POST'])
 def upload_ppt():
     """上传PPT文件"""
+    return handle_form_upload('ppt')
+
+
+@app.route('/api/upload/<file_type>/<filename>', methods=['PUT'])
+def upload_raw(file_type, filename):
+    """
+    以原始请求体上传文件（不经过multipart解析，直接从请求流按块写盘）
+    可通过 X-Content-SHA256 头提供哈希用于完整性校验
+    """
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': '没有文件'}), 400
+        upload_type = resolve_upload_type(file_type)
+        if upload_type is None:
+            return jsonify({'error': '无效的文件类型'}), 400
+        folder, extensions, _ = upload_type
         
-        file = request.files['file']
+        filename = secure_filename(filename)
+        if not filename or not allowed_file(filename, extensions):
+            return jsonify({'error': '不支持的文件类型'}), 400
         
-        if file.filename == '':
-            return jsonify({'error': '文件名为空'}), 400
+        sha256, size, deduplicated = upload_store.save_stream(
+            request.stream, expected_sha256=request.headers.get('X-Content-SHA256'))
+        publish_upload(sha256, folder, filename, pinned=True)
+        return upload_response(file_type, filename, sha256, size, deduplicated)
+    
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/upload/check', methods=['POST'])
+def check_upload():
+    """
+    秒传检查：已存在相同内容（SHA-256）时直接发布为新文件，无需再上传数据
+    """
+    try:
+        data = request.json
+        upload_type = resolve_upload_type(data.get('file_type'))
+        if upload_type is None:
+            return jsonify({'error': '无效的文件类型'}), 400
+        folder, extensions, _ = upload_type
         
-        if file and allowed_file(file.filename, ALLOWED_PPT_EXTENSIONS):
-            filename = secure_filename(file.filename)
-            ppt_folder = os.path.join(UPLOAD_FOLDER, 'presentations')
-            os.makedirs(ppt_folder, exist_ok=True)
-            
-            file_path = os.path.join(ppt_folder, filename)
-            file.save(file_path)
-            
-            return jsonify({
-                'message': 'PPT上传成功',
-                'filename': filename,
-                'path': f'/assets/presentations/{filename}'
-            })
-        else:
+        filename = secure_filename(data.get('filename', ''))
+        if not filename or not allowed_file(filename, extensions):
             return jsonify({'error': '不支持的文件类型'}), 400
+        
+        sha256 = (data.get('sha256') or '').lower()
+        if not upload_store.has_object(sha256):
+            return jsonify({'exists': False})
+        
+        publish_upload(sha256, folder, filename)
+        response = upload_response(data['file_type'], filename, sha256,
+                                   upload_store.object_size(sha256), True)
+        return jsonify(dict(response.get_json(), exists=True))
     
+    except UploadError as e:
+        # 对象在检查之后被回收：客户端重新上传即可
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/upload/chunked', methods=['POST'])
+def create_chunked_upload():
+    """
+    创建可续传的分块上传
+    参数：file_type, filename, size（字节），sha256（可选，内容已存在时直接完成）
+    """
+    try:
+        data = request.json
+        upload_type = resolve_upload_type(data.get('file_type'))
+        if upload_type is None:
+            return jsonify({'error': '无效的文件类型'}), 400
+        folder, extensions, _ = upload_type
+        
+        filename = secure_filename(data.get('filename', ''))
+        if not filename or not allowed_file(filename, extensions):
+            return jsonify({'error': '不支持的文件类型'}), 400
+        
+        size = int(data.get('size', -1))
+        if size > MAX_UPLOAD_SIZE:
+            return jsonify({'error': f'文件超过上限 {MAX_UPLOAD_SIZE} 字节'}), 413
+        
+        sha256 = (data.get('sha256') or '').lower() or None
+        if sha256 and upload_store.has_object(sha256):
+            publish_upload(sha256, folder, filename)
+            # 返回已存储对象的实际大小，而不是客户端声明的大小
+            return upload_response(data['file_type'], filename, sha256,
+                                   upload_store.object_size(sha256), True)
+        
+        meta = upload_store.create_upload(folder, filename, size, sha256)
+        return jsonify({'upload_id': meta['upload_id'], 'offset': 0, 'size': size})
+    
+    except (UploadError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/upload/chunked/<upload_id>', methods=['GET'])
+def chunked_upload_status(upload_id):
+    """查询分块上传进度（断线后据此续传）"""
+    try:
+        meta = upload_store.upload_status(upload_id)
+        return jsonify({'upload_id': upload_id, 'offset': meta['offset'], 'size': meta['size']})
+    except KeyError:
+        return jsonify({'error': '上传任务不存在'}), 404
+
+
+@app.route('/api/upload/chunked/<upload_id>', methods=['PUT'])
+def append_chunked_upload(upload_id):
+    """
+    追加数据块
+    请求体为原始数据，Upload-Offset 头（或 Content-Range: bytes start-end/total）指明起始偏移
+    偏移不一致时返回409及服务器已接收的offset
+    """
+    try:
+        offset = request.headers.get('Upload-Offset')
+        if offset is None and 'Content-Range' in request.headers:
+            content_range = parse_content_range_header(request.headers['Content-Range'])
+            if content_range is not None:
+                offset = content_range.start
+        if offset is None:
+            return jsonify({'error': '缺少 Upload-Offset 或 Content-Range'}), 400
+        
+        received = upload_store.append_chunk(upload_id, int(offset), request.stream)
+        return jsonify({'upload_id': upload_id, 'offset': received})
+    
+    except KeyError:
+        return jsonify({'error': '上传任务不存在'}), 404
+    except UploadOffsetError as e:
+        return jsonify({'error': str(e), 'offset': e.offset}), 409
+    except (UploadError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/upload/chunked/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """完成分块上传：校验大小与哈希后发布文件"""
+    try:
+        meta = upload_store.upload_status(upload_id)
+        file_type = next(key for key, value in UPLOAD_TYPES.items() if value[0] == meta['folder'])
+        result = upload_store.complete_upload(upload_id)
+        asset_index.update_file(meta['folder'], result['filename'], result['sha256'])
+        return upload_response(file_type, result['filename'], result['sha256'],
+                               result['size'], result['deduplicated'])
+    
+    except KeyError:
+        return jsonify({'error': '上传任务不存在'}), 404
+    except UploadOffsetError as e:
+        return jsonify({'error': str(e), 'offset': e.offset}), 409
+    except UploadError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/upload/chunked/<upload_id>', methods=['DELETE'])
+def abort_chunked_upload(upload_id):
+    """放弃分块上传"""
+    try:
+        upload_store.abort_upload(upload_id)
+        return jsonify({'upload_id': upload_id, 'aborted': True})
+    except KeyError:
+        return jsonify({'error': '上传任务不存在'}), 404
+
+
 @app.route('/api/files/<file_type>', methods=['GET'])
 def list_files(file_type):
-    """列出文件"""
+    """
+    列出文件（从内存索引查询，不访问文件系统）
+    查询参数：q（文件名关键字）、ext（扩展名，逗号分隔）、sort（name/mtime/size）、
+    order（asc/desc）、offset、limit（不传时返回全部）
+    """
     try:
-        if file_type == 'videos':
-            folder = os.path.join(UPLOAD_FOLDER, 'videos')
-            extensions = ALLOWED_VIDEO_EXTENSIONS
-        elif file_type == 'presentations':
-            folder = os.path.join(UPLOAD_FOLDER, 'presentations')
-            extensions = ALLOWED_PPT_EXTENSIONS
-        else:
+        if file_type not in asset_index.folders:
             return jsonify({'error': '无效的文件类型'}), 400
         
-        if not os.path.exists(folder):
-            return jsonify({'files': []})
-        
-        files = []
-        for filename in os.listdir(folder):
-            if allowed_file(filename, extensions):
-                files.append({
-                    'filename': filename,
-                    'path': f'/assets/{file_type}/{filename}'
-                })
+        try:
+            offset = int(request.args.get('offset', 0))
+            limit = request.args.get('limit')
+            limit = int(limit) if limit is not None else None
+            files, total, generation = asset_index.query(
+                file_type,
+                q=request.args.get('q'),
+                ext=request.args.get('ext'),
+                sort=request.args.get('sort', 'name'),
+                order=request.args.get('order', 'asc'),
+                offset=offset,
+                limit=limit,
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify({'files': files})
+        response = jsonify({
+            'files': files,
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+        })
+        # 目录内容未变化时，轮询请求可直接得到304
+        response.set_etag(f'{file_type}-{generation}-{request.query_string.decode("latin-1")}')
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -261,14 +846,41 @@ def list_files(file_type):
 
 @app.route('/assets/<path:filename>')
 def serve_assets(filename):
-    """提供静态资源"""
+    """提供静态资源（支持Range分段请求与ETag/Last-Modified条件请求）"""
     try:
-        return send_from_directory(UPLOAD_FOLDER, filename)
-    except Exception as e:
+        # 内部存储目录不对外提供：按规范化后的实际路径判断（./、../ 等写法都会解析到同一位置）
+        path = safe_join(UPLOAD_FOLDER, filename)
+        if path is None or upload_store.is_internal_path(path):
+            raise NotFound()
+        return send_asset(request, UPLOAD_FOLDER, filename)
+    except NotFound as e:
         return jsonify({'error': f'文件不存在: {str(e)}'}), 404
 
 
+def get_args():
+    parser = argparse.ArgumentParser(description='手势控制后端API服务')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--serve-mode', choices=['sync', 'async'], default=SERVE_MODE,
+                        help='sync: 请求线程内处理；async: 每会话有界队列，丢弃过时帧')
+    parser.add_argument('--queue-size', type=int, default=frame_scheduler.max_queue_size,
+                        help='异步模式下每个会话最多排队的帧数')
+    parser.add_argument('--workers', type=int, default=frame_scheduler.max_workers,
+                        help='异步模式下的推理工作线程数')
+    parser.add_argument('--frame-timeout', type=float, default=FRAME_WAIT_TIMEOUT,
+                        help='异步模式下单帧最长等待时间（秒）')
+    parser.add_argument('--no-debug', action='store_true', help='关闭Flask调试模式')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
+    args = get_args()
+    SERVE_MODE = args.serve_mode
+    FRAME_WAIT_TIMEOUT = args.frame_timeout
+    if (args.queue_size, args.workers) != (frame_scheduler.max_queue_size, frame_scheduler.max_workers):
+        frame_scheduler.shutdown()
+        frame_scheduler = FrameScheduler(max_queue_size=args.queue_size, max_workers=args.workers)
+    
     # 确保必要的目录存在
     os.makedirs(os.path.join(UPLOAD_FOLDER, 'videos'), exist_ok=True)
     os.makedirs(os.path.join(UPLOAD_FOLDER, 'presentations'), exist_ok=True)
@@ -277,8 +889,12 @@ if __name__ == '__main__':
     print("手势控制后端API服务启动中...")
     print(f"项目根目录: {project_root}")
     print(f"上传文件夹: {UPLOAD_FOLDER}")
-    print("API服务地址: http://localhost:5000")
+    print(f"服务模式: {SERVE_MODE}")
+    if SERVE_MODE == 'async':
+        print(f"  每会话队列长度: {frame_scheduler.max_queue_size}，工作线程: {frame_scheduler.max_workers}")
+    print(f"API服务地址: http://localhost:{args.port}")
     print("=" * 50)
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
-
+    # 异步模式下关闭自动重载，避免模型和工作线程在重载进程中重复初始化
+    app.run(host=args.host, port=args.port, debug=not args.no_debug,
+            use_reloader=SERVE_MODE != 'async', threaded=True)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+资源文件索引模块
+==========================================
+功能：在内存中维护 assets/videos 和 assets/presentations 的文件索引
+（大小、修改时间、视频时长/文档页数、内容哈希），文件列表接口直接查询索引而不访问文件系统
+- 后台线程轮询目录修改时间，目录变化时增量扫描，只探测新增或变化的文件
+- 定期全量校验，捕获原地修改（不改变目录修改时间）的文件
+- 时长、页数和哈希在后台逐个计算，不阻塞列表请求
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+import zipfile
+
+import cv2 as cv
+
+
+HASH_CHUNK_SIZE = 1 << 20  # 1MB
+SORT_KEYS = ('name', 'mtime', 'size')
+_PDF_PAGE_RE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+_PPTX_SLIDE_RE = re.compile(r'^ppt/slides/slide\d+\.xml$')
+
+
+def probe_video_duration(path):
+    """读取视频时长（秒），无法解析时返回None"""
+    cap = cv.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return None
+        frame_count = cap.get(cv.CAP_PROP_FRAME_COUNT)
+        fps = cap.get(cv.CAP_PROP_FPS)
+        if frame_count > 0 and fps > 0:
+            return round(frame_count / fps, 3)
+        return None
+    finally:
+        cap.release()
+
+
+def probe_page_count(path):
+    """读取演示文稿页数（pptx幻灯片数 / pdf页数），旧版ppt等无法解析时返回None"""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == '.pptx':
+            with zipfile.ZipFile(path) as archive:
+                return sum(1 for name in archive.namelist() if _PPTX_SLIDE_RE.match(name))
+        if ext == '.pdf':
+            with open(path, 'rb') as f:
+                return len(_PDF_PAGE_RE.findall(f.read())) or None
+    except (OSError, zipfile.BadZipFile):
+        pass
+    return None
+
+
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """按块计算文件的SHA-256"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# 目录 -> (元信息字段, 探测函数)
+METADATA_PROBES = {
+    'videos': ('duration', probe_video_duration),
+    'presentations': ('pages', probe_page_count),
+}
+
+
+class AssetIndex:
+    """资源文件索引类"""
+
+    def __init__(self, root, folders, store=None, poll_interval=2.0,
+                 full_rescan_interval=60.0, hash_files=True):
+        """
+        初始化索引
+
+        Args:
+            root: 资源根目录（assets）
+            folders: 目录名 -> 允许的扩展名集合
+            store: ContentAddressedStore，已知哈希直接从其清单读取
+            poll_interval: 检查目录修改时间的间隔（秒）
+            full_rescan_interval: 全量校验间隔（秒）
+            hash_files: 是否在后台为清单中没有哈希的文件计算SHA-256
+        """
+        self.root = root
+        self.folders = {name: {ext.lower() for ext in extensions}
+                        for name, extensions in folders.items()}
+        self.store = store
+        self.poll_interval = poll_interval
+        self.full_rescan_interval = full_rescan_interval
+        self.hash_files = hash_files
+
+        self._lock = threading.Lock()
+        self._entries = {name: {} for name in self.folders}
+        self._dir_mtimes = {name: None for name in self.folders}
+        self._generations = {name: 0 for name in self.folders}
+        self._sorted_cache = {}
+        self._pending = []          # 待探测的 (folder, filename)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_full_scan = 0.0
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    def start(self):
+        """首次扫描（仅stat）并启动后台刷新线程"""
+        for folder in self.folders:
+            self._scan_folder(folder)
+        self._last_full_scan = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='asset-index', daemon=True)
+        self._thread.start()
+        total = sum(len(entries) for entries in self._entries.values())
+        print(f"[AssetIndex] 已索引 {total} 个文件，{len(self._pending)} 个待探测元信息")
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # ------------------------------------------------------------------
+    # 查询与更新
+    # ------------------------------------------------------------------
+    def query(self, folder, q=None, ext=None, sort='name', order='asc', offset=0, limit=None):
+        """
+        查询文件列表
+
+        Args:
+            folder: 目录名
+            q: 文件名包含的关键字（不区分大小写）
+            ext: 扩展名过滤，可为逗号分隔的多个
+            sort: name / mtime / size
+            order: asc / desc
+            offset, limit: 分页参数，limit为None时返回全部
+
+        Returns:
+            tuple: (文件列表, 过滤后的总数, 目录版本号)
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f'sort 必须是 {", ".join(SORT_KEYS)} 之一')
+        if order not in ('asc', 'desc'):
+            raise ValueError('order 必须是 asc 或 desc')
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError('offset 和 limit 不能为负数')
+
+        with self._lock:
+            generation = self._generations[folder]
+            entries = self._sorted_locked(folder, sort, order == 'desc')
+
+        if q:
+            keyword = q.lower()
+            entries = [entry for entry in entries if keyword in entry['filename'].lower()]
+        if ext:
+            extensions = {item.strip().lower().lstrip('.') for item in ext.split(',') if item.strip()}
+            entries = [entry for entry in entries if entry['ext'] in extensions]
+
+        total = len(entries)
+        end = total if limit is None else offset + limit
+        return [dict(entry) for entry in entries[offset:end]], total, generation
+
+    def update_file(self, folder, filename, sha256=None):
+        """
+        文件被上传或替换后立即更新索引（不等待后台轮询）
+        大小和修改时间立即可见，时长/页数（及未知的哈希）交给后台线程探测，不阻塞上传请求
+
+        Args:
+            folder: 目录名
+            filename: 文件名
+            sha256: 已知的内容哈希
+        """
+        path = os.path.join(self.root, folder, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        entry = self._make_entry(folder, filename, stat)
+        entry['sha256'] = sha256 or entry['sha256']
+        with self._lock:
+            self._entries[folder][filename] = entry
+            self._invalidate_locked(folder)
+        if folder in METADATA_PROBES or (entry['sha256'] is None and self.hash_files):
+            self._enqueue(folder, filename)
+
+    # ------------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------------
+    def _run(self):
+        """后台线程：轮询目录修改时间并处理待探测队列"""
+        while not self._stop.is_set():
+            force = time.monotonic() - self._last_full_scan >= self.full_rescan_interval
+            for folder in self.folders:
+                self._scan_folder(folder, force=force)
+            if force:
+                self._last_full_scan = time.monotonic()
+
+            # 逐个探测元信息，期间定期回到目录检查，保证新文件及时出现在列表中
+            deadline = time.monotonic() + self.poll_interval
+            while time.monotonic() < deadline and not self._stop.is_set():
+                with self._lock:
+                    item = self._pending.pop(0) if self._pending else None
+                if item is None:
+                    break
+                self._probe(*item)
+
+            self._wakeup.wait(max(0.0, deadline - time.monotonic()))
+            self._wakeup.clear()
+
+    def _scan_folder(self, folder, force=False):
+        """目录修改时间变化（或force）时增量扫描，只探测新增或变化的文件"""
+        directory = os.path.join(self.root, folder)
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        if not force and dir_mtime == self._dir_mtimes[folder]:
+            return
+
+        extensions = self.folders[folder]
+        found = {}
+        if dir_mtime is not None:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if item.name.startswith('.') or not item.is_file():
+                        continue
+                    if '.' not in item.name or item.name.rsplit('.', 1)[1].lower() not in extensions:
+                        continue
+                    found[item.name] = item.stat()
+
+        changed = False
+        with self._lock:
+            entries = self._entries[folder]
+            for filename in list(entries):
+                if filename not in found:
+                    del entries[filename]
+                    changed = True
+            for filename, stat in found.items():
+                entry = entries.get(filename)
+                if entry is not None and entry['_mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                    continue
+                entries[filename] = self._make_entry(folder, filename, stat)
+                self._pending.append((folder, filename))
+                changed = True
+            self._dir_mtimes[folder] = dir_mtime
+            if changed:
+                self._invalidate_locked(folder)
+
+    def _make_entry(self, folder, filename, stat):
+        entry = {
+            'filename': filename,
+            'path': f'/assets/{folder}/{filename}',
+            'ext': filename.rsplit('.', 1)[-1].lower(),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': self.store.lookup_hash(f'{folder}/{filename}') if self.store else None,
+            '_mtime_ns': stat.st_mtime_ns,
+        }
+        field = METADATA_PROBES.get(folder, (None, None))[0]
+        if field is not None:
+            entry[field] = None
+        return entry
+
+    def _probe(self, folder, filename):
+        """计算一个文件的时长/页数和哈希（在锁外执行）"""
+        with self._lock:
+            entry = self._entries[folder].get(filename)
+            if entry is None:
+                return
+            snapshot = dict(entry)
+
+        path = os.path.join(self.root, folder, filename)
+        updates = {}
+        try:
+            field, probe = METADATA_PROBES.get(folder, (None, None))
+            if probe is not None and snapshot.get(field) is None:
+                updates[field] = probe(path)
+            if snapshot['sha256'] is None and self.hash_files:
+                updates['sha256'] = hash_file(path)
+        except OSError as e:
+            print(f"[AssetIndex] 探测 {folder}/{filename} 失败: {e}")
+            return
+
+        with self._lock:
+            entry = self._entries[folder].get(filename)
+            # 探测期间文件被替换时丢弃结果，等待下一次扫描
+            if entry is None or entry['_mtime_ns'] != snapshot['_mtime_ns']:
+                return
+            entry.update(updates)
+            self._invalidate_locked(folder)
+
+    def _enqueue(self, folder, filename):
+        with self._lock:
+            self._pending.append((folder, filename))
+        self._wakeup.set()
+
+    def _invalidate_locked(self, folder):
+        self._generations[folder] += 1
+        for key in [key for key in self._sorted_cache if key[0] == folder]:
+            del self._sorted_cache[key]
+
+    def _sorted_locked(self, folder, sort, reverse):
+        """返回按指定字段排序的条目列表（按目录版本缓存）"""
+        key = (folder, sort, reverse)
+        entries = self._sorted_cache.get(key)
+        if entries is None:
+            values = self._entries[folder].values()
+            if sort == 'name':
+                entries = sorted(values, key=lambda e: e['filename'].lower(), reverse=reverse)
+            else:
+                entries = sorted(values, key=lambda e: (e[sort], e['filename'].lower()), reverse=reverse)
+            entries = [{k: v for k, v in entry.items() if not k.startswith('_')} for entry in entries]
+            self._sorted_cache[key] = entries
+        return entries
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+资源文件流式传输模块
+==========================================
+功能：为上传的视频和PPT提供支持HTTP Range（206）的文件传输
+- ETag / Last-Modified 校验，未修改时返回304
+- If-Range 校验，文件已变化时退回完整响应
+- WSGI服务器提供 wsgi.file_wrapper 时（如gunicorn、waitress）交由服务器以sendfile零拷贝发送，
+  否则按大块流式读取，不会把整个文件读入内存
+"""
+
+import mimetypes
+import os
+from datetime import datetime, timezone
+
+from flask import Response
+from werkzeug.datastructures import ContentRange
+from werkzeug.exceptions import NotFound
+from werkzeug.http import is_resource_modified
+from werkzeug.security import safe_join
+
+
+DEFAULT_BLOCK_SIZE = 1 << 20  # 回退读取时的块大小：1MB
+
+
+def send_asset(request, directory, filename, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    发送资源文件
+
+    Args:
+        request: 当前Flask请求
+        directory: 资源根目录
+        filename: 相对路径
+        block_size: 无 wsgi.file_wrapper 时每次读取的字节数
+
+    Returns:
+        Response: 200 / 206 / 304 / 416 响应
+
+    Raises:
+        NotFound: 文件不存在或路径越界
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = f'{stat.st_mtime_ns:x}-{size:x}'
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+
+    response = Response(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+                        direct_passthrough=True)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.accept_ranges = 'bytes'
+    # 允许缓存，但每次使用前需用ETag重新校验（同名文件可能被重新上传）
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+
+    # 条件请求：If-None-Match / If-Modified-Since
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response.status_code = 304
+        return response
+
+    start, stop = 0, size
+    if request.range is not None and _if_range_matches(request, etag, last_modified):
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            response.status_code = 416
+            response.content_range = ContentRange('bytes', None, None, size)
+            return response
+        start, stop = byte_range
+        response.status_code = 206
+        response.content_range = ContentRange('bytes', start, stop, size)
+
+    length = stop - start
+    response.content_length = length
+    if request.method == 'HEAD' or length == 0:
+        return response
+
+    f = open(path, 'rb')
+    f.seek(start)
+    file_wrapper = request.environ.get('wsgi.file_wrapper')
+    if file_wrapper is not None:
+        # 服务器从文件当前位置起按 Content-Length 发送（sendfile零拷贝）
+        response.response = file_wrapper(f, block_size)
+    else:
+        response.response = _iter_file(f, length, block_size)
+    return response
+
+
+def _if_range_matches(request, etag, last_modified):
+    """If-Range 不存在或与当前文件一致时返回True，此时才按Range返回部分内容"""
+    if_range = request.if_range
+    if if_range.etag is not None:
+        return if_range.etag == etag
+    if if_range.date is not None:
+        return last_modified <= if_range.date
+    return True
+
+
+def _iter_file(f, length, block_size):
+    """按块读取文件的指定长度"""
+    try:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(block_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+帧调度模块（异步服务模式）
+==========================================
+功能：为每个会话维护有界的推理队列，在工作线程池中按顺序处理帧
+当新帧到达而旧帧尚未开始处理时，丢弃旧帧并通知客户端，
+使过载时的实时延迟保持稳定，而不是无限增长
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 丢弃原因
+DROP_SUPERSEDED = 'superseded'      # 被同一会话更新的帧取代
+DROP_OUT_OF_ORDER = 'out_of_order'  # frame_id 不大于已到达的帧
+DROP_OVERLOADED = 'overloaded'      # 全局待处理帧数达到上限
+DROP_TIMEOUT = 'timeout'            # 等待超时，尚未开始处理
+
+
+class FrameJob:
+    """单帧处理任务"""
+
+    def __init__(self, session_id, fn, frame_id=None):
+        self.session_id = session_id
+        self.frame_id = frame_id
+        self.fn = fn
+        self.status = 'queued'  # queued | running | done | dropped | error
+        self.drop_reason = None
+        self.result = None
+        self.error = None
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self._event = threading.Event()
+
+    def wait(self, timeout=None):
+        """等待任务结束（完成、出错或被丢弃），返回是否在超时前结束"""
+        return self._event.wait(timeout)
+
+    @property
+    def queue_wait_ms(self):
+        """从提交到开始处理的排队时间（毫秒）"""
+        end = self.started_at or self.finished_at or time.perf_counter()
+        return round((end - self.submitted_at) * 1000, 2)
+
+    def _run(self):
+        self.started_at = time.perf_counter()
+        try:
+            self.result = self.fn()
+            self.status = 'done'
+        except Exception as e:
+            self.error = e
+            self.status = 'error'
+        self.finished_at = time.perf_counter()
+        self._event.set()
+
+    def _drop(self, reason):
+        self.status = 'dropped'
+        self.drop_reason = reason
+        self.finished_at = time.perf_counter()
+        self._event.set()
+
+
+class _SessionQueue:
+    """单个会话的待处理队列"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.pending = deque()
+        self.running = False
+        self.last_frame_id = None
+        # 已被 forget() 但仍有帧在处理中，处理结束后移除
+        self.forgotten = False
+
+
+class FrameScheduler:
+    """帧调度器"""
+
+    def __init__(self, max_queue_size=1, max_workers=4, max_pending=64):
+        """
+        初始化帧调度器
+
+        Args:
+            max_queue_size: 每个会话最多排队的帧数（不含正在处理的帧），超出时丢弃最旧的帧
+            max_workers: 推理工作线程数（同一会话的帧始终串行处理）
+            max_pending: 全局待处理帧数上限，超出时直接拒绝新帧
+        """
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix='frame-worker')
+        self._queues = {}
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'submitted': 0,
+            'processed': 0,
+            'errors': 0,
+            'dropped': {
+                DROP_SUPERSEDED: 0,
+                DROP_OUT_OF_ORDER: 0,
+                DROP_OVERLOADED: 0,
+                DROP_TIMEOUT: 0,
+            },
+        }
+
+    def submit(self, session_id, fn, frame_id=None):
+        """
+        提交一帧到会话队列
+
+        Args:
+            session_id: 会话ID
+            fn: 处理函数（无参数），返回值保存在 job.result
+            frame_id: 可选的单调递增帧编号，用于识别乱序到达的旧帧
+
+        Returns:
+            FrameJob: 可能已被立即丢弃（status == 'dropped'）
+        """
+        job = FrameJob(session_id, fn, frame_id)
+        with self._lock:
+            self.stats['submitted'] += 1
+            queue = self._queues.get(session_id)
+            if queue is None:
+                queue = self._queues[session_id] = _SessionQueue(session_id)
+            queue.forgotten = False
+
+            if frame_id is not None:
+                if queue.last_frame_id is not None and frame_id <= queue.last_frame_id:
+                    self._drop_locked(job, DROP_OUT_OF_ORDER)
+                    return job
+                queue.last_frame_id = frame_id
+
+            # 新帧优先：先淘汰本会话中尚未开始的旧帧，再检查全局上限
+            while len(queue.pending) >= self.max_queue_size:
+                self._pending_total -= 1
+                self._drop_locked(queue.pending.popleft(), DROP_SUPERSEDED)
+
+            if self._pending_total >= self.max_pending:
+                self._drop_locked(job, DROP_OVERLOADED)
+                return job
+
+            queue.pending.append(job)
+            self._pending_total += 1
+            if not queue.running:
+                queue.running = True
+                self.executor.submit(self._drain, queue)
+        return job
+
+    def cancel(self, job):
+        """取消尚未开始处理的任务，返回是否成功取消"""
+        with self._lock:
+            queue = self._queues.get(job.session_id)
+            if queue is None or job.status != 'queued' or job not in queue.pending:
+                return False
+            queue.pending.remove(job)
+            self._pending_total -= 1
+            self._drop_locked(job, DROP_TIMEOUT)
+            return True
+
+    def queue_depth(self, session_id):
+        """返回会话当前排队的帧数（不含正在处理的帧）"""
+        with self._lock:
+            queue = self._queues.get(session_id)
+            return len(queue.pending) if queue is not None else 0
+
+    def forget(self, session_id):
+        """丢弃会话的所有排队帧及帧编号记录"""
+        with self._lock:
+            queue = self._queues.get(session_id)
+            if queue is None:
+                return
+            while queue.pending:
+                self._pending_total -= 1
+                self._drop_locked(queue.pending.popleft(), DROP_SUPERSEDED)
+            queue.last_frame_id = None
+            # 仍在处理中的队列暂时保留（保证同一会话不会被两个工作线程同时处理），处理结束后移除
+            if queue.running:
+                queue.forgotten = True
+            else:
+                del self._queues[session_id]
+
+    def get_stats(self):
+        """返回调度统计信息"""
+        with self._lock:
+            return {
+                'max_queue_size': self.max_queue_size,
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending_total,
+                'sessions': len(self._queues),
+                'submitted': self.stats['submitted'],
+                'processed': self.stats['processed'],
+                'errors': self.stats['errors'],
+                'dropped': dict(self.stats['dropped']),
+            }
+
+    def _drain(self, queue):
+        """工作线程：按顺序处理一个会话的队列直到为空"""
+        while True:
+            with self._lock:
+                if not queue.pending:
+                    queue.running = False
+                    if queue.forgotten and self._queues.get(queue.session_id) is queue:
+                        del self._queues[queue.session_id]
+                    return
+                job = queue.pending.popleft()
+                self._pending_total -= 1
+                job.status = 'running'
+            job._run()
+            with self._lock:
+                if job.status == 'error':
+                    self.stats['errors'] += 1
+                else:
+                    self.stats['processed'] += 1
+
+    def _drop_locked(self, job, reason):
+        self.stats['dropped'][reason] += 1
+        job._drop(reason)
+
+    def shutdown(self):
+        """关闭工作线程池"""
+        self.executor.shutdown(wait=False)
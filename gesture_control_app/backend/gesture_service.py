@@ -10,42 +10,59 @@
 import cv2 as cv
 import numpy as np
 import mediapipe as mp
-from collections import deque, Counter
 import copy
 import itertools
 import sys
 import os
+import time
+import contextlib
 
 # 添加项目根目录到系统路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
-from model import KeyPointClassifier, PointHistoryClassifier
+from model import (CascadeKeyPointClassifier, KeyPointClassifier, PointHistoryClassifier,
+                   StreamingPointHistoryRecognizer)
+from utils import ConfidenceVoter, LandmarkRecorder, LandmarkSmoother, RuntimeConfig
+
+NULL_SPAN = contextlib.nullcontext()
 
 
 class GestureRecognitionService:
     """手势识别服务类"""
     
-    def __init__(self, static_model_path=None, dynamic_model_path=None):
+    def __init__(self, static_model_path=None, dynamic_model_path=None,
+                 keypoint_classifier=None, point_history_classifier=None, tracer=None,
+                 smoother=None, dynamic_recognizer=None, dynamic_options=None,
+                 static_voter=None, static_cascade=None, runtime=None):
         """
         初始化手势识别服务
         
         Args:
             static_model_path: 静态手势模型路径
             dynamic_model_path: 动态手势模型路径
+            keypoint_classifier: 已加载的静态手势分类器（多会话共享模型时传入）
+            point_history_classifier: 已加载的动态手势分类器（多会话共享模型时传入）
+            tracer: 时间线记录器（utils.TraceRecorder），为None时不记录
+            smoother: 关键点平滑器（utils.LandmarkSmoother），默认使用One Euro滤波
+            dynamic_recognizer: 流式动态手势识别器（model.StreamingPointHistoryRecognizer）
+            dynamic_options: 未传入 dynamic_recognizer 时创建识别器的参数（如 {'stride': 2}），
+                默认窗口16帧、每帧推理
+            static_voter: 静态手势的置信度加权投票器（utils.ConfidenceVoter），默认窗口16帧
+            static_cascade: 未传入 keypoint_classifier 时启用级联分类的参数
+                （如 {'model_path': 大模型路径, 'threshold': 0.8}），None 表示只使用单个模型
+            runtime: 运行时配置（utils.RuntimeConfig）：新建分类器时的TFLite线程数、XNNPACK、
+                解释器池大小，以及MediaPipe Hands的模型复杂度和置信度阈值，默认使用内置默认值
         """
         # 获取项目根目录（向上两级）
         current_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.abspath(os.path.join(current_dir, '../..'))
         
-        # 初始化MediaPipe Hands（优化参数以提高稳定性）
+        self.runtime = runtime if runtime is not None else RuntimeConfig()
+        classifier_options = self.runtime.classifier_options()
+        
+        # MediaPipe Hands 在首次处理图像时才创建，仅回放关键点时不产生检测开销
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,  # 视频流模式，启用tracking
-            max_num_hands=1,
-            min_detection_confidence=0.7,  # 检测置信度
-            min_tracking_confidence=0.5,   
-            model_complexity=1,             # 模型复杂度：1为默认，平衡速度和准确度
-        )
+        self.hands = None
         
         # 加载分类器模型（使用绝对路径）
         if static_model_path is None:
@@ -53,8 +70,18 @@ class GestureRecognitionService:
         if dynamic_model_path is None:
             dynamic_model_path = os.path.join(project_root, 'model/point_history_classifier/dynamic_gesture_model/NUM_CLASSES_7/point_history_classifier.tflite')
         
-        self.keypoint_classifier = KeyPointClassifier(model_path=static_model_path)
-        self.point_history_classifier = PointHistoryClassifier(model_path=dynamic_model_path)
+        if keypoint_classifier is None:
+            keypoint_classifier = KeyPointClassifier(model_path=static_model_path, **classifier_options)
+            if static_cascade:
+                # 级联：上面的模型逐帧分类，不确定的帧交给大模型复核
+                options = dict(static_cascade)
+                accurate = KeyPointClassifier(model_path=options.pop('model_path'), **classifier_options)
+                keypoint_classifier = CascadeKeyPointClassifier(keypoint_classifier, accurate, **options)
+        if point_history_classifier is None:
+            point_history_classifier = PointHistoryClassifier(model_path=dynamic_model_path,
+                                                              **classifier_options)
+        self.keypoint_classifier = keypoint_classifier
+        self.point_history_classifier = point_history_classifier
         
         # 加载标签（使用绝对路径）
         static_label_path = os.path.join(project_root, 'model/keypoint_classifier/static_gesture_model/avazahedi/keypoint_classifier_label.csv')
@@ -65,13 +92,65 @@ class GestureRecognitionService:
         
         # 初始化历史记录
         self.history_length = 16
-        self.point_history = deque(maxlen=self.history_length)  # 轨迹点历史
-        self.static_gesture_history = deque(maxlen=self.history_length)  # 静态手势ID历史
-        self.dynamic_gesture_history = deque(maxlen=self.history_length)  # 动态手势ID历史
+        # 静态手势：按置信度加权投票，同一手势连续帧的累计置信度足够时提前确认
+        self.static_voter = static_voter if static_voter is not None else ConfidenceVoter(self.history_length)
+        # 级联分类时本会话上一帧的小模型结果（-1 表示没有历史）
+        self._last_fast_id = -1
+        
+        # 动态手势：滑动窗口流式识别（轨迹窗口、推理步长和置信度聚合状态，每个会话独立）
+        if dynamic_recognizer is None:
+            options = {'window': self.history_length}
+            options.update(dynamic_options or {})
+            dynamic_recognizer = StreamingPointHistoryRecognizer(point_history_classifier, **options)
+        self.dynamic_recognizer = dynamic_recognizer
+        
+        # 关键点平滑：在归一化坐标上按帧时间戳滤波，状态为浮点数（每个会话独立）
+        self.smoother = smoother if smoother is not None else LandmarkSmoother()
+        
+        # 关键点录制器（为None时不录制）
+        self.recorder = None
+        
+        # 时间线记录器（为None时不记录，多会话共享同一个记录器）
+        self.tracer = tracer
+    
+    def spawn(self):
+        """
+        创建共享分类器模型的新服务实例
         
-        # 关键点平滑：使用指数移动平均（EMA）- 更低延迟，更快响应
-        self.prev_landmarks = None  # 前一帧的关键点
-        self.ema_alpha = 0.5  # EMA平滑系数：0.5平衡平滑度和响应速度
+        新实例拥有独立的MediaPipe跟踪状态和历史记录，用于多会话场景
+        """
+        return GestureRecognitionService(
+            keypoint_classifier=self.keypoint_classifier,
+            point_history_classifier=self.point_history_classifier,
+            tracer=self.tracer,
+            smoother=self.smoother.spawn(),
+            dynamic_recognizer=self.dynamic_recognizer.spawn(),
+            static_voter=self.static_voter.spawn(),
+            runtime=self.runtime,
+        )
+    
+    def _get_hands(self):
+        """获取MediaPipe Hands实例（首次调用时创建）"""
+        if self.hands is None:
+            # 初始化MediaPipe Hands（模型复杂度和检测/跟踪置信度来自运行时配置）
+            self.hands = self.mp_hands.Hands(
+                static_image_mode=False,  # 视频流模式，启用tracking
+                max_num_hands=1,
+                **self.runtime.hands_options()
+            )
+        return self.hands
+    
+    def close(self):
+        """释放MediaPipe Hands的图资源（会话关闭时调用，之后再处理帧会重新创建）"""
+        if self.hands is not None:
+            self.hands.close()
+            self.hands = None
+    
+    def _span(self, name, frame=None):
+        """返回时间线阶段计时上下文，未启用记录时为空上下文"""
+        if self.tracer is None:
+            return NULL_SPAN
+        return self.tracer.span(name, frame)
     
     def _load_labels(self, label_path):
         """加载标签文件"""
@@ -79,23 +158,264 @@ class GestureRecognitionService:
             labels = [line.strip() for line in f if line.strip()]
         return labels
     
-    def process_frame(self, image):
+    def process_frame(self, image, timestamp=None):
         """
         处理单帧图像，返回手势识别结果
         
         Args:
             image: BGR格式的图像（前端已经翻转，无需再flip）
+            timestamp: 帧时间戳（秒），默认为当前时间
         
         Returns:
             dict: 包含识别结果的字典
         """
+        frame = self.tracer.next_frame() if self.tracer is not None else None
+        with self._span('process_frame', frame):
+            with self._span('detect', frame):
+                landmarks, handedness = self._detect(image)
+            with self._span('classify', frame):
+                return self.process_landmarks(landmarks, handedness, image.shape[1],
+                                              image.shape[0], timestamp)
+    
+    def process_landmarks(self, landmarks, handedness, image_width, image_height, timestamp=None):
+        """
+        对已检测到的关键点执行后处理（平滑、预处理、分类、投票）
+        
+        与 process_frame 共享同一套会话状态，可用于回放录制数据或客户端检测的关键点
+        
+        Args:
+            landmarks: MediaPipe归一化关键点，形状 (21, 3) 或 (21, 2)，未检测到手时为None
+            handedness: 'Left' / 'Right'
+            image_width: 图像宽度（像素）
+            image_height: 图像高度（像素）
+            timestamp: 帧时间戳（秒）
+        
+        Returns:
+            dict: 包含识别结果的字典
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        
+        if self.recorder is not None:
+            self.recorder.write_frame(timestamp, image_width, image_height,
+                                      landmarks, handedness)
+        
+        if landmarks is None:
+            self.dynamic_recognizer.push([0, 0], image_width, image_height, infer=False)
+            return self._empty_response()
+        
+        # 计算关键点、边界框，平滑并预处理
+        landmark_list, brect, pre_processed_landmark = self._prepare_hand(
+            landmarks, image_width, image_height, timestamp)
+        
+        # 静态手势识别（保留各类别概率用于加权投票）
+        static_scores = self._predict_static_scores([pre_processed_landmark])[0]
+        static_id = int(np.argmax(static_scores))
+        
+        # 更新轨迹窗口，按步长推理并聚合动态手势
+        dynamic = self.dynamic_recognizer.update(
+            self._trajectory_point(static_id, landmark_list), image_width, image_height)
+        
+        return self._build_response(static_id, static_scores, dynamic, landmark_list, brect, handedness)
+    
+    def process_batch(self, images, timestamps=None):
+        """
+        按顺序处理同一会话的多帧图像
+        
+        检测按帧顺序使用MediaPipe跟踪模式逐帧执行，两个分类器分别对整批样本只推理一次，
+        结果与逐帧调用 process_frame 一致
+        
+        Args:
+            images: BGR图像列表（按时间顺序）
+            timestamps: 每帧时间戳（秒），可选
+        
+        Returns:
+            list: 每帧的识别结果字典
+        """
+        frames = []
+        for image in images:
+            with self._span('detect'):
+                landmarks, handedness = self._detect(image)
+            frames.append((landmarks, handedness, image.shape[1], image.shape[0]))
+        with self._span('classify_batch'):
+            return self.process_landmarks_batch(frames, timestamps)
+    
+    def process_landmarks_batch(self, frames, timestamps=None):
+        """
+        批量执行关键点后处理
+        
+        Args:
+            frames: (landmarks, handedness, image_width, image_height) 元组列表（按时间顺序）
+            timestamps: 每帧时间戳（秒），可选
+        
+        Returns:
+            list: 每帧的识别结果字典
+        """
+        if timestamps is None:
+            now = time.time()
+            timestamps = [now] * len(frames)
+        
+        # 第一步：逐帧平滑和预处理（平滑依赖前一帧状态，必须按顺序执行）
+        prepared = []
+        for (landmarks, handedness, image_width, image_height), timestamp in zip(frames, timestamps):
+            if self.recorder is not None:
+                self.recorder.write_frame(timestamp, image_width, image_height,
+                                          landmarks, handedness)
+            if landmarks is None:
+                prepared.append(None)
+            else:
+                prepared.append(self._prepare_hand(landmarks, image_width, image_height, timestamp))
+        
+        # 第二步：整批静态手势分类
+        hand_indices = [index for index, item in enumerate(prepared) if item is not None]
+        static_scores = self._predict_static_scores(
+            [prepared[index][2] for index in hand_indices])
+        static_scores_by_frame = dict(zip(hand_indices, static_scores))
+        static_by_frame = dict(zip(hand_indices, np.argmax(static_scores, axis=1).tolist()))
+        
+        # 第三步：按顺序推进轨迹窗口，收集按步长需要推理的动态手势输入
+        dynamic_inputs = {}
+        for index, item in enumerate(prepared):
+            image_width, image_height = frames[index][2], frames[index][3]
+            if item is None:
+                self.dynamic_recognizer.push([0, 0], image_width, image_height, infer=False)
+                continue
+            inputs = self.dynamic_recognizer.push(
+                self._trajectory_point(static_by_frame[index], item[0]), image_width, image_height)
+            if inputs is not None:
+                dynamic_inputs[index] = inputs
+        
+        # 第四步：整批动态手势推理
+        dynamic_indices = list(dynamic_inputs)
+        dynamic_scores = self.point_history_classifier.predict_scores(
+            [dynamic_inputs[index] for index in dynamic_indices])
+        scores_by_frame = dict(zip(dynamic_indices, dynamic_scores))
+        
+        # 第五步：按顺序聚合动态手势并生成结果
+        results = []
+        for index, item in enumerate(prepared):
+            if item is None:
+                results.append(self._empty_response())
+                continue
+            landmark_list, brect, _ = item
+            dynamic = self.dynamic_recognizer.observe(scores_by_frame.get(index))
+            results.append(self._build_response(
+                static_by_frame[index], static_scores_by_frame[index], dynamic,
+                landmark_list, brect, frames[index][1]))
+        return results
+    
+    def get_interpreter_pool_stats(self):
+        """
+        各模型解释器池的借用与争用统计（多会话共享分类器，统计为全部会话的合计）
+        
+        Returns:
+            dict: {'static': {...}, 'dynamic': {...}}，级联分类时另有 'static_accurate'
+        """
+        classifiers = {'static': self.keypoint_classifier, 'dynamic': self.point_history_classifier}
+        if isinstance(self.keypoint_classifier, CascadeKeyPointClassifier):
+            classifiers['static'] = self.keypoint_classifier.fast
+            classifiers['static_accurate'] = self.keypoint_classifier.accurate
+        return {name: classifier.pool.get_stats() for name, classifier in classifiers.items()
+                if hasattr(classifier, 'pool')}
+    
+    def _predict_static_scores(self, landmark_lists):
+        """
+        静态手势批量推理，返回各类别概率 (N, C)
+        
+        级联分类器共享于多个会话，上一帧的小模型结果保存在本会话中
+        """
+        if isinstance(self.keypoint_classifier, CascadeKeyPointClassifier):
+            scores, fast_ids = self.keypoint_classifier.cascade(landmark_lists, self._last_fast_id)
+            if len(fast_ids):
+                self._last_fast_id = int(fast_ids[-1])
+            return scores
+        return self.keypoint_classifier.predict_scores(landmark_lists)
+    
+    def _detect(self, image):
+        """
+        使用MediaPipe检测手部关键点
+        
+        Returns:
+            tuple: (归一化关键点 (21, 3) 或 None, 左右手标签或 None)
+        """
         # 转换图像格式（前端已经做了flip，这里直接处理）
         image_rgb = cv.cvtColor(image, cv.COLOR_BGR2RGB)
         image_rgb.flags.writeable = False
-        results = self.hands.process(image_rgb)
+        results = self._get_hands().process(image_rgb)
         image_rgb.flags.writeable = True
         
-        response = {
+        if results.multi_hand_landmarks is None:
+            return None, None
+        
+        # 只处理第一只检测到的手
+        hand_landmarks = results.multi_hand_landmarks[0]
+        handedness = results.multi_handedness[0].classification[0].label
+        landmarks = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark],
+                             dtype=np.float32)
+        return landmarks, handedness
+    
+    def _prepare_hand(self, landmarks, image_width, image_height, timestamp=None):
+        """
+        计算像素坐标、边界框，平滑关键点并预处理
+        
+        Returns:
+            tuple: (平滑后的关键点列表, 边界框, 预处理后的关键点向量)
+        """
+        # 计算关键点像素坐标
+        landmark_list = self._calc_landmark_list(landmarks, image_width, image_height)
+        
+        # 计算边界框
+        brect = self._calc_bounding_rect(landmark_list)
+        
+        # 平滑关键点坐标（减少抖动）
+        landmark_list = self._smooth_landmarks(landmarks, image_width, image_height, timestamp)
+        
+        # 预处理
+        pre_processed_landmark = self._pre_process_landmark(landmark_list)
+        return landmark_list, brect, pre_processed_landmark
+    
+    def _trajectory_point(self, static_id, landmark_list):
+        """本帧加入轨迹的点：Pointer手势时为食指指尖，否则为 [0, 0]（使用原始static_id而不是平滑后的）"""
+        if static_id == 2:  # Pointer
+            return landmark_list[8]  # 食指指尖
+        return [0, 0]
+    
+    def _build_response(self, static_id, static_scores, dynamic, landmark_list, brect, handedness):
+        """
+        将本帧静态手势概率加入加权投票，生成识别结果
+        
+        Args:
+            static_id: 本帧静态手势ID（未投票）
+            static_scores: 本帧静态手势各类别概率
+            dynamic: 流式识别器输出的 (动态手势ID, 置信度)
+        """
+        # 置信度加权投票，代替逐帧ID的多数投票
+        voted_static_id, static_confidence = self.static_voter.update(static_scores)
+        static_gesture = self.static_labels[voted_static_id] if voted_static_id < len(self.static_labels) else "Unknown"
+        
+        # 动态手势已由流式识别器按置信度加权聚合，不再做多数投票
+        dynamic_id, dynamic_confidence = dynamic
+        dynamic_gesture = self.dynamic_labels[dynamic_id] if dynamic_id < len(self.dynamic_labels) else "Unknown"
+        
+        return {
+            'hand_detected': True,
+            'static_gesture': static_gesture,
+            'static_gesture_id': int(static_id),
+            'static_confidence': round(static_confidence, 4),
+            'static_scores': np.round(static_scores.astype(np.float64), 4).tolist(),
+            'dynamic_gesture': dynamic_gesture,
+            'dynamic_gesture_id': int(dynamic_id),
+            'dynamic_confidence': round(dynamic_confidence, 4),
+            'dynamic_scores': (np.round(self.dynamic_recognizer.scores.astype(np.float64), 4).tolist()
+                               if self.dynamic_recognizer.scores is not None else None),
+            'landmarks': landmark_list,
+            'bounding_rect': brect,
+            'handedness': handedness
+        }
+    
+    def _empty_response(self):
+        """未检测到手时的识别结果"""
+        return {
             'hand_detected': False,
             'static_gesture': None,
             'static_gesture_id': -1,
@@ -104,67 +424,21 @@ class GestureRecognitionService:
             'landmarks': None,
             'bounding_rect': None
         }
-        
-        if results.multi_hand_landmarks is not None:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                                  results.multi_handedness):
-                # 计算边界框
-                brect = self._calc_bounding_rect(image, hand_landmarks)
-                
-                # 计算关键点
-                landmark_list = self._calc_landmark_list(image, hand_landmarks)
-                
-                # 平滑关键点坐标（减少抖动）
-                landmark_list = self._smooth_landmarks(landmark_list)
-                
-                # 预处理
-                pre_processed_landmark = self._pre_process_landmark(landmark_list)
-                pre_processed_point_history = self._pre_process_point_history(
-                    image, self.point_history)
-                
-                # 静态手势识别
-                static_id = self.keypoint_classifier(pre_processed_landmark)
-                # 将当前帧的静态手势ID加入历史缓冲区
-                self.static_gesture_history.append(static_id)
-                # 使用历史缓冲区中出现最多的ID作为平滑后的结果
-                if len(self.static_gesture_history) > 0:
-                    most_common_static_id = Counter(self.static_gesture_history).most_common()[0][0]
-                    static_gesture = self.static_labels[most_common_static_id] if most_common_static_id < len(self.static_labels) else "Unknown"
-                else:
-                    static_gesture = self.static_labels[static_id] if static_id < len(self.static_labels) else "Unknown"
-                
-                # 更新轨迹历史（仅在Pointer手势时记录）- 使用原始static_id而不是平滑后的
-                if static_id == 2:  # Pointer
-                    self.point_history.append(landmark_list[8])  # 食指指尖
-                else:
-                    self.point_history.append([0, 0])
-                
-                # 动态手势识别
-                dynamic_id = 0
-                if len(pre_processed_point_history) == (self.history_length * 2):
-                    dynamic_id = self.point_history_classifier(pre_processed_point_history)
-                
-                # 将当前帧的动态手势ID加入历史缓冲区
-                self.dynamic_gesture_history.append(dynamic_id)
-                # 使用历史缓冲区中出现最多的ID作为平滑后的结果（参照app.py line 158-159）
-                most_common_dynamic_id = Counter(self.dynamic_gesture_history).most_common()[0][0]
-                dynamic_gesture = self.dynamic_labels[most_common_dynamic_id] if most_common_dynamic_id < len(self.dynamic_labels) else "Unknown"
-                
-                response = {
-                    'hand_detected': True,
-                    'static_gesture': static_gesture,
-                    'static_gesture_id': int(static_id),
-                    'dynamic_gesture': dynamic_gesture,
-                    'dynamic_gesture_id': int(most_common_dynamic_id),
-                    'landmarks': landmark_list,
-                    'bounding_rect': brect,
-                    'handedness': handedness.classification[0].label
-                }
-                break  # 只处理第一只检测到的手
-        else:
-            self.point_history.append([0, 0])
-        
-        return response
+    
+    def start_recording(self, path):
+        """开始将每帧的原始关键点录制到二进制日志"""
+        self.stop_recording()
+        self.recorder = LandmarkRecorder(path)
+        return self.recorder.path
+    
+    def stop_recording(self):
+        """停止录制，返回已录制的帧数"""
+        if self.recorder is None:
+            return 0
+        frame_count = self.recorder.frame_count
+        self.recorder.close()
+        self.recorder = None
+        return frame_count
     
     def draw_landmarks_on_image(self, image, landmarks):
         """在图像上绘制手部关键点"""
@@ -208,68 +482,35 @@ class GestureRecognitionService:
         
         return image
     
-    def _calc_bounding_rect(self, image, landmarks):
+    def _calc_bounding_rect(self, landmark_list):
         """计算手部边界框"""
-        image_width, image_height = image.shape[1], image.shape[0]
-        landmark_array = np.empty((0, 2), int)
-        
-        for landmark in landmarks.landmark:
-            landmark_x = min(int(landmark.x * image_width), image_width - 1)
-            landmark_y = min(int(landmark.y * image_height), image_height - 1)
-            landmark_point = [np.array((landmark_x, landmark_y))]
-            landmark_array = np.append(landmark_array, landmark_point, axis=0)
-        
-        x, y, w, h = cv.boundingRect(landmark_array)
+        x, y, w, h = cv.boundingRect(np.array(landmark_list, dtype=np.int32))
         return [x, y, x + w, y + h]
     
-    def _calc_landmark_list(self, image, landmarks):
-        """计算关键点坐标列表"""
-        image_width, image_height = image.shape[1], image.shape[0]
-        landmark_point = []
-        
-        for landmark in landmarks.landmark:
-            landmark_x = min(int(landmark.x * image_width), image_width - 1)
-            landmark_y = min(int(landmark.y * image_height), image_height - 1)
-            landmark_point.append([landmark_x, landmark_y])
-        
-        return landmark_point
+    def _calc_landmark_list(self, landmarks, image_width, image_height):
+        """将归一化关键点转换为像素坐标列表"""
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        landmark_x = np.minimum((landmarks[:, 0] * image_width).astype(np.int32), image_width - 1)
+        landmark_y = np.minimum((landmarks[:, 1] * image_height).astype(np.int32), image_height - 1)
+        return np.stack([landmark_x, landmark_y], axis=1).tolist()
     
-    def _smooth_landmarks(self, landmark_list):
+    def _smooth_landmarks(self, landmarks, image_width, image_height, timestamp=None):
         """
-        使用指数移动平均（EMA）平滑关键点坐标，减少抖动且延迟更低
+        平滑归一化关键点（One Euro / EMA，见 utils/smoothing.py），再转换为像素坐标
         
-        公式：smoothed = alpha * current + (1 - alpha) * previous
-        - alpha=1: 无平滑，完全跟随当前值
-        - alpha=0: 完全平滑，不响应当前值
-        - alpha=0.5: 平衡点
+        平滑状态保持为浮点数，不会因每帧取整累积误差
         
         Args:
-            landmark_list: 当前帧的关键点列表 [[x1,y1], [x2,y2], ...]
+            landmarks: MediaPipe归一化关键点 (21, 3) 或 (21, 2)
+            image_width: 图像宽度（像素）
+            image_height: 图像高度（像素）
+            timestamp: 帧时间戳（秒）
         
         Returns:
-            平滑后的关键点列表
+            平滑后的关键点像素坐标列表 [[x1,y1], [x2,y2], ...]
         """
-        # 第一帧：直接使用当前值
-        if self.prev_landmarks is None:
-            self.prev_landmarks = landmark_list
-            return landmark_list
-        
-        # EMA平滑
-        smoothed_landmarks = []
-        for point_idx in range(len(landmark_list)):
-            curr_x, curr_y = landmark_list[point_idx]
-            prev_x, prev_y = self.prev_landmarks[point_idx]
-            
-            # 指数移动平均
-            smooth_x = int(self.ema_alpha * curr_x + (1 - self.ema_alpha) * prev_x)
-            smooth_y = int(self.ema_alpha * curr_y + (1 - self.ema_alpha) * prev_y)
-            
-            smoothed_landmarks.append([smooth_x, smooth_y])
-        
-        # 更新前一帧
-        self.prev_landmarks = smoothed_landmarks
-        
-        return smoothed_landmarks
+        smoothed = self.smoother(np.asarray(landmarks)[:, :2], timestamp)
+        return self._calc_landmark_list(smoothed, image_width, image_height)
     
     def _pre_process_landmark(self, landmark_list):
         """预处理关键点坐标"""
@@ -297,29 +538,10 @@ class GestureRecognitionService:
         
         return temp_landmark_list
     
-    def _pre_process_point_history(self, image, point_history):
-        """预处理轨迹历史"""
-        image_width, image_height = image.shape[1], image.shape[0]
-        temp_point_history = copy.deepcopy(point_history)
-        
-        # 转换为相对坐标
-        base_x, base_y = 0, 0
-        for index, point in enumerate(temp_point_history):
-            if index == 0:
-                base_x, base_y = point[0], point[1]
-            
-            temp_point_history[index][0] = (temp_point_history[index][0] - base_x) / image_width if image_width != 0 else 0
-            temp_point_history[index][1] = (temp_point_history[index][1] - base_y) / image_height if image_height != 0 else 0
-        
-        # 展平为一维列表
-        temp_point_history = list(itertools.chain.from_iterable(temp_point_history))
-        
-        return temp_point_history
-    
     def reset_history(self):
         """重置历史记录"""
-        self.point_history.clear()
-        self.static_gesture_history.clear()
-        self.dynamic_gesture_history.clear()
-        self.prev_landmarks = None  # 重置EMA平滑状态
+        self.static_voter.reset()
+        self._last_fast_id = -1
+        self.dynamic_recognizer.reset()
+        self.smoother.reset()  # 重置平滑状态
 
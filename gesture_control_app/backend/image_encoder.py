@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+标注图像编码模块
+==========================================
+功能：绘制并编码带关键点的标注图像
+支持仅返回关键点、JPEG/WebP指定质量、缩小尺寸的预览图
+后端在释放会话锁之后、于请求线程中编码，编码与同一会话下一帧的识别并行
+"""
+
+import base64
+import threading
+import time
+from collections import OrderedDict
+
+import cv2 as cv
+import numpy as np
+
+
+class AnnotatedImageEncoder:
+    """标注图像编码器"""
+
+    # 格式名称 -> (扩展名, 质量参数, MIME类型)
+    FORMATS = {
+        'jpeg': ('.jpg', cv.IMWRITE_JPEG_QUALITY, 'image/jpeg'),
+        'webp': ('.webp', cv.IMWRITE_WEBP_QUALITY, 'image/webp'),
+    }
+    FORMAT_ALIASES = {'jpg': 'jpeg'}
+
+    def __init__(self, draw_fn, default_quality=80, max_cached_sizes=4, max_canvases_per_size=4):
+        """
+        初始化编码器
+
+        Args:
+            draw_fn: 绘制函数，签名为 draw_fn(image, landmarks) -> image
+            default_quality: 默认编码质量（1-100）
+            max_cached_sizes: 最多缓存几种尺寸的预览画布（按最近使用淘汰）
+            max_canvases_per_size: 每种尺寸最多缓存的空闲画布数（约等于同时编码的请求数）
+        """
+        self.draw_fn = draw_fn
+        self.default_quality = default_quality
+        self.max_cached_sizes = max_cached_sizes
+        self.max_canvases_per_size = max_canvases_per_size
+        # 空闲的预览画布：形状 -> [画布]，按尺寸复用避免每帧分配；
+        # preview_width 由客户端决定，尺寸种类按LRU限制，内存有上限
+        self._canvases = OrderedDict()
+        self._canvas_lock = threading.Lock()
+
+    def parse_options(self, data):
+        """
+        从请求数据中解析编码选项
+
+        Args:
+            data: 请求JSON字典，支持以下字段：
+                draw_landmarks: 是否返回标注图像（兼容旧参数）
+                image_format: 'none' | 'jpeg' | 'webp'
+                image_quality: 编码质量（1-100）
+                preview_width: 预览图最大宽度（像素），0表示原尺寸
+
+        Returns:
+            dict: {'format', 'quality', 'preview_width'}
+
+        Raises:
+            ValueError: 参数不合法
+        """
+        image_format = data.get('image_format')
+        if image_format is None:
+            image_format = 'jpeg' if data.get('draw_landmarks', False) else 'none'
+        image_format = str(image_format).lower()
+        image_format = self.FORMAT_ALIASES.get(image_format, image_format)
+        if image_format != 'none' and image_format not in self.FORMATS:
+            raise ValueError(f'不支持的图像格式: {image_format}')
+
+        quality = int(data.get('image_quality', self.default_quality))
+        if not 1 <= quality <= 100:
+            raise ValueError('image_quality 必须在 1-100 之间')
+
+        preview_width = int(data.get('preview_width', 0) or 0)
+        if preview_width < 0:
+            raise ValueError('preview_width 不能为负数')
+
+        return {
+            'format': image_format,
+            'quality': quality,
+            'preview_width': preview_width,
+        }
+
+    def encode(self, image, landmarks, options):
+        """
+        绘制关键点并编码图像
+
+        注意：全尺寸编码会直接在 image 上绘制，调用方之后不应再使用该图像
+
+        Returns:
+            dict: annotated_image（data URL）及 annotated_image_info（格式、尺寸、字节数、耗时）
+        """
+        start = time.perf_counter()
+        ext, quality_flag, mime = self.FORMATS[options['format']]
+
+        canvas, scale = self._prepare_canvas(image, options['preview_width'])
+        try:
+            if scale != 1.0:
+                landmarks = [[int(x * scale), int(y * scale)] for x, y in landmarks]
+            self.draw_fn(canvas, landmarks)
+            ok, buffer = cv.imencode(ext, canvas, [quality_flag, options['quality']])
+        finally:
+            if canvas is not image:
+                self._release_canvas(canvas)
+        if not ok:
+            raise RuntimeError(f'图像编码失败: {options["format"]}')
+        image_base64 = base64.b64encode(buffer).decode('ascii')
+
+        return {
+            'annotated_image': f'data:{mime};base64,{image_base64}',
+            'annotated_image_info': {
+                'format': options['format'],
+                'quality': options['quality'],
+                'width': canvas.shape[1],
+                'height': canvas.shape[0],
+                'bytes': int(buffer.size),
+                'encode_ms': round((time.perf_counter() - start) * 1000, 2),
+            }
+        }
+
+    def _prepare_canvas(self, image, preview_width):
+        """返回用于绘制的画布及缩放比例，预览图使用缓存的空闲画布（用完后由 encode 归还）"""
+        height, width = image.shape[:2]
+        if preview_width <= 0 or preview_width >= width:
+            return image, 1.0
+
+        scale = preview_width / width
+        size = (preview_width, max(1, int(round(height * scale))))
+        shape = (size[1], size[0]) + image.shape[2:]
+        canvas = None
+        with self._canvas_lock:
+            free = self._canvases.get(shape)
+            if free:
+                self._canvases.move_to_end(shape)
+                canvas = free.pop()
+        if canvas is None or canvas.dtype != image.dtype:
+            canvas = np.empty(shape, dtype=image.dtype)
+        cv.resize(image, size, dst=canvas, interpolation=cv.INTER_AREA)
+        return canvas, scale
+
+    def _release_canvas(self, canvas):
+        """归还预览画布，超出缓存上限时丢弃（最久未使用的尺寸先淘汰）"""
+        with self._canvas_lock:
+            free = self._canvases.setdefault(canvas.shape, [])
+            self._canvases.move_to_end(canvas.shape)
+            if len(free) < self.max_canvases_per_size:
+                free.append(canvas)
+            while len(self._canvases) > self.max_cached_sizes:
+                self._canvases.popitem(last=False)
+
+    def cached_canvas_count(self):
+        """当前缓存的空闲画布数"""
+        with self._canvas_lock:
+            return sum(len(free) for free in self._canvases.values())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+识别会话管理模块
+==========================================
+功能：为每个客户端会话维护独立的识别状态（MediaPipe跟踪、历史记录、平滑状态）
+分类器模型在所有会话之间共享
+"""
+
+import threading
+import time
+
+
+DEFAULT_SESSION_ID = 'default'
+
+
+class GestureSession:
+    """单个识别会话"""
+
+    def __init__(self, session_id, service):
+        self.session_id = session_id
+        self.service = service
+        # 串行化同一会话的帧处理与控制操作（MediaPipe图不支持并发调用）
+        self.lock = threading.Lock()
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.frames_processed = 0
+
+    def touch(self):
+        """更新最近使用时间"""
+        self.last_used = time.time()
+
+
+class SessionManager:
+    """会话管理类"""
+
+    def __init__(self, base_service, max_sessions=32, idle_timeout=300, on_close=None):
+        """
+        初始化会话管理器
+
+        Args:
+            base_service: 默认会话使用的服务实例，新会话通过 base_service.spawn() 创建
+            max_sessions: 最大会话数，超出时淘汰最久未使用的会话
+            idle_timeout: 会话空闲超时（秒）
+            on_close: 会话被淘汰或关闭时的回调 on_close(session)，用于释放会话关联的外部资源
+                      （如调度队列），在会话管理器的锁外调用
+        """
+        self.base_service = base_service
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.on_close = on_close
+        self._sessions = {
+            DEFAULT_SESSION_ID: GestureSession(DEFAULT_SESSION_ID, base_service)
+        }
+        self._lock = threading.Lock()
+
+    def get(self, session_id=None):
+        """
+        获取会话，不存在时创建
+
+        Args:
+            session_id: 会话ID，为空时使用默认会话
+
+        Returns:
+            GestureSession
+        """
+        session_id = str(session_id) if session_id else DEFAULT_SESSION_ID
+        evicted = []
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                evicted = self._evict_locked()
+                session = GestureSession(session_id, self.base_service.spawn())
+                self._sessions[session_id] = session
+                print(f"[SessionManager] 创建会话: {session_id}（当前 {len(self._sessions)} 个）")
+            session.touch()
+        for old_session in evicted:
+            self._close_session(old_session)
+        return session
+
+    def remove(self, session_id):
+        """关闭会话，默认会话只重置状态"""
+        if session_id == DEFAULT_SESSION_ID:
+            # 与正在处理的帧串行，避免重置时投票器、识别器和平滑器的状态被同时修改
+            with self._sessions[DEFAULT_SESSION_ID].lock:
+                self.base_service.reset_history()
+            return True
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._close_session(session)
+        return True
+
+    def list_sessions(self):
+        """返回所有会话的概要信息"""
+        with self._lock:
+            return [{
+                'session_id': session.session_id,
+                'created_at': session.created_at,
+                'last_used': session.last_used,
+                'frames_processed': session.frames_processed,
+            } for session in self._sessions.values()]
+
+    def _evict_locked(self):
+        """
+        淘汰空闲超时的会话，并保证会话数不超过上限（调用方需持有锁）
+
+        Returns:
+            list: 被淘汰的会话，由调用方在释放锁后逐个关闭
+        """
+        now = time.time()
+        evicted = []
+        for session_id, session in list(self._sessions.items()):
+            if session_id != DEFAULT_SESSION_ID and now - session.last_used > self.idle_timeout:
+                evicted.append(self._sessions.pop(session_id))
+
+        while len(self._sessions) >= self.max_sessions:
+            candidates = [s for s in self._sessions.values() if s.session_id != DEFAULT_SESSION_ID]
+            if not candidates:
+                break
+            oldest = min(candidates, key=lambda s: s.last_used)
+            evicted.append(self._sessions.pop(oldest.session_id))
+        return evicted
+
+    def _close_session(self, session):
+        """释放已移除会话的资源：先通知外部清理（丢弃排队帧），再等待进行中的帧结束后关闭MediaPipe"""
+        if self.on_close is not None:
+            self.on_close(session)
+        with session.lock:
+            session.service.close()
+        print(f"[SessionManager] 关闭会话: {session.session_id}")
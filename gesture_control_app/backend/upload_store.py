@@ -0,0 +1,445 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+内容寻址上传存储模块
+==========================================
+功能：上传文件按块写入磁盘并同时计算SHA-256，按内容哈希存储去重；
+对外可见的 assets/videos、assets/presentations 下的文件是指向对象的硬链接。
+支持可续传的分块上传（大视频），以及已存在内容的秒传。
+
+目录结构：
+    assets/.store/objects/ab/abcdef...   内容对象（文件名为SHA-256）
+    assets/.store/tmp/                   写入中的临时文件
+    assets/.store/uploads/<id>.json      分块上传的元信息
+    assets/.store/uploads/<id>.part      分块上传已接收的数据
+    assets/.store/manifest.json          可见文件 -> SHA-256 映射
+
+对象按清单引用计数：可见文件被替换后，不再被任何文件引用的对象立即删除；
+启动时清理清单中已不存在的文件，以及没有任何引用的对象（如进程中断遗留）。
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+
+STORE_DIRNAME = '.store'
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1MB
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadError(Exception):
+    """上传参数或数据错误"""
+
+
+class UploadOffsetError(UploadError):
+    """分块上传的偏移量与已接收的数据不一致"""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+class ContentAddressedStore:
+    """内容寻址存储类"""
+
+    def __init__(self, root, chunk_size=DEFAULT_CHUNK_SIZE, upload_ttl=24 * 3600):
+        """
+        初始化存储
+
+        Args:
+            root: 资源根目录（assets）
+            chunk_size: 流式读写的块大小
+            upload_ttl: 未完成分块上传的保留时间（秒）
+        """
+        self.root = root
+        self.chunk_size = chunk_size
+        self.upload_ttl = upload_ttl
+        self.store_dir = os.path.join(root, STORE_DIRNAME)
+        self.objects_dir = os.path.join(self.store_dir, 'objects')
+        self.tmp_dir = os.path.join(self.store_dir, 'tmp')
+        self.uploads_dir = os.path.join(self.store_dir, 'uploads')
+        self.manifest_path = os.path.join(self.store_dir, 'manifest.json')
+        for directory in (self.objects_dir, self.tmp_dir, self.uploads_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._manifest_loaded = True
+        self._manifest = self._load_manifest()
+        # 已写入（或命中去重）但尚未发布为可见文件的对象，不参与回收
+        self._pinned = Counter()
+        # 进程内的增量哈希状态：upload_id -> (hasher, 已哈希字节数)
+        self._upload_hashers = {}
+        self._upload_locks = {}
+        if self._manifest_loaded:
+            self.collect_garbage()
+
+    # ------------------------------------------------------------------
+    # 对象存储
+    # ------------------------------------------------------------------
+    def object_path(self, sha256):
+        """内容对象路径"""
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def has_object(self, sha256):
+        """判断内容对象是否已存在"""
+        return bool(sha256) and _SHA256_RE.match(sha256) is not None and \
+            os.path.isfile(self.object_path(sha256))
+
+    def object_size(self, sha256):
+        """内容对象的实际大小（字节）"""
+        return os.path.getsize(self.object_path(sha256))
+
+    def is_internal_path(self, path):
+        """判断路径（解析 ./、../ 和符号链接后）是否为存储目录本身或位于其中"""
+        real_path = os.path.normcase(os.path.realpath(path))
+        store_dir = os.path.normcase(os.path.realpath(self.store_dir))
+        return real_path == store_dir or real_path.startswith(store_dir + os.sep)
+
+    def save_stream(self, stream, expected_sha256=None):
+        """
+        将数据流按块写入存储，同时计算SHA-256
+
+        Args:
+            stream: 可读的二进制流
+            expected_sha256: 客户端提供的哈希，不一致时拒绝
+
+        Returns:
+            tuple: (sha256, size, deduplicated)，对象在 link(..., pinned=True) 之前不会被回收
+
+        Raises:
+            UploadError: 哈希校验失败
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            return self._commit_object(tmp_path, hasher.hexdigest(), size, expected_sha256)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def link(self, sha256, folder, filename, pinned=False):
+        """
+        将内容对象发布为可见文件（同名文件被原子替换）
+
+        Args:
+            sha256: 内容哈希
+            folder: 可见目录名（videos / presentations）
+            filename: 安全的文件名
+            pinned: 对象是否由本次 save_stream / 分块上传写入并固定（发布后解除固定）；
+                    秒传等直接引用已有对象的调用不持有固定，不能解除其他上传的固定
+
+        Returns:
+            str: 相对于资源根目录的路径
+
+        Raises:
+            UploadError: 内容对象已不存在（去重检查之后被回收）
+        """
+        target_dir = os.path.join(self.root, folder)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, filename)
+        tmp_target = os.path.join(target_dir, f'.{filename}.{uuid.uuid4().hex}.tmp')
+        relative_path = f'{folder}/{filename}'
+        # 发布与回收在同一把锁下进行，被替换的对象不会在发布途中被删除
+        with self._lock:
+            if pinned:
+                self._unpin_locked(sha256)
+            try:
+                os.link(self.object_path(sha256), tmp_target)
+            except FileNotFoundError:
+                raise UploadError('内容对象不存在，请重新上传')
+            except OSError:
+                # 文件系统不支持硬链接时退回复制
+                shutil.copyfile(self.object_path(sha256), tmp_target)
+            os.replace(tmp_target, target)
+
+            previous = self._manifest.get(relative_path)
+            self._manifest[relative_path] = sha256
+            self._save_manifest_locked()
+            if previous is not None and previous != sha256:
+                self._release_object_locked(previous)
+        return relative_path
+
+    def collect_garbage(self):
+        """
+        回收未被引用的对象：移除清单中已被删除的可见文件，再删除没有任何文件引用的对象
+
+        Returns:
+            dict: stale_entries（移除的清单项数）/ removed_objects / freed_bytes
+        """
+        stale_entries = 0
+        removed_objects = 0
+        freed_bytes = 0
+        with self._lock:
+            for relative_path in list(self._manifest):
+                if not os.path.isfile(os.path.join(self.root, relative_path)):
+                    del self._manifest[relative_path]
+                    stale_entries += 1
+            if stale_entries:
+                self._save_manifest_locked()
+
+            referenced = set(self._manifest.values()) | set(self._pinned)
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                if not os.path.isdir(prefix_dir):
+                    continue
+                for name in os.listdir(prefix_dir):
+                    if name in referenced:
+                        continue
+                    path = os.path.join(prefix_dir, name)
+                    freed_bytes += os.path.getsize(path)
+                    os.remove(path)
+                    removed_objects += 1
+        if stale_entries or removed_objects:
+            print(f"[ContentAddressedStore] 回收 {removed_objects} 个对象（{freed_bytes} 字节），"
+                  f"移除 {stale_entries} 个失效清单项")
+        return {'stale_entries': stale_entries, 'removed_objects': removed_objects,
+                'freed_bytes': freed_bytes}
+
+    def lookup_hash(self, relative_path):
+        """查询可见文件的内容哈希，未通过存储上传的文件返回None"""
+        with self._lock:
+            return self._manifest.get(relative_path)
+
+    # ------------------------------------------------------------------
+    # 分块上传（可续传）
+    # ------------------------------------------------------------------
+    def create_upload(self, folder, filename, size, expected_sha256=None):
+        """
+        创建分块上传任务
+
+        Returns:
+            dict: 上传任务元信息（upload_id, offset, size ...）
+        """
+        if size is None or size < 0:
+            raise UploadError('缺少有效的文件大小')
+        if expected_sha256 is not None and not _SHA256_RE.match(expected_sha256):
+            raise UploadError('sha256 格式无效')
+
+        self._cleanup_expired_uploads()
+        upload_id = uuid.uuid4().hex
+        meta = {
+            'upload_id': upload_id,
+            'folder': folder,
+            'filename': filename,
+            'size': size,
+            'sha256': expected_sha256,
+            'created_at': time.time(),
+        }
+        with open(self._upload_meta_path(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        open(self._upload_part_path(upload_id), 'wb').close()
+        meta['offset'] = 0
+        return meta
+
+    def upload_status(self, upload_id):
+        """查询分块上传进度"""
+        meta = self._load_upload_meta(upload_id)
+        meta['offset'] = os.path.getsize(self._upload_part_path(upload_id))
+        return meta
+
+    def append_chunk(self, upload_id, offset, stream):
+        """
+        追加一个数据块
+
+        Args:
+            upload_id: 上传任务ID
+            offset: 该块在文件中的起始偏移，必须等于已接收的字节数
+            stream: 数据流
+
+        Returns:
+            int: 追加后已接收的字节数
+
+        Raises:
+            UploadOffsetError: 偏移量不一致（客户端应按返回的offset续传）
+            UploadError: 超出声明的文件大小
+        """
+        meta = self._load_upload_meta(upload_id)
+        part_path = self._upload_part_path(upload_id)
+        with self._get_upload_lock(upload_id):
+            current = os.path.getsize(part_path)
+            if offset != current:
+                raise UploadOffsetError(f'偏移量不一致，服务器已接收 {current} 字节', current)
+
+            hasher, hashed = self._upload_hashers.get(upload_id, (None, 0))
+            if hasher is None and current == 0:
+                hasher = hashlib.sha256()
+            if hashed != current:
+                hasher = None  # 进程重启后无法恢复增量哈希，完成时重新计算
+
+            received = current
+            with open(part_path, 'ab') as f:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    received += len(chunk)
+                    if received > meta['size']:
+                        f.truncate(current)
+                        self._upload_hashers.pop(upload_id, None)
+                        raise UploadError('数据超出声明的文件大小')
+                    f.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+
+            if hasher is not None:
+                self._upload_hashers[upload_id] = (hasher, received)
+            else:
+                self._upload_hashers.pop(upload_id, None)
+            # 刷新元信息修改时间，活跃的上传不会被过期清理
+            os.utime(self._upload_meta_path(upload_id))
+            return received
+
+    def complete_upload(self, upload_id):
+        """
+        完成分块上传：校验大小和哈希，存入对象存储并发布为可见文件
+
+        Returns:
+            dict: sha256, size, deduplicated, path
+        """
+        meta = self._load_upload_meta(upload_id)
+        part_path = self._upload_part_path(upload_id)
+        with self._get_upload_lock(upload_id):
+            size = os.path.getsize(part_path)
+            if size != meta['size']:
+                raise UploadOffsetError(f'上传未完成：{size}/{meta["size"]} 字节', size)
+
+            hasher, hashed = self._upload_hashers.pop(upload_id, (None, 0))
+            if hasher is None or hashed != size:
+                hasher = self._hash_file(part_path)
+
+            sha256, size, deduplicated = self._commit_object(
+                part_path, hasher.hexdigest(), size, meta.get('sha256'))
+            self._discard_upload(upload_id)
+
+        relative_path = self.link(sha256, meta['folder'], meta['filename'], pinned=True)
+        return {
+            'sha256': sha256,
+            'size': size,
+            'deduplicated': deduplicated,
+            'path': relative_path,
+            'filename': meta['filename'],
+        }
+
+    def abort_upload(self, upload_id):
+        """放弃分块上传"""
+        self._load_upload_meta(upload_id)
+        with self._get_upload_lock(upload_id):
+            self._upload_hashers.pop(upload_id, None)
+            self._discard_upload(upload_id)
+
+    # ------------------------------------------------------------------
+    # 内部方法
+    # ------------------------------------------------------------------
+    def _commit_object(self, source_path, sha256, size, expected_sha256):
+        """将已写完的临时文件移动为内容对象，已存在时丢弃临时文件"""
+        if expected_sha256 and expected_sha256.lower() != sha256:
+            raise UploadError('文件哈希校验失败')
+
+        object_path = self.object_path(sha256)
+        with self._lock:
+            # 发布（link）之前不回收该对象
+            self._pinned[sha256] += 1
+            if os.path.isfile(object_path):
+                os.remove(source_path)
+                return sha256, size, True
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(source_path, object_path)
+        return sha256, size, False
+
+    def _unpin_locked(self, sha256):
+        if self._pinned[sha256] > 1:
+            self._pinned[sha256] -= 1
+        else:
+            self._pinned.pop(sha256, None)
+
+    def _release_object_locked(self, sha256):
+        """可见文件不再引用该对象时，若也没有其他引用则删除（调用方需持有锁）"""
+        if sha256 in self._pinned or sha256 in self._manifest.values():
+            return
+        object_path = self.object_path(sha256)
+        if os.path.isfile(object_path):
+            os.remove(object_path)
+
+    def _hash_file(self, path):
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                hasher.update(chunk)
+        return hasher
+
+    def _upload_meta_path(self, upload_id):
+        return os.path.join(self.uploads_dir, f'{upload_id}.json')
+
+    def _upload_part_path(self, upload_id):
+        return os.path.join(self.uploads_dir, f'{upload_id}.part')
+
+    def _load_upload_meta(self, upload_id):
+        if not re.match(r'^[0-9a-f]{32}$', upload_id or ''):
+            raise KeyError(upload_id)
+        try:
+            with open(self._upload_meta_path(upload_id), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(upload_id)
+
+    def _get_upload_lock(self, upload_id):
+        with self._lock:
+            lock = self._upload_locks.get(upload_id)
+            if lock is None:
+                lock = self._upload_locks[upload_id] = threading.Lock()
+            return lock
+
+    def _discard_upload(self, upload_id):
+        for path in (self._upload_part_path(upload_id), self._upload_meta_path(upload_id)):
+            if os.path.exists(path):
+                os.remove(path)
+        with self._lock:
+            self._upload_locks.pop(upload_id, None)
+
+    def _cleanup_expired_uploads(self):
+        """清理超过保留时间的未完成上传"""
+        now = time.time()
+        for name in os.listdir(self.uploads_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.uploads_dir, name)
+            if now - os.path.getmtime(path) > self.upload_ttl:
+                upload_id = name[:-len('.json')]
+                self._upload_hashers.pop(upload_id, None)
+                self._discard_upload(upload_id)
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            # 清单损坏时无法判断对象的引用关系，本次启动不做回收
+            print(f"[ContentAddressedStore] 读取清单失败: {e}，重新创建")
+            self._manifest_loaded = False
+            return {}
+
+    def _save_manifest_locked(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
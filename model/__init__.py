@@ -1,2 +1,5 @@
+from model.interpreter_pool import InterpreterPool
 from model.keypoint_classifier.keypoint_classifier import KeyPointClassifier
-from model.point_history_classifier.point_history_classifier import PointHistoryClassifier
\ No newline at end of file
+from model.keypoint_classifier.cascade_classifier import CascadeKeyPointClassifier
+from model.point_history_classifier.point_history_classifier import PointHistoryClassifier
+from model.point_history_classifier.streaming_recognizer import StreamingPointHistoryRecognizer
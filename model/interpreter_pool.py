@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+TFLite解释器池模块
+==========================================
+功能：为同一个模型预先创建并分配多个解释器，多线程并发推理时各自借用一个
+- tf.lite.Interpreter 的 set_tensor / invoke / get_tensor 不是线程安全的，
+  共享一个解释器的并发请求可能读到彼此的输出
+- 借出/归还使用 LIFO 栈（最近用过的解释器缓存更热），池中没有空闲解释器时等待
+- 统计借用次数、等待次数和等待时间，用于判断池大小是否足够
+- 全整数（int8）量化模型的输入量化和输出反量化（两个分类器共用）
+"""
+
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+
+class PooledInterpreter(object):
+    """池中的一个解释器及其当前的batch大小"""
+
+    def __init__(self, model_path, num_threads=1, use_xnnpack=True, pool=None):
+        self.pool = pool
+        options = {}
+        if not use_xnnpack:
+            # 不应用默认委托（XNNPACK），使用内置算子实现
+            options['experimental_op_resolver_type'] = \
+                tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads, **options)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.batch_size = int(self.input_details[0]['shape'][0])
+
+        # 缓存张量索引，以及返回解释器内部缓冲区视图的函数
+        # （函数可以长期保存，视图本身在下一次 invoke / allocate_tensors 前必须释放）
+        self.input_index = self.input_details[0]['index']
+        self.output_index = self.output_details[0]['index']
+        self._input_tensor = self.interpreter.tensor(self.input_index)
+        self._output_tensor = self.interpreter.tensor(self.output_index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.pool.release(self)
+
+    def resize_batch(self, batch_size):
+        """调整输入张量的batch维度并重新分配张量缓冲区"""
+        if batch_size == self.batch_size:
+            return
+        input_shape = list(self.input_details[0]['shape'])
+        input_shape[0] = batch_size
+        self.interpreter.resize_tensor_input(self.input_index, input_shape)
+        self.interpreter.allocate_tensors()
+        self.batch_size = batch_size
+
+    def run(self, inputs):
+        """
+        推理一批输入：直接写入解释器的输入缓冲区，返回输出缓冲区的视图（不经过 set_tensor / get_tensor 复制）
+
+        参数:
+            inputs: 数组或嵌套列表，形状 (N, ...)，按模型输入类型写入（列表直接转换写入，不生成中间数组）
+
+        返回:
+            np.ndarray: 指向解释器输出缓冲区的视图，只能在归还解释器之前使用，
+                        需要保留结果时请复制；使用完后释放引用，否则下一次推理会报错
+        """
+        self.resize_batch(len(inputs))
+        self._input_tensor()[...] = inputs
+        self.interpreter.invoke()
+        return self._output_tensor()
+
+
+class InterpreterPool(object):
+    """
+    同一模型的解释器池（线程安全）
+
+    使用示例:
+        pool = InterpreterPool(model_path, size=4)
+        with pool.checkout() as slot:
+            scores = slot.run(inputs).copy()
+    """
+
+    def __init__(self, model_path, size=1, num_threads=1, use_xnnpack=True):
+        """
+        参数:
+            model_path (str): TFLite模型文件路径
+            size (int): 解释器数量（即最大并发推理数）
+            num_threads (int): 每个解释器的推理线程数
+            use_xnnpack (bool): 是否使用XNNPACK委托（TFLite默认启用）
+        """
+        if size < 1:
+            raise ValueError('解释器池大小至少为1')
+        self.model_path = model_path
+        self.size = size
+        self.num_threads = num_threads
+        self.use_xnnpack = use_xnnpack
+        self._slots = [PooledInterpreter(model_path, num_threads, use_xnnpack, self) for _ in range(size)]
+        # 空闲解释器栈（后进先出），借出/归还在同一把锁下完成
+        self._idle = list(self._slots)
+
+        # 所有解释器的张量信息相同
+        self.input_details = self._slots[0].input_details
+        self.output_details = self._slots[0].output_details
+
+        # 输入/输出的数据类型和量化参数 (scale, zero_point)
+        # 全整数（int8）量化模型需要量化输入、反量化输出；浮点模型的量化参数为 (0.0, 0)
+        self.input_dtype = self.input_details[0]['dtype']
+        self.input_scale, self.input_zero_point = self.input_details[0]['quantization']
+        self.output_dtype = self.output_details[0]['dtype']
+        self.output_scale, self.output_zero_point = self.output_details[0]['quantization']
+        self.quantized_input = np.issubdtype(self.input_dtype, np.integer)
+        self.quantized_output = np.issubdtype(self.output_dtype, np.integer)
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._in_use = 0
+        self._peak_in_use = 0
+
+    def quantize_input(self, inputs):
+        """
+        转换为可直接写入输入缓冲区（PooledInterpreter.run）的数据
+        浮点模型原样返回（列表或数组由写入时一次转换为float32）；
+        整数输入按 q = round(x / scale) + zero_point 量化
+        """
+        if not self.quantized_input:
+            return inputs
+        info = np.iinfo(self.input_dtype)
+        quantized = np.asarray(inputs, dtype=np.float32) / self.input_scale
+        quantized = np.round(quantized, out=quantized)
+        quantized += self.input_zero_point
+        return np.clip(quantized, info.min, info.max, out=quantized)
+
+    def dequantize_output(self, result):
+        """
+        将输出缓冲区视图还原为float32数组（结果为新数组，归还解释器后仍然有效）
+        整数输出按 x = (q - zero_point) * scale 反量化
+        """
+        if not self.quantized_output:
+            return result.copy()
+        scores = result.astype(np.float32)
+        scores -= self.output_zero_point
+        scores *= self.output_scale
+        return scores
+
+    def dequantize_value(self, value):
+        """反量化单个输出值（浮点模型原样返回）"""
+        if not self.quantized_output:
+            return float(value)
+        return (float(value) - self.output_zero_point) * self.output_scale
+
+    def checkout(self, timeout=None):
+        """
+        借用一个解释器，离开 with 块时归还
+
+        用法: with pool.checkout() as slot: ...
+        （返回的解释器本身就是上下文管理器，借用和归还不产生额外对象）
+
+        参数:
+            timeout (float): 最长等待时间（秒），None为一直等待；超时抛出 TimeoutError
+        """
+        with self._available:
+            if not self._idle:
+                start = time.perf_counter()
+                if not self._available.wait_for(self._has_idle, timeout):
+                    raise TimeoutError(f'{timeout}秒内没有空闲的解释器')
+                waited_ms = (time.perf_counter() - start) * 1000
+                self._waits += 1
+                self._wait_ms_total += waited_ms
+                self._wait_ms_max = max(self._wait_ms_max, waited_ms)
+            slot = self._idle.pop()
+            self._checkouts += 1
+            self._in_use += 1
+            if self._in_use > self._peak_in_use:
+                self._peak_in_use = self._in_use
+        return slot
+
+    def release(self, slot):
+        """归还解释器（通常由 with 块结束时自动调用）"""
+        with self._available:
+            self._idle.append(slot)
+            self._in_use -= 1
+            self._available.notify()
+
+    def _has_idle(self):
+        return bool(self._idle)
+
+    def get_stats(self):
+        """
+        借用与争用统计
+
+        返回:
+            dict: size / in_use / peak_in_use / checkouts / waits（需要等待的借用次数）/
+                  wait_rate / wait_ms_mean（等待时的平均等待时间）/ wait_ms_max
+        """
+        with self._lock:
+            return {
+                'size': self.size,
+                'num_threads': self.num_threads,
+                'xnnpack': self.use_xnnpack,
+                'in_use': self._in_use,
+                'peak_in_use': self._peak_in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_rate': round(self._waits / self._checkouts, 4) if self._checkouts else 0.0,
+                'wait_ms_mean': round(self._wait_ms_total / self._waits, 3) if self._waits else 0.0,
+                'wait_ms_max': round(self._wait_ms_max, 3),
+            }
+
+    def reset_stats(self):
+        """清空争用统计（不影响借用中的解释器）"""
+        with self._lock:
+            self._checkouts = 0
+            self._waits = 0
+            self._wait_ms_total = 0.0
+            self._wait_ms_max = 0.0
+            self._peak_in_use = self._in_use
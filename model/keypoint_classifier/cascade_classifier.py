@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+级联静态手势分类模块
+==========================================
+功能：小模型逐帧分类，只有不确定的帧才交给大模型（或融合模型）复核
+- 小模型最高概率低于阈值时升级（low_confidence）
+- 小模型结果与上一帧不同（手势切换或抖动）时升级（disagreement）
+- 需要升级的样本整批交给大模型推理一次
+- 统计各阶段命中率和耗时，平均分类开销接近小模型
+两个模型必须使用相同的标签集（输出类别数一致）
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class CascadeKeyPointClassifier(object):
+    """
+    级联静态手势分类器（接口与 KeyPointClassifier 相同，可直接替换）
+
+    使用示例:
+        cascade = CascadeKeyPointClassifier(KeyPointClassifier(fast_path),
+                                            KeyPointClassifier(accurate_path), threshold=0.8)
+        hand_sign_id = cascade(pre_processed_landmark_list)
+        cascade.get_stats()     # 各阶段命中率和平均耗时
+
+    多会话共享同一实例时，使用 cascade(landmark_lists, previous) 并由调用方保存
+    每个会话上一帧的小模型结果；__call__ 使用实例自身保存的上一帧结果（适合单路视频）
+    """
+
+    def __init__(
+        self,
+        fast,                   # 小模型（逐帧推理），需提供 predict_scores
+        accurate,               # 大模型或融合模型（仅复核不确定的帧），需提供 predict_scores
+        threshold=0.8,          # 小模型最高概率低于该值时升级
+        check_history=True,     # 小模型结果与上一帧不同时升级
+    ):
+        fast_classes = int(fast.output_details[0]['shape'][-1])
+        accurate_classes = int(accurate.output_details[0]['shape'][-1])
+        if fast_classes != accurate_classes:
+            raise ValueError(f'级联模型的类别数不一致: {fast_classes} != {accurate_classes}')
+        self.fast = fast
+        self.accurate = accurate
+        self.threshold = threshold
+        self.check_history = check_history
+
+        # 与 KeyPointClassifier 一致的张量信息（以小模型为准）
+        self.input_details = fast.input_details
+        self.output_details = fast.output_details
+
+        self._last_fast_id = -1
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def __call__(self, landmark_list):
+        """
+        单样本分类（上一帧结果保存在实例中）
+
+        返回:
+            int: 预测的手势类别编号
+        """
+        scores, fast_ids = self.cascade([landmark_list], self._last_fast_id)
+        self._last_fast_id = int(fast_ids[0])
+        return int(np.argmax(scores[0]))
+
+    def classify_batch(self, landmark_lists, previous=-1):
+        """批量分类，返回每个样本的类别编号 (N,)"""
+        return np.argmax(self.predict_scores(landmark_lists, previous), axis=1)
+
+    def predict_scores(self, landmark_lists, previous=-1):
+        """批量推理，返回各类别概率 (N, 类别数)"""
+        return self.cascade(landmark_lists, previous)[0]
+
+    def cascade(self, landmark_lists, previous=-1):
+        """
+        级联推理：整批先过小模型，需要升级的样本再整批过大模型
+
+        参数:
+            landmark_lists: N个按时间顺序排列的预处理关键点，形状 (N, 42)
+            previous (int): 本批第一个样本之前一帧的小模型结果，-1 表示没有历史
+
+        返回:
+            tuple: (类别概率 (N, 类别数) float32, 小模型类别编号 (N,))
+                   第二项用于保存会话历史，传给下一次调用的 previous
+        """
+        inputs = np.asarray(landmark_lists, dtype=np.float32)
+        start = time.perf_counter()
+        scores = np.array(self.fast.predict_scores(inputs), dtype=np.float32)
+        fast_ms = (time.perf_counter() - start) * 1000
+        if len(scores) == 0:
+            return scores, np.empty(0, dtype=np.int64)
+
+        fast_ids = np.argmax(scores, axis=1)
+        low_confidence = scores[np.arange(len(scores)), fast_ids] < self.threshold
+        disagreement = np.zeros(len(scores), dtype=bool)
+        if self.check_history:
+            # 每个样本与前一个样本（第一个样本与 previous）比较
+            preceding = np.empty_like(fast_ids)
+            preceding[0] = previous
+            preceding[1:] = fast_ids[:-1]
+            disagreement = (preceding >= 0) & (fast_ids != preceding)
+        escalate = low_confidence | disagreement
+
+        accurate_ms = 0.0
+        escalated = int(np.count_nonzero(escalate))
+        if escalated:
+            start = time.perf_counter()
+            scores[escalate] = self.accurate.predict_scores(inputs[escalate])
+            accurate_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._frames += len(scores)
+            self._escalated += escalated
+            self._low_confidence += int(np.count_nonzero(low_confidence))
+            self._disagreement += int(np.count_nonzero(disagreement & ~low_confidence))
+            self._accurate_calls += 1 if escalated else 0
+            self._fast_ms += fast_ms
+            self._accurate_ms += accurate_ms
+        return scores, fast_ids
+
+    def reset_stats(self):
+        """清空命中率统计"""
+        self._frames = 0
+        self._escalated = 0
+        self._low_confidence = 0
+        self._disagreement = 0
+        self._accurate_calls = 0
+        self._fast_ms = 0.0
+        self._accurate_ms = 0.0
+
+    def get_stats(self):
+        """
+        各阶段命中率与耗时
+
+        返回:
+            dict: frames / fast_hit_rate（小模型直接给出结果的比例）/ escalation_rate /
+                  按原因的升级次数 / 每帧平均耗时（毫秒）
+        """
+        with self._lock:
+            frames = self._frames
+            escalated = self._escalated
+            return {
+                'threshold': self.threshold,
+                'frames': frames,
+                'fast_hits': frames - escalated,
+                'escalated': escalated,
+                'escalated_low_confidence': self._low_confidence,
+                'escalated_disagreement': self._disagreement,
+                'accurate_calls': self._accurate_calls,
+                'fast_hit_rate': round((frames - escalated) / frames, 4) if frames else 0.0,
+                'escalation_rate': round(escalated / frames, 4) if frames else 0.0,
+                'fast_ms_per_frame': round(self._fast_ms / frames, 4) if frames else 0.0,
+                'accurate_ms_per_frame': round(self._accurate_ms / frames, 4) if frames else 0.0,
+                'ms_per_frame': round((self._fast_ms + self._accurate_ms) / frames, 4) if frames else 0.0,
+            }
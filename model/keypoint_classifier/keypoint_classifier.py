@@ -9,7 +9,8 @@
 """
 
 import numpy as np
-import tensorflow as tf
+
+from model.interpreter_pool import InterpreterPool
 
 
 class KeyPointClassifier(object):
@@ -20,7 +21,7 @@ class KeyPointClassifier(object):
     用于识别静态手势（如：张开手掌、握拳、指向等）
     
     属性:
-        interpreter: TFLite解释器对象
+        pool: TFLite解释器池（多线程并发推理时各自借用一个解释器）
         input_details: 输入张量的元信息
         output_details: 输出张量的元信息
     """
@@ -29,6 +30,8 @@ class KeyPointClassifier(object):
         self,
         model_path='model/keypoint_classifier/static_gesture_model/avazahedi/keypoint_classifier.tflite',      # 默认读取的 TFLite 静态手势模型路径
         num_threads=1,      # 默认使用的推理线程数量（单线程推理）
+        pool_size=1,        # 解释器数量（多线程并发推理时的最大并发数）
+        use_xnnpack=True,   # 是否使用XNNPACK委托
     ):
         """
         初始化关键点手势分类器
@@ -36,24 +39,20 @@ class KeyPointClassifier(object):
         参数:
             model_path (str): TFLite模型文件路径
             num_threads (int): 推理使用的线程数量，默认为1
+            pool_size (int): 预先创建并分配的解释器数量，默认为1
+            use_xnnpack (bool): 是否使用XNNPACK委托，默认为True
         """
-        # 构建 TFLite 解释器实例
-        # TFLite是轻量级推理引擎，适合移动端和嵌入式设备
-        self.interpreter = tf.lite.Interpreter(
-            model_path=model_path,
-            num_threads=num_threads,
-        )
-
-        # 为解释器分配输入与输出张量缓冲区
-        # 必须在推理前调用此方法
-        self.interpreter.allocate_tensors()
+        # 构建 TFLite 解释器池（每个解释器已分配输入与输出张量缓冲区）
+        # TFLite解释器不是线程安全的，并发推理时各自借用一个解释器
+        self.pool = InterpreterPool(model_path, size=pool_size, num_threads=num_threads,
+                                    use_xnnpack=use_xnnpack)
         
         # 缓存输入张量的元信息以便后续写入
         # 包含：索引、形状、数据类型等信息
-        self.input_details = self.interpreter.get_input_details()
+        self.input_details = self.pool.input_details
         
         # 缓存输出张量的元信息以便后续读取
-        self.output_details = self.interpreter.get_output_details()
+        self.output_details = self.pool.output_details
     
 
     def __call__(       
@@ -71,29 +70,50 @@ class KeyPointClassifier(object):
         返回:
             int: 预测的手势类别编号（0, 1, 2, ...）
         """
-        # 取出单个输入张量在解释器中的索引
-        input_details_tensor_index = self.input_details[0]['index']
-        
-        # 将预处理数据写入模型输入
-        # 需要转换为float32类型的numpy数组，并添加batch维度
-        self.interpreter.set_tensor(
-            input_details_tensor_index,
-            np.array([landmark_list], dtype=np.float32),
-        )
+        with self.pool.checkout() as slot:
+            # 将预处理数据添加batch维度，直接写入解释器的输入缓冲区并推理
+            # 结果是各类别的概率分布（softmax输出），直接在输出缓冲区上读取
+            result = slot.run(self.pool.quantize_input([landmark_list]))
 
-        # 执行一次前向推理
-        # 这是模型计算的核心步骤
-        self.interpreter.invoke()
+            # 找到概率最大的类别索引作为最终手势结果
+            # 反量化是单调变换，整数输出上的argmax与反量化后相同
+            result_index = int(result[0].argmax())
+            del result  # 释放输出缓冲区视图后才能归还解释器
 
-        # 取得输出张量对应的索引
-        output_details_tensor_index = self.output_details[0]['index']
+        return result_index  # 返回预测到的手势类别编号
 
-        # 从解释器中读取推理结果向量
-        # 结果是各类别的概率分布（softmax输出）
-        result = self.interpreter.get_tensor(output_details_tensor_index)
+    def classify_batch(
+        self,
+        landmark_lists,         # 多帧预处理后的关键点坐标列表，形状 (N, 42)
+    ):
+        """
+        批量执行手势分类推理（一次invoke处理N个样本）
 
-        # 找到概率最大的类别索引作为最终手势结果
-        # np.argmax返回最大值的索引
-        result_index = np.argmax(np.squeeze(result))
+        参数:
+            landmark_lists (list | np.ndarray): N个预处理后的关键点坐标
 
-        return result_index  # 返回预测到的手势类别编号
+        返回:
+            np.ndarray: 每个样本的手势类别编号，形状 (N,)
+        """
+        return np.argmax(self.predict_scores(landmark_lists), axis=1)
+
+    def predict_scores(
+        self,
+        landmark_lists,         # 多帧预处理后的关键点坐标列表，形状 (N, 42)
+    ):
+        """
+        批量推理，返回各类别的概率（供置信度加权投票和接口返回使用）
+
+        参数:
+            landmark_lists (list | np.ndarray): N个预处理后的关键点坐标
+
+        返回:
+            np.ndarray: 类别概率，形状 (N, 类别数) float32
+        """
+        if len(landmark_lists) == 0:
+            return np.empty((0, self.output_details[0]['shape'][-1]), dtype=np.float32)
+
+        # 借用一个解释器，按样本数调整输入张量形状，直接写入输入缓冲区并推理；
+        # 在归还解释器前把输出缓冲区反量化/复制为结果（只复制一次）
+        with self.pool.checkout() as slot:
+            return self.pool.dequantize_output(slot.run(self.pool.quantize_input(landmark_lists)))
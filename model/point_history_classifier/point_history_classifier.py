@@ -9,7 +9,8 @@
 """
 
 import numpy as np
-import tensorflow as tf
+
+from model.interpreter_pool import InterpreterPool
 
 
 class PointHistoryClassifier(object):
@@ -20,7 +21,7 @@ class PointHistoryClassifier(object):
     通过分析指尖的移动轨迹来识别手势（如：顺时针、逆时针、停止、移动等）
     
     属性:
-        interpreter: TFLite解释器对象
+        pool: TFLite解释器池（多线程并发推理时各自借用一个解释器）
         input_details: 输入张量的元信息
         output_details: 输出张量的元信息
         score_th: 置信度阈值
@@ -33,6 +34,8 @@ class PointHistoryClassifier(object):
         score_th=0.5,           # 分类分数低于该阈值时视为无效结果（置信度阈值）
         invalid_value=0,        # 未达阈值时返回的兜底类别编号（默认为"Stop"）
         num_threads=1,          # 限定解释器运行所用线程数
+        pool_size=1,            # 解释器数量（多线程并发推理时的最大并发数）
+        use_xnnpack=True,       # 是否使用XNNPACK委托
     ):
         """
         初始化手指轨迹分类器
@@ -42,22 +45,19 @@ class PointHistoryClassifier(object):
             score_th (float): 置信度阈值，低于此值的预测将被视为无效
             invalid_value (int): 置信度不足时返回的默认类别编号
             num_threads (int): 推理使用的线程数量，默认为1
+            pool_size (int): 预先创建并分配的解释器数量，默认为1
+            use_xnnpack (bool): 是否使用XNNPACK委托，默认为True
         """
-        # 创建适配 TFLite 模型的解释器
-        self.interpreter = tf.lite.Interpreter(
-            model_path=model_path,
-            num_threads=num_threads,
-        )
-
-        # 为解释器分配输入输出张量缓冲区
-        self.interpreter.allocate_tensors()
+        # 创建适配 TFLite 模型的解释器池（每个解释器已分配输入输出张量缓冲区）
+        self.pool = InterpreterPool(model_path, size=pool_size, num_threads=num_threads,
+                                    use_xnnpack=use_xnnpack)
         
         # 记录输入张量的元数据，便于后续写入
         # 输入形状为 (1, 32)，即16个时间步 × 2个坐标维度
-        self.input_details = self.interpreter.get_input_details()
+        self.input_details = self.pool.input_details
         
         # 记录输出张量的元数据，便于后续读取
-        self.output_details = self.interpreter.get_output_details()
+        self.output_details = self.pool.output_details
 
         # 保存后续置信度判定所用阈值
         self.score_th = score_th
@@ -81,33 +81,65 @@ class PointHistoryClassifier(object):
             int: 预测的轨迹类别编号（0=Stop, 1=Clockwise, 2=Counter Clockwise, 3=Move）
                 如果预测置信度低于阈值，返回invalid_value
         """
-        # 获取输入张量在解释器中的索引
-        input_details_tensor_index = self.input_details[0]['index']
-        
-        # 将轨迹历史写入模型输入
-        # 需要转换为float32类型的numpy数组，并添加batch维度
-        self.interpreter.set_tensor(
-            input_details_tensor_index,
-            np.array([point_history], dtype=np.float32),
-        )
-
-        # 触发一次前向推理
-        # 模型会分析轨迹的时序特征
-        self.interpreter.invoke()
-
-        # 获取输出张量在解释器中的索引
-        output_details_tensor_index = self.output_details[0]['index']
+        with self.pool.checkout() as slot:
+            # 将轨迹历史添加batch维度，直接写入解释器的输入缓冲区并推理
+            # 结果是各类别的概率（softmax输出），直接在输出缓冲区上读取
+            result = slot.run(self.pool.quantize_input([point_history]))
 
-        # 从解释器中读取推理得到的概率分布
-        # 结果是各类别的概率（softmax输出）
-        result = self.interpreter.get_tensor(output_details_tensor_index)
-
-        # 选取概率最高的类别索引作为候选结果
-        result_index = np.argmax(np.squeeze(result))
+            # 选取概率最高的类别索引作为候选结果
+            result_index = int(result[0].argmax())
+            score = float(result[0, result_index])
+            del result  # 释放输出缓冲区视图后才能归还解释器
+        score = self.pool.dequantize_value(score)
 
         # 若最高概率低于阈值则视为无效结果
         # 这样可以过滤掉不确定的预测，提高可靠性
-        if np.squeeze(result)[result_index] < self.score_th:
+        if score < self.score_th:
             result_index = self.invalid_value  # 将返回值替换为预定义的兜底类别
 
         return result_index  # 返回最终确认的轨迹类别编号
+
+    def classify_batch(
+        self,
+        point_histories,        # 多个预处理后的指尖轨迹序列，形状 (N, 32)
+    ):
+        """
+        批量执行轨迹分类推理（一次invoke处理N个样本）
+
+        参数:
+            point_histories (list | np.ndarray): N个预处理后的指尖轨迹序列
+
+        返回:
+            np.ndarray: 每个样本的轨迹类别编号，形状 (N,)
+                       置信度低于阈值的样本为invalid_value
+        """
+        result = self.predict_scores(point_histories)
+        if len(result) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        result_index = np.argmax(result, axis=1)
+        low_confidence = result[np.arange(len(result)), result_index] < self.score_th
+        result_index[low_confidence] = self.invalid_value
+
+        return result_index
+
+    def predict_scores(
+        self,
+        point_histories,        # 多个预处理后的指尖轨迹序列，形状 (N, 32)
+    ):
+        """
+        批量推理，返回各类别的概率（不做阈值判定，供流式识别聚合使用）
+
+        参数:
+            point_histories (list | np.ndarray): N个预处理后的指尖轨迹序列
+
+        返回:
+            np.ndarray: 类别概率，形状 (N, 类别数) float32
+        """
+        if len(point_histories) == 0:
+            return np.empty((0, self.output_details[0]['shape'][-1]), dtype=np.float32)
+
+        # 借用一个解释器，按样本数调整输入张量形状，直接写入输入缓冲区并推理；
+        # 在归还解释器前把输出缓冲区反量化/复制为结果（只复制一次）
+        with self.pool.checkout() as slot:
+            return self.pool.dequantize_output(slot.run(self.pool.quantize_input(point_histories)))
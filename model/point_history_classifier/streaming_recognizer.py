@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+流式动态手势识别模块
+==========================================
+功能：在 PointHistoryClassifier 之上按滑动窗口流式识别动态手势
+- 轨迹点保存在双倍长度的环形缓冲区中，任意时刻的窗口都是连续切片，归一化只需一次数组运算
+- 每 stride 帧推理一次（stride > 1 时模型调用次数成比例减少）
+- 以置信度加权、按时间指数衰减的方式聚合各次推理的概率，代替逐帧ID的多数投票
+- 单次推理置信度足够高时立即输出，不必等待聚合
+"""
+
+import numpy as np
+
+
+class StreamingPointHistoryRecognizer(object):
+    """
+    流式动态手势识别器（每个会话一个实例，分类器可共享）
+
+    使用示例:
+        recognizer = StreamingPointHistoryRecognizer(point_history_classifier, stride=2)
+        gesture_id, confidence = recognizer.update(fingertip, image_width, image_height)
+
+    批量处理时可拆分为两步：先按顺序 push() 收集需要推理的窗口，整批 predict_scores()，
+    再按相同顺序 observe()，结果与逐帧 update() 一致
+    """
+
+    def __init__(
+        self,
+        classifier,             # PointHistoryClassifier（需提供 predict_scores）
+        window=16,              # 窗口长度（帧），与模型时间步数不同时等间隔取样到模型输入长度
+        stride=1,               # 每隔多少帧推理一次
+        decay=0.8,              # 每帧的聚合衰减系数，越小越偏重最近的推理
+        score_th=0.5,           # 聚合后概率低于该阈值时输出 invalid_value
+        early_th=0.9,           # 单次推理概率达到该值时立即输出
+        invalid_value=0,        # 置信度不足时输出的类别编号
+    ):
+        if window < 2 or stride < 1:
+            raise ValueError('window 至少为2，stride 至少为1')
+        self.classifier = classifier
+        self.window = window
+        self.stride = stride
+        self.decay = decay
+        self.score_th = score_th
+        self.early_th = early_th
+        self.invalid_value = invalid_value
+
+        # 模型输入的时间步数（输入形状为 (1, steps * 2)）
+        self.model_steps = int(classifier.input_details[0]['shape'][1]) // 2
+        self._sample_index = None
+        if window != self.model_steps:
+            self._sample_index = np.round(np.linspace(0, window - 1, self.model_steps)).astype(np.int64)
+        # 每次推理之间经过 stride 帧，按帧衰减换算为按推理衰减
+        self._call_decay = decay ** stride
+
+        self._buffer = np.zeros((2 * window, 2), dtype=np.float32)
+        self._scale = np.ones(2, dtype=np.float32)
+        self.reset()
+
+    def spawn(self):
+        """创建参数相同、状态独立的新实例（用于新会话）"""
+        return StreamingPointHistoryRecognizer(
+            self.classifier, self.window, self.stride, self.decay,
+            self.score_th, self.early_th, self.invalid_value)
+
+    def reset(self):
+        self._buffer[:] = 0
+        self._pos = 0
+        self._count = 0
+        self._since_inference = 0
+        self._scores = None
+        self._weight = 0.0
+        self._aggregated = None
+        self._current = (self.invalid_value, 0.0)
+        self.inference_count = 0
+
+    @property
+    def scores(self):
+        """按置信度加权聚合后的类别概率（尚未推理时为None）"""
+        return self._aggregated
+
+    @property
+    def points(self):
+        """当前窗口内的轨迹点（从旧到新），形状 (n, 2)"""
+        start = self._pos + self.window - self._count
+        return self._buffer[start:self._pos + self.window]
+
+    def push(self, point, image_width, image_height, infer=True):
+        """
+        追加一帧轨迹点
+
+        参数:
+            point: 指尖像素坐标 [x, y]，无效帧为 [0, 0]
+            image_width, image_height (int): 图像尺寸
+            infer (bool): 本帧是否允许推理（未检测到手时为False，只推进窗口）
+
+        返回:
+            np.ndarray | None: 本帧需要推理时返回模型输入 (steps * 2,) float32，否则为None
+        """
+        # 每个点同时写入两个位置，写入后窗口 [pos, pos+window) 始终是连续切片（从旧到新）
+        self._buffer[self._pos] = point
+        self._buffer[self._pos + self.window] = point
+        self._pos = (self._pos + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+        self._since_inference += 1
+
+        if not infer or self._count < self.window or self._since_inference < self.stride:
+            return None
+        self._since_inference = 0
+
+        window = self._buffer[self._pos:self._pos + self.window]
+        if self._sample_index is not None:
+            window = window[self._sample_index]
+        # 以窗口首点为原点，按图像宽高归一化
+        self._scale[0] = 1.0 / image_width if image_width else 0.0
+        self._scale[1] = 1.0 / image_height if image_height else 0.0
+        return ((window - window[0]) * self._scale).ravel()
+
+    def observe(self, scores=None):
+        """
+        输入一帧的推理结果，更新聚合并返回当前输出
+
+        参数:
+            scores: 本帧的类别概率 (C,)，本帧未推理时为None（保持上一次的输出）
+
+        返回:
+            tuple: (类别编号, 置信度)
+        """
+        if scores is None:
+            return self._current
+        self.inference_count += 1
+
+        scores = np.asarray(scores, dtype=np.float32)
+        best = int(np.argmax(scores))
+        confidence = float(scores[best])
+        # 置信度加权：模糊的预测对聚合结果影响小
+        if self._scores is None:
+            self._scores = scores * confidence
+            self._weight = confidence
+        else:
+            self._scores *= self._call_decay
+            self._scores += scores * confidence
+            self._weight = self._weight * self._call_decay + confidence
+
+        self._aggregated = self._scores / self._weight if self._weight > 0 else self._scores.copy()
+        if confidence >= self.early_th:
+            self._current = (best, confidence)
+            return self._current
+
+        best = int(np.argmax(self._aggregated))
+        confidence = float(self._aggregated[best])
+        if confidence < self.score_th:
+            best = self.invalid_value
+        self._current = (best, confidence)
+        return self._current
+
+    def update(self, point, image_width, image_height, infer=True):
+        """
+        逐帧识别：追加轨迹点，需要时推理，并返回当前输出
+
+        返回:
+            tuple: (类别编号, 置信度)
+        """
+        inputs = self.push(point, image_width, image_height, infer)
+        if inputs is None:
+            return self._current
+        return self.observe(self.classifier.predict_scores(inputs[None, :])[0])
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+全整数int8量化工具
+将已训练的Keras分类器转换为全整数（int8输入输出）TFLite模型，
+代表性样本取自采集的CSV数据集，并输出与浮点模型的大小、准确率和延迟对比
+
+示例:
+    python quantize_classifier.py --task keypoint --model model/keypoint_classifier/keypoint_classifier.keras
+    python quantize_classifier.py --task point_history \
+        --model model/point_history_classifier/dynamic_gesture_model/NUM_CLASSES_7/point_history_classifier.keras \
+        --dataset model/point_history_classifier/point_history.csv
+"""
+
+import argparse
+import os
+
+import tensorflow as tf
+
+from train_classifier import (
+    RANDOM_SEED, TASKS, export_tflite, load_representative_samples, load_samples, make_dataset,
+    quantization_report, resolve_dataset_files,
+)
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='分类器int8量化')
+    parser.add_argument('--task', choices=sorted(TASKS), default='keypoint', help='分类任务')
+    parser.add_argument('--model', default=None, help='Keras模型路径（.keras），默认使用训练工具的保存路径')
+    parser.add_argument('--dataset', nargs='+', default=None, help='CSV数据集（可多个或通配符）')
+    parser.add_argument('--output', default=None, help='int8模型保存路径，默认 <模型名>_int8.tflite')
+    parser.add_argument('--dynamic', default=None,
+                        help='一并对比的动态范围量化模型（.tflite），默认 <模型名>.tflite（存在时）')
+    parser.add_argument('--representative_samples', type=int, default=1000,
+                        help='校准使用的训练样本数（按标签分层随机抽取）')
+    parser.add_argument('--train_size', type=float, default=0.75, help='与训练时一致的训练集比例')
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED, help='与训练时一致的划分种子')
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    config = TASKS[args.task]
+
+    model_path = args.model or config['model_save_path']
+    base_path = os.path.splitext(model_path)[0]
+    output_path = args.output or base_path + '_int8.tflite'
+    dynamic_path = args.dynamic or base_path + '.tflite'
+
+    model = tf.keras.models.load_model(model_path)
+    files = resolve_dataset_files(args.dataset or [config['dataset']])
+
+    # 与训练时相同的划分：训练集用于校准，验证集用于评估
+    split = dict(train_size=args.train_size, seed=args.seed, cache='none')
+    representative_data = load_representative_samples(
+        make_dataset(files, config['num_features'], 'train', **split), args.representative_samples, args.seed)
+    val_features, val_labels = load_samples(make_dataset(files, config['num_features'], 'val', **split))
+    if len(representative_data) == 0 or len(val_labels) == 0:
+        raise SystemExit('数据集为空或样本过少')
+
+    size = export_tflite(model, output_path, quantization='int8', representative_data=representative_data)
+    print(f"int8 TFLite已保存: {output_path}（{size / 1024:.1f} KB，校准样本 {len(representative_data)} 个）")
+
+    tflite_paths = {'int8': output_path}
+    if os.path.isfile(dynamic_path):
+        tflite_paths = {'dynamic': dynamic_path, 'int8': output_path}
+    quantization_report(args.task, model, tflite_paths, val_features, val_labels)
+
+
+if __name__ == '__main__':
+    main()
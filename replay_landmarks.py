@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+关键点回放工具
+将录制的关键点日志（.hglm）送入识别后处理流程（平滑、预处理、两个分类器、投票），
+无需摄像头和MediaPipe，用于可复现的性能和准确率回归测试
+
+示例:
+    python replay_landmarks.py recordings/session.hglm
+    python replay_landmarks.py recordings/*.hglm --repeat 10
+    python replay_landmarks.py session.hglm --output baseline.jsonl
+    python replay_landmarks.py session.hglm --expected baseline.jsonl
+"""
+
+import argparse
+import json
+import time
+
+from utils import RuntimeConfig, read_landmark_log
+from utils.landmark_log import handedness_label
+from gesture_control_app.backend.gesture_service import GestureRecognitionService
+
+# 回归比较时使用的结果字段
+# static_gesture_id 为本帧未投票的分类结果，static_gesture / dynamic_gesture 为投票后的稳定输出（手势名称）
+COMPARE_KEYS = ('hand_detected', 'static_gesture_id', 'dynamic_gesture_id', 'static_gesture', 'dynamic_gesture')
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='关键点日志回放')
+    parser.add_argument('logs', nargs='+', help='关键点日志文件（.hglm）')
+    parser.add_argument('--static_model', default=None, help='静态手势模型路径')
+    parser.add_argument('--dynamic_model', default=None, help='动态手势模型路径')
+    parser.add_argument('--dynamic_window', type=int, default=16, help='动态手势滑动窗口长度（帧）')
+    parser.add_argument('--dynamic_stride', type=int, default=1, help='动态手势推理步长（帧）')
+    parser.add_argument('--repeat', type=int, default=1, help='每个日志重复回放次数（用于性能测试）')
+    parser.add_argument('--output', default=None, help='将每帧结果写入JSON Lines文件')
+    parser.add_argument('--expected', default=None, help='与之前 --output 的结果逐帧比较')
+    RuntimeConfig.add_arguments(parser)
+    return parser.parse_args()
+
+
+def replay_log(service, frames):
+    """回放一个日志的所有帧，返回每帧的识别结果"""
+    service.reset_history()
+    results = []
+    for frame in frames:
+        landmarks = frame['landmarks'] if frame['hand'] else None
+        result = service.process_landmarks(
+            landmarks,
+            handedness_label(frame['handedness']),
+            int(frame['width']),
+            int(frame['height']),
+            float(frame['timestamp']),
+        )
+        results.append({key: result[key] for key in COMPARE_KEYS})
+    return results
+
+
+def load_expected(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    args = get_args()
+    runtime = RuntimeConfig().update_from_env().update_from_args(args).apply()
+    print(f"runtime: {runtime.describe()}")
+
+    service = GestureRecognitionService(
+        runtime=runtime,
+        static_model_path=args.static_model,
+        dynamic_model_path=args.dynamic_model,
+        dynamic_options={'window': args.dynamic_window, 'stride': args.dynamic_stride},
+    )
+
+    all_results = []
+    total_frames = 0
+    total_seconds = 0.0
+    for log_path in args.logs:
+        frames = read_landmark_log(log_path)
+        if len(frames) == 0:
+            print(f"{log_path}: 空日志，跳过")
+            continue
+        duration = float(frames['timestamp'][-1] - frames['timestamp'][0])
+
+        elapsed = []
+        results = None
+        for _ in range(max(1, args.repeat)):
+            start = time.perf_counter()
+            results = replay_log(service, frames)
+            elapsed.append(time.perf_counter() - start)
+        all_results.extend(results)
+
+        best = min(elapsed)
+        total_frames += len(frames) * len(elapsed)
+        total_seconds += sum(elapsed)
+        hand_frames = int(frames['hand'].sum())
+        print(f"{log_path}: {len(frames)} 帧（检测到手 {hand_frames} 帧，录制时长 {duration:.1f}s）")
+        print(f"  最快一次 {best * 1000:.1f} ms，{len(frames) / best:,.0f} 帧/秒，"
+              f"单帧 {best / len(frames) * 1e6:.1f} µs，"
+              f"{duration / best if best > 0 else 0:,.0f}x 实时")
+        print(f"  动态手势推理 {service.dynamic_recognizer.inference_count} 次"
+              f"（步长 {args.dynamic_stride}）")
+
+    if total_seconds > 0:
+        print(f"合计: {total_frames} 帧，平均 {total_frames / total_seconds:,.0f} 帧/秒")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for result in all_results:
+                f.write(json.dumps(result) + '\n')
+        print(f"结果已写入: {args.output}")
+
+    if args.expected:
+        expected = load_expected(args.expected)
+        if len(expected) != len(all_results):
+            print(f"⚠️  帧数不一致: 期望 {len(expected)}，实际 {len(all_results)}")
+        # 旧基线中没有的字段不参与比较
+        keys = [key for key in COMPARE_KEYS if not expected or key in expected[0]]
+        for key in COMPARE_KEYS:
+            if key not in keys:
+                print(f"  {key}: 基线中没有该字段，跳过（重新生成基线以比较）")
+        mismatches = {key: 0 for key in keys}
+        for actual, wanted in zip(all_results, expected):
+            for key in keys:
+                if actual[key] != wanted.get(key):
+                    mismatches[key] += 1
+        compared = min(len(expected), len(all_results))
+        for key in keys:
+            agreement = 1 - mismatches[key] / compared if compared else 0
+            print(f"  {key}: 不一致 {mismatches[key]} 帧，一致率 {agreement:.2%}")
+        if any(mismatches.values()) or len(expected) != len(all_results):
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
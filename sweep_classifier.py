@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+分类器超参数搜索工具
+在多个CPU核心上并行训练大量小模型（层宽、Dropout、学习率的组合），
+数据集只解析一次并保存为 .npy，各进程以内存映射方式共享读取；
+逐个测量每个模型的验证集准确率、TFLite大小和推理延迟，输出准确率-延迟的帕累托前沿，
+可按延迟预算选出生产模型
+
+示例:
+    python sweep_classifier.py --task keypoint
+    python sweep_classifier.py --task point_history --hidden 24,10 32,16 64,32 --dropout 0.2,0.5 0.1,0.2 \
+        --learning_rate 0.001 0.003 --jobs 8 --latency_budget 10
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from utils import LandmarkAugmenter, parse_label_map
+from train_classifier import (
+    RANDOM_SEED, TASKS, benchmark_tflite, export_tflite, load_samples,
+    make_dataset, resolve_dataset_files,
+)
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='分类器超参数搜索')
+    parser.add_argument('--task', choices=sorted(TASKS), default='keypoint', help='分类任务')
+    parser.add_argument('--dataset', nargs='+', default=None, help='CSV数据集（可多个或通配符）')
+    parser.add_argument('--work_dir', default=None, help='数据缓存、模型和结果目录，默认 sweep_runs/<task>')
+    parser.add_argument('--hidden', nargs='+', default=['20,10', '32,16', '64,32', '32', '64,32,16'],
+                        help='隐藏层宽度组合，每项为逗号分隔的层宽')
+    parser.add_argument('--dropout', nargs='+', default=['0.2,0.4', '0.1,0.2', '0,0'],
+                        help='Dropout组合，每项为逗号分隔的各层Dropout比例')
+    parser.add_argument('--learning_rate', nargs='+', type=float, default=[0.001, 0.003])
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--epochs', type=int, default=200, help='每个任务的最大训练轮数（早停会提前结束）')
+    parser.add_argument('--patience', type=int, default=10)
+    parser.add_argument('--jobs', type=int, default=0, help='并行进程数，0为CPU核心数')
+    parser.add_argument('--quantization', choices=['float', 'dynamic'], default='dynamic',
+                        help='导出TFLite的量化方式')
+    parser.add_argument('--latency_budget', type=float, default=None, help='延迟预算（µs），输出预算内最准确的模型')
+    parser.add_argument('--augment_copies', type=int, default=0,
+                        help='训练集离线增强：每个样本生成的增强样本数，结果保存在数据缓存中供所有任务共享')
+    parser.add_argument('--balance', action='store_true', help='离线增强时按类别过采样，使各类别样本数相同')
+    parser.add_argument('--mirror_labels', default=None, help='镜像增强的标签映射，如 1:2,2:1')
+    parser.add_argument('--train_size', type=float, default=0.75)
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    return parser.parse_args()
+
+
+def prepare_arrays(files, task, work_dir, train_size, seed, augment_copies=0, balance=False,
+                   mirror_labels=None):
+    """
+    解析CSV并保存为 .npy（数据集和参数未变化时复用），返回各数组路径
+    augment_copies > 0 或 balance 时训练集以离线增强后的样本保存，验证集保持原样
+    """
+    num_features = TASKS[task]['num_features']
+    digest = hashlib.sha1()
+    for path in files:
+        stat = os.stat(path)
+        digest.update(f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    digest.update(f'{num_features}:{train_size}:{seed}:{augment_copies}:{balance}:{mirror_labels}'.encode())
+    data_dir = os.path.join(work_dir, 'data', digest.hexdigest()[:12])
+
+    paths = {name: os.path.join(data_dir, f'{name}.npy')
+             for name in ('train_x', 'train_y', 'val_x', 'val_y')}
+    if all(os.path.isfile(path) for path in paths.values()):
+        return paths
+
+    os.makedirs(data_dir, exist_ok=True)
+    split = dict(train_size=train_size, seed=seed, cache='none')
+    train_x, train_y = load_samples(make_dataset(files, num_features, 'train', **split))
+    val_x, val_y = load_samples(make_dataset(files, num_features, 'val', **split))
+    if augment_copies > 0 or balance:
+        augmenter = LandmarkAugmenter(task, mirror_label_map=parse_label_map(mirror_labels), seed=seed)
+        original = len(train_y)
+        train_x, train_y = augmenter.expand(train_x, train_y, copies=augment_copies, balance=balance)
+        print(f"离线增强: 训练集 {original} -> {len(train_y)} 个样本")
+    for name, array in (('train_x', train_x), ('train_y', train_y), ('val_x', val_x), ('val_y', val_y)):
+        np.save(paths[name], array)
+    return paths
+
+
+def make_jobs(args):
+    """展开搜索网格，Dropout层数不足时按最后一项补齐"""
+    jobs = []
+    for hidden, dropout, learning_rate in itertools.product(args.hidden, args.dropout, args.learning_rate):
+        hidden_units = tuple(int(value) for value in hidden.split(','))
+        dropouts = [float(value) for value in dropout.split(',')]
+        dropouts = tuple((dropouts + dropouts[-1:] * len(hidden_units))[:len(hidden_units)])
+        job_id = (f"h{'-'.join(map(str, hidden_units))}"
+                  f"_d{'-'.join(f'{value:g}' for value in dropouts)}_lr{learning_rate:g}")
+        jobs.append({
+            'job_id': job_id,
+            'hidden_units': hidden_units,
+            'dropouts': dropouts,
+            'learning_rate': learning_rate,
+        })
+    return jobs
+
+
+def init_worker():
+    """每个进程只用单线程计算，避免多个进程的线程池互相争抢CPU"""
+    import tensorflow as tf
+
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+
+
+def run_job(job, task, num_classes, arrays, settings):
+    """训练一个组合并导出TFLite（在子进程中执行）"""
+    import tensorflow as tf
+    from train_classifier import build_model
+
+    tf.keras.utils.set_random_seed(settings['seed'])
+    train_x = np.load(arrays['train_x'], mmap_mode='r')
+    train_y = np.load(arrays['train_y'], mmap_mode='r')
+    val_x = np.load(arrays['val_x'], mmap_mode='r')
+    val_y = np.load(arrays['val_y'], mmap_mode='r')
+
+    model = build_model(task, num_classes, job['hidden_units'], job['dropouts'], job['learning_rate'])
+    start = time.perf_counter()
+    history = model.fit(
+        train_x, train_y,
+        validation_data=(val_x, val_y),
+        epochs=settings['epochs'],
+        batch_size=settings['batch_size'],
+        callbacks=[tf.keras.callbacks.EarlyStopping(patience=settings['patience'],
+                                                    restore_best_weights=True)],
+        verbose=0,
+    )
+    train_seconds = time.perf_counter() - start
+
+    tflite_path = os.path.join(settings['model_dir'], f"{job['job_id']}.tflite")
+    export_tflite(model, tflite_path, quantization=settings['quantization'])
+    return dict(job,
+                params=int(model.count_params()),
+                epochs=len(history.history['loss']),
+                train_seconds=round(train_seconds, 2),
+                tflite_path=tflite_path,
+                data_dir=os.path.dirname(arrays['train_x']))
+
+
+def pareto_front(results):
+    """准确率-延迟的帕累托前沿：不存在另一个模型同时更快且更准确"""
+    front = []
+    best_accuracy = -1.0
+    for result in sorted(results, key=lambda r: (r['latency_us'], -r['accuracy'])):
+        if result['accuracy'] > best_accuracy:
+            front.append(result)
+            best_accuracy = result['accuracy']
+    return front
+
+
+def print_results(title, results):
+    print(title)
+    print(f"{'组合':<32}{'参数量':>8}{'大小(KB)':>10}{'准确率':>10}{'延迟(µs)':>10}")
+    for result in results:
+        print(f"{result['job_id']:<32}{result['params']:>8}{result['size'] / 1024:>10.1f}"
+              f"{result['accuracy']:>10.4f}{result['latency_us']:>10.1f}")
+
+
+def load_results(path):
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return {result['job_id']: result for result in map(json.loads, filter(str.strip, f))}
+
+
+def main():
+    args = get_args()
+    config = TASKS[args.task]
+    work_dir = args.work_dir or os.path.join('sweep_runs', args.task)
+    model_dir = os.path.join(work_dir, 'models')
+    os.makedirs(model_dir, exist_ok=True)
+    results_path = os.path.join(work_dir, 'results.jsonl')
+
+    # 数据集只解析一次，之后所有进程以内存映射读取 ####################################
+    files = resolve_dataset_files(args.dataset or [config['dataset']])
+    arrays = prepare_arrays(files, args.task, work_dir, args.train_size, args.seed,
+                            args.augment_copies, args.balance, args.mirror_labels)
+    train_y = np.load(arrays['train_y'], mmap_mode='r')
+    val_x = np.load(arrays['val_x'], mmap_mode='r')
+    val_y = np.load(arrays['val_y'], mmap_mode='r')
+    if len(train_y) == 0 or len(val_y) == 0:
+        raise SystemExit('数据集为空或样本过少')
+    num_classes = int(max(train_y.max(), val_y.max())) + 1
+    print(f"训练 {len(train_y)} 个样本，验证 {len(val_y)} 个样本，{num_classes} 个类别")
+
+    # 并行训练（已完成的组合直接复用结果，中断后可继续） ###################################
+    jobs = make_jobs(args)
+    finished = load_results(results_path)
+    data_dir = os.path.dirname(arrays['train_x'])
+    pending = [job for job in jobs if job['job_id'] not in finished
+               or finished[job['job_id']].get('data_dir') != data_dir
+               or not os.path.isfile(finished[job['job_id']]['tflite_path'])]
+    processes = args.jobs or os.cpu_count() or 1
+    print(f"共 {len(jobs)} 个组合，待训练 {len(pending)} 个，{processes} 个进程并行")
+
+    settings = {
+        'epochs': args.epochs,
+        'batch_size': args.batch_size,
+        'patience': args.patience,
+        'quantization': args.quantization,
+        'model_dir': model_dir,
+        'seed': args.seed,
+    }
+    if pending:
+        start = time.perf_counter()
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(min(processes, len(pending)), initializer=init_worker) as pool:
+            tasks = [pool.apply_async(run_job, (job, args.task, num_classes, arrays, settings))
+                     for job in pending]
+            for done, task in enumerate(tasks, 1):
+                trained = task.get()
+                finished[trained['job_id']] = trained
+                print(f"[{done}/{len(tasks)}] {trained['job_id']}: {trained['epochs']} 轮，"
+                      f"{trained['train_seconds']:.1f}s")
+        print(f"训练耗时 {time.perf_counter() - start:.1f}s")
+
+    # 串行测量，避免并行训练干扰延迟数据 ################################################
+    val_x = np.ascontiguousarray(val_x)
+    results = []
+    for job in jobs:
+        result = finished[job['job_id']]
+        metrics = benchmark_tflite(args.task, result['tflite_path'], val_x, np.asarray(val_y))
+        metrics.pop('predictions')
+        result.update(metrics)
+        results.append(result)
+
+    with open(results_path, 'w', encoding='utf-8') as f:
+        for result in finished.values():
+            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    print_results('全部结果（按准确率排序）', sorted(results, key=lambda r: -r['accuracy']))
+    front = pareto_front(results)
+    print_results('帕累托前沿（按延迟排序）', front)
+
+    if args.latency_budget is not None:
+        within_budget = [result for result in front if result['latency_us'] <= args.latency_budget]
+        if within_budget:
+            best = within_budget[-1]
+            print(f"延迟预算 {args.latency_budget:g}µs 内最准确: {best['job_id']}"
+                  f"（准确率 {best['accuracy']:.4f}，{best['latency_us']:.1f}µs）→ {best['tflite_path']}")
+        else:
+            print(f"没有模型满足延迟预算 {args.latency_budget:g}µs")
+    print(f"结果已写入: {results_path}")
+
+
+if __name__ == '__main__':
+    main()
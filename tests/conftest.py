@@ -0,0 +1,65 @@
+import os
+import sys
+
+# 测试从项目根目录导入 utils / model / gesture_control_app
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+import types
+
+import pytest
+
+
+class FakeRecognitionService:
+    """代替 GestureRecognitionService（路由测试不加载 MediaPipe 和模型）"""
+
+    keypoint_classifier = None
+
+    def __init__(self, *args, **kwargs):
+        self.closed = False
+
+    def spawn(self):
+        return FakeRecognitionService()
+
+    def close(self):
+        self.closed = True
+
+    def reset_history(self):
+        pass
+
+    def draw_landmarks_on_image(self, image, landmarks):
+        return image
+
+    def process_frame(self, image, timestamp=None):
+        return {'hand_detected': False}
+
+    def process_landmarks(self, *args, **kwargs):
+        return {'hand_detected': False}
+
+    def process_batch(self, images, timestamps=None):
+        return [{'hand_detected': False} for _ in images]
+
+    def get_interpreter_pool_stats(self):
+        return {}
+
+
+@pytest.fixture(scope='session')
+def backend():
+    """导入后端 app 模块（识别服务替换为 FakeRecognitionService）"""
+    module_name = 'gesture_control_app.backend.gesture_service'
+    original = sys.modules.get(module_name)
+    fake_module = types.ModuleType(module_name)
+    fake_module.GestureRecognitionService = FakeRecognitionService
+    sys.modules[module_name] = fake_module
+    try:
+        from gesture_control_app.backend import app as backend_app
+    finally:
+        if original is not None:
+            sys.modules[module_name] = original
+        else:
+            sys.modules.pop(module_name, None)
+    yield backend_app
+    backend_app.asset_index.stop()
+    backend_app.frame_scheduler.shutdown()
@@ -0,0 +1,41 @@
+import threading
+import time
+import zipfile
+
+from gesture_control_app.backend import asset_index as asset_index_module
+from gesture_control_app.backend.asset_index import AssetIndex
+
+
+def make_pptx(path, slides):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for index in range(1, slides + 1):
+            archive.writestr(f'ppt/slides/slide{index}.xml', '<p:sld/>')
+
+
+def test_uploaded_file_is_probed_in_the_background(tmp_path, monkeypatch):
+    probe_threads = []
+
+    def probe(path):
+        probe_threads.append(threading.current_thread())
+        return asset_index_module.probe_page_count(path)
+
+    monkeypatch.setitem(asset_index_module.METADATA_PROBES, 'presentations', ('pages', probe))
+    (tmp_path / 'presentations').mkdir()
+    index = AssetIndex(str(tmp_path), {'presentations': {'pptx'}}, hash_files=False)
+
+    make_pptx(tmp_path / 'presentations' / 'deck.pptx', 3)
+    index.update_file('presentations', 'deck.pptx', 'ab' * 32)
+    # 上传请求返回时已可见，但尚未探测页数
+    entries, total, _ = index.query('presentations')
+    assert total == 1 and entries[0]['pages'] is None
+    assert probe_threads == []
+
+    index.start()
+    try:
+        deadline = time.monotonic() + 5
+        while index.query('presentations')[0][0]['pages'] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert index.query('presentations')[0][0]['pages'] == 3
+        assert all(thread.name == 'asset-index' for thread in probe_threads)
+    finally:
+        index.stop()
@@ -0,0 +1,48 @@
+import io
+
+import pytest
+
+from gesture_control_app.backend.upload_store import ContentAddressedStore
+
+
+@pytest.fixture
+def client(backend, tmp_path, monkeypatch):
+    store = ContentAddressedStore(str(tmp_path))
+    sha256, _, _ = store.save_stream(io.BytesIO(b'video bytes'))
+    store.link(sha256, 'videos', 'demo.mp4', pinned=True)
+    upload = store.create_upload('videos', 'big.mp4', 100)
+    monkeypatch.setattr(backend, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(backend, 'upload_store', store)
+    client = backend.app.test_client()
+    client.upload_id = upload['upload_id']
+    return client
+
+
+def test_visible_asset_is_served(client):
+    response = client.get('/assets/videos/demo.mp4')
+    assert response.status_code == 200
+    assert response.data == b'video bytes'
+
+
+@pytest.mark.parametrize('path', [
+    '/assets/.store/manifest.json',
+    '/assets/./.store/manifest.json',
+    '/assets/videos/../.store/manifest.json',
+    '/assets/videos/./../.store/manifest.json',
+])
+def test_store_manifest_is_hidden(client, path):
+    assert client.get(path).status_code == 404
+
+
+def test_upload_metadata_is_hidden(client):
+    for path in (f'/assets/./.store/uploads/{client.upload_id}.json',
+                 f'/assets/videos/../.store/uploads/{client.upload_id}.json'):
+        assert client.get(path).status_code == 404
+
+
+def test_check_upload_of_collected_object_is_a_client_error(client, backend, monkeypatch):
+    # 对象在 has_object 之后被回收
+    monkeypatch.setattr(backend.upload_store, 'has_object', lambda sha256: True)
+    response = client.post('/api/upload/check', json={
+        'file_type': 'video', 'filename': 'gone.mp4', 'sha256': 'ab' * 32})
+    assert response.status_code == 400
@@ -0,0 +1,34 @@
+import numpy as np
+
+from clean_dataset import find_duplicates
+
+
+def test_slow_drift_is_not_chained_away():
+    # 同一标签缓慢移动：每帧变化 0.015 小于网格 0.02，累计移动 1.5
+    steps = np.arange(100, dtype=np.float32)[:, None] * 0.015
+    features = np.repeat(steps, 42, axis=1)
+    labels = np.zeros(100, dtype=np.int64)
+    exact, near = find_duplicates(features, labels, np.ones(100, dtype=bool), 0.02)
+
+    kept = ~(exact | near)
+    # 修复前被连锁删除到只剩1行
+    assert kept.sum() >= 35
+    # 相邻两个保留样本之间的变化至少为一个网格
+    kept_values = features[kept, 0]
+    assert np.all(np.diff(kept_values) >= 0.02 - 1e-6)
+
+
+def test_jitter_around_one_pose_is_collapsed():
+    rng = np.random.default_rng(0)
+    features = (0.5 + rng.uniform(-0.004, 0.004, (50, 42))).astype(np.float32)
+    labels = np.zeros(50, dtype=np.int64)
+    exact, near = find_duplicates(features, labels, np.ones(50, dtype=bool), 0.02)
+    assert (~(exact | near)).sum() <= 2
+
+
+def test_label_change_starts_a_new_reference():
+    features = np.zeros((4, 42), dtype=np.float32)
+    features[:, 0] = [0.0, 0.005, 0.01, 0.015]
+    labels = np.array([0, 0, 1, 1])
+    exact, near = find_duplicates(features, labels, np.ones(4, dtype=bool), 0.02)
+    assert list(~(exact | near)) == [True, False, True, False]
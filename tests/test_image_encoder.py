@@ -0,0 +1,26 @@
+import numpy as np
+
+from gesture_control_app.backend.image_encoder import AnnotatedImageEncoder
+
+
+def draw_nothing(image, landmarks):
+    return image
+
+
+def test_preview_canvas_cache_is_bounded():
+    encoder = AnnotatedImageEncoder(draw_nothing, max_cached_sizes=3, max_canvases_per_size=2)
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    for preview_width in range(100, 300):
+        result = encoder.encode(image.copy(), [], {'format': 'jpeg', 'quality': 80,
+                                                   'preview_width': preview_width})
+        assert result['annotated_image_info']['width'] == preview_width
+    assert encoder.cached_canvas_count() <= 3 * 2
+
+
+def test_preview_canvas_is_reused():
+    encoder = AnnotatedImageEncoder(draw_nothing)
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    options = {'format': 'webp', 'quality': 60, 'preview_width': 160}
+    for _ in range(5):
+        encoder.encode(image.copy(), [], options)
+    assert encoder.cached_canvas_count() == 1
@@ -0,0 +1,86 @@
+import base64
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+
+def encode_frame(width=320, height=240):
+    ok, buffer = cv.imencode('.jpg', np.zeros((height, width, 3), dtype=np.uint8))
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer).decode('ascii')
+
+
+@pytest.fixture
+def client(backend, monkeypatch):
+    def process_frame(image, timestamp=None):
+        return {'hand_detected': True, 'landmarks': [[10, 10]] * 21}
+
+    monkeypatch.setattr(backend.gesture_service, 'process_frame', process_frame)
+    monkeypatch.setattr(backend, 'SERVE_MODE', 'sync')
+    return backend.app.test_client()
+
+
+def test_annotated_preview_is_encoded_after_recognition(client):
+    response = client.post('/api/gesture/recognize', json={
+        'image': encode_frame(), 'image_format': 'webp', 'preview_width': 160})
+    assert response.status_code == 200
+    info = response.get_json()['annotated_image_info']
+    assert (info['format'], info['width'], info['height']) == ('webp', 160, 120)
+
+
+def test_landmarks_only_response_has_no_image(client):
+    response = client.post('/api/gesture/recognize', json={'image': encode_frame()})
+    assert response.status_code == 200
+    assert 'annotated_image' not in response.get_json()
+
+
+@pytest.fixture
+def batch_calls(backend, monkeypatch):
+    calls = []
+
+    def process_batch(images, timestamps=None):
+        calls.append(timestamps)
+        return [{'hand_detected': False} for _ in images]
+
+    monkeypatch.setattr(backend.gesture_service, 'process_batch', process_batch)
+    return calls
+
+
+def test_batch_rejects_non_object_frame(client, batch_calls):
+    response = client.post('/api/gesture/recognize_batch', json={'frames': ['x']})
+    assert response.status_code == 400
+    assert batch_calls == []
+
+
+def test_batch_rejects_partial_timestamps(client, batch_calls):
+    response = client.post('/api/gesture/recognize_batch', json={'frames': [
+        {'image': encode_frame(), 'timestamp': 1.0},
+        {'image': encode_frame()},
+    ]})
+    assert response.status_code == 400
+    assert batch_calls == []
+
+
+def test_batch_passes_timestamps_through(client, batch_calls):
+    response = client.post('/api/gesture/recognize_batch', json={'frames': [
+        {'image': encode_frame(), 'timestamp': 1.0},
+        {'image': encode_frame(), 'timestamp': '1.033'},
+    ]})
+    assert response.status_code == 200
+    assert response.get_json()['frame_count'] == 2
+    assert batch_calls == [[1.0, 1.033]]
+
+
+def test_batch_without_timestamps_uses_server_time(client, batch_calls):
+    response = client.post('/api/gesture/recognize_batch', json={'frames': [
+        {'image': encode_frame()}, {'image': encode_frame()}]})
+    assert response.status_code == 200
+    assert batch_calls == [None]
+
+
+def test_non_integer_frame_id_is_rejected(client):
+    response = client.post('/api/gesture/recognize', json={'image': encode_frame(), 'frame_id': 'abc'})
+    assert response.status_code == 400
+    response = client.post('/api/gesture/recognize_landmarks', json={
+        'image_width': 640, 'image_height': 480, 'frame_id': 'abc'})
+    assert response.status_code == 400
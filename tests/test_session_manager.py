@@ -0,0 +1,98 @@
+import threading
+import time
+
+from gesture_control_app.backend.frame_scheduler import FrameScheduler
+from gesture_control_app.backend.session_manager import SessionManager
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class FakeService:
+    """只记录 spawn / close 的服务替身（不加载模型）"""
+
+    def __init__(self, closed):
+        self.closed = closed
+
+    def spawn(self):
+        return FakeService(self.closed)
+
+    def close(self):
+        self.closed.append(self)
+
+    def reset_history(self):
+        pass
+
+
+def test_evicted_sessions_release_scheduler_queues_and_hands():
+    closed = []
+    scheduler = FrameScheduler(max_queue_size=1, max_workers=2)
+    manager = SessionManager(FakeService(closed), max_sessions=3,
+                             on_close=lambda session: scheduler.forget(session.session_id))
+    try:
+        for index in range(10):
+            session = manager.get(f'client-{index}')
+            job = scheduler.submit(session.session_id, lambda: None)
+            assert job.wait(5)
+
+        # 默认会话 + 最近的两个会话
+        assert len(manager.list_sessions()) == 3
+        assert len(closed) == 8
+        # 被淘汰时仍在收尾的队列在处理结束后移除
+        assert wait_until(lambda: scheduler.get_stats()['sessions'] <= 2)
+    finally:
+        scheduler.shutdown()
+
+
+def test_forget_while_running_removes_queue_after_drain():
+    scheduler = FrameScheduler(max_queue_size=1, max_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_frame():
+        started.set()
+        release.wait(5)
+
+    try:
+        job = scheduler.submit('client', slow_frame)
+        assert started.wait(5)
+        scheduler.forget('client')
+        assert scheduler.get_stats()['sessions'] == 1
+        release.set()
+        assert job.wait(5)
+        assert wait_until(lambda: scheduler.get_stats()['sessions'] == 0)
+    finally:
+        scheduler.shutdown()
+
+
+def test_removed_session_is_closed():
+    closed = []
+    manager = SessionManager(FakeService(closed))
+    manager.get('client')
+    assert manager.remove('client')
+    assert len(closed) == 1
+    assert not manager.remove('client')
+
+
+def test_default_session_reset_waits_for_the_frame_in_progress():
+    events = []
+
+    class RecordingService(FakeService):
+        def reset_history(self):
+            events.append('reset')
+
+    manager = SessionManager(RecordingService([]))
+    session = manager.get()
+    remover = threading.Thread(target=manager.remove, args=(session.session_id,))
+    with session.lock:
+        remover.start()
+        time.sleep(0.05)
+        events.append('frame done')
+    remover.join(5)
+    assert events == ['frame done', 'reset']
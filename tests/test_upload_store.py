@@ -0,0 +1,59 @@
+import io
+import os
+
+from gesture_control_app.backend.upload_store import ContentAddressedStore
+
+
+def save(store, data, folder, filename):
+    sha256, size, deduplicated = store.save_stream(io.BytesIO(data))
+    store.link(sha256, folder, filename, pinned=True)
+    return sha256
+
+
+def test_replaced_file_releases_unreferenced_object(tmp_path):
+    store = ContentAddressedStore(str(tmp_path))
+    old = save(store, b'first version', 'videos', 'a.mp4')
+    new = save(store, b'second version', 'videos', 'a.mp4')
+    assert not store.has_object(old)
+    assert store.has_object(new)
+    assert store.object_size(new) == len(b'second version')
+
+
+def test_object_shared_by_another_file_is_kept(tmp_path):
+    store = ContentAddressedStore(str(tmp_path))
+    shared = save(store, b'shared', 'videos', 'a.mp4')
+    save(store, b'shared', 'videos', 'b.mp4')
+    save(store, b'other', 'videos', 'a.mp4')
+    assert store.has_object(shared)
+
+
+def test_startup_sweep_removes_objects_of_deleted_files(tmp_path):
+    store = ContentAddressedStore(str(tmp_path))
+    kept = save(store, b'kept', 'videos', 'kept.mp4')
+    deleted = save(store, b'deleted', 'videos', 'deleted.mp4')
+    os.remove(tmp_path / 'videos' / 'deleted.mp4')
+
+    store = ContentAddressedStore(str(tmp_path))
+    assert store.has_object(kept)
+    assert not store.has_object(deleted)
+    assert store.lookup_hash('videos/deleted.mp4') is None
+
+
+def test_internal_path_is_resolved(tmp_path):
+    store = ContentAddressedStore(str(tmp_path))
+    assert store.is_internal_path(os.path.join(str(tmp_path), '.store'))
+    assert store.is_internal_path(os.path.join(str(tmp_path), 'videos', '..', '.store', 'manifest.json'))
+    assert not store.is_internal_path(os.path.join(str(tmp_path), 'videos', 'a.mp4'))
+    assert not store.is_internal_path(os.path.join(str(tmp_path), '.store-public', 'a.mp4'))
+
+
+def test_dedup_link_keeps_the_pin_of_a_pending_upload(tmp_path):
+    store = ContentAddressedStore(str(tmp_path))
+    # 上传已写入对象但尚未发布
+    pending, _, _ = store.save_stream(io.BytesIO(b'pending'))
+    # 秒传引用同一对象，随后该文件被替换
+    store.link(pending, 'videos', 'b.mp4')
+    save(store, b'other', 'videos', 'b.mp4')
+    assert store.has_object(pending)
+    store.link(pending, 'videos', 'a.mp4', pinned=True)
+    assert store.lookup_hash('videos/a.mp4') == pending
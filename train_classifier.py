@@ -0,0 +1,491 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+手势分类器训练工具（无界面，可在服务器上无人值守运行）
+以流式 tf.data 管道读取采集的CSV数据集（分块解析、缓存、预取），
+训练关键点/轨迹分类器并导出TFLite（可选全整数int8量化）；支持断点续训，按轮输出吞吐量（样本/秒）
+
+示例:
+    python train_classifier.py --task keypoint
+    python train_classifier.py --task point_history --dataset data/*.csv --batch_size 512
+    python train_classifier.py --task keypoint --epochs 300 --threads 8 --cache /tmp/kp.cache
+    python train_classifier.py --task keypoint --int8
+    python train_classifier.py --task point_history --augment_copies 4 --mirror_labels 1:2,2:1
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from utils import LandmarkAugmenter, parse_label_map
+
+RANDOM_SEED = 42
+
+# 任务 -> 输入维度、默认数据集、默认模型路径和网络结构（与训练notebook一致）
+TASKS = {
+    'keypoint': {
+        'num_features': 21 * 2,
+        'dataset': 'model/keypoint_classifier/keypoint.csv',
+        'model_save_path': 'model/keypoint_classifier/keypoint_classifier.keras',
+        'hidden_units': (20, 10),
+        'dropouts': (0.2, 0.4),
+    },
+    'point_history': {
+        'num_features': 16 * 2,
+        'dataset': 'model/point_history_classifier/point_history.csv',
+        'model_save_path': 'model/point_history_classifier/point_history_classifier.keras',
+        'hidden_units': (24, 10),
+        'dropouts': (0.2, 0.5),
+    },
+}
+
+# 每次解析的CSV行数（批量decode_csv比逐行解析快一个数量级）
+DECODE_BATCH = 4096
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='手势分类器训练')
+    parser.add_argument('--task', choices=sorted(TASKS), default='keypoint', help='训练任务')
+    parser.add_argument('--dataset', nargs='+', default=None,
+                        help='CSV数据集（可多个或通配符），默认使用采集模式写入的文件')
+    parser.add_argument('--model_save_path', default=None, help='模型保存路径（.keras）')
+    parser.add_argument('--tflite_save_path', default=None, help='TFLite保存路径，默认与模型同名')
+    parser.add_argument('--num_classes', type=int, default=None, help='类别数，默认按数据集中最大标签推断')
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--epochs', type=int, default=1000, help='最大训练轮数（早停机制会提前结束）')
+    parser.add_argument('--patience', type=int, default=20, help='早停的等待轮数')
+    parser.add_argument('--train_size', type=float, default=0.75, help='训练集比例')
+    parser.add_argument('--threads', type=int, default=0, help='数据管道和TensorFlow的线程数，0为自动')
+    parser.add_argument('--shuffle_buffer', type=int, default=100000, help='打乱缓冲区大小（样本数）')
+    parser.add_argument('--cache', default='memory',
+                        help='解析结果缓存：memory（内存）、none，或缓存文件路径（数据集大于内存时）')
+    parser.add_argument('--backup_dir', default=None,
+                        help='断点续训目录，默认 <模型路径>.backup；训练中断后重新运行同一命令即可续训')
+    parser.add_argument('--augment_copies', type=int, default=0,
+                        help='每个训练样本每轮在线生成的增强样本数（旋转、缩放、抖动、镜像、时间扭曲），0为不增强')
+    parser.add_argument('--mirror_labels', default=None,
+                        help='镜像增强的标签映射，如 1:2,2:1（轨迹镜像后顺逆时针互换，未提供时轨迹不做镜像）')
+    parser.add_argument('--int8', action='store_true',
+                        help='额外导出全整数int8模型（<模型名>_int8.tflite）并输出与浮点模型的对比报告')
+    parser.add_argument('--representative_samples', type=int, default=1000,
+                        help='int8量化校准使用的训练样本数（按标签分层随机抽取）')
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    return parser.parse_args()
+
+
+def resolve_dataset_files(patterns):
+    """展开通配符，返回存在的数据集文件列表"""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        files.extend(matches if matches else [pattern])
+    missing = [path for path in files if not os.path.isfile(path)]
+    if missing:
+        raise FileNotFoundError(f'数据集不存在: {", ".join(missing)}')
+    return files
+
+
+def make_dataset(files, num_features, subset=None, train_size=0.75, seed=RANDOM_SEED,
+                 threads=0, cache='memory'):
+    """
+    构建解析后的样本流 (features[num_features], label)
+
+    参数:
+        files: CSV文件列表，每行格式为 [标签, 特征1, ..., 特征N]
+        num_features: 特征维度
+        subset: 'train' / 'val' / None（全部）。按行号哈希确定性划分，
+                同一份数据每次划分结果相同，无需先把数据读入内存
+        train_size: 训练集比例
+        seed: 划分使用的种子
+        threads: 解析并行度，0为自动
+        cache: 'memory' / 'none' / 缓存文件路径
+
+    返回:
+        tf.data.Dataset: 逐样本的数据集（未打乱、未分批）
+    """
+    parallel = threads if threads > 0 else tf.data.AUTOTUNE
+    record_defaults = [tf.constant([], tf.int32)] + [tf.constant([], tf.float32)] * num_features
+
+    # 多个文件按顺序逐个读取，保证行号（用于划分）稳定
+    dataset = tf.data.TextLineDataset(files, buffer_size=1 << 20)
+
+    if subset is not None:
+        threshold = int(train_size * 10000)
+        seed_tensor = tf.constant(str(seed))
+
+        def in_subset(index, line):
+            bucket = tf.strings.to_hash_bucket_fast(
+                tf.strings.join([seed_tensor, tf.strings.as_string(index)], '-'), 10000)
+            return bucket < threshold if subset == 'train' else bucket >= threshold
+
+        dataset = dataset.enumerate().filter(in_subset).map(lambda index, line: line)
+
+    def decode(lines):
+        columns = tf.io.decode_csv(lines, record_defaults=record_defaults)
+        return tf.stack(columns[1:], axis=1), columns[0]
+
+    dataset = dataset.filter(lambda line: tf.strings.length(tf.strings.strip(line)) > 0)
+    dataset = dataset.batch(DECODE_BATCH).map(decode, num_parallel_calls=parallel).unbatch()
+
+    if cache == 'memory':
+        dataset = dataset.cache()
+    elif cache and cache != 'none':
+        dataset = dataset.cache(cache)
+
+    if threads > 0:
+        options = tf.data.Options()
+        options.threading.private_threadpool_size = threads
+        dataset = dataset.with_options(options)
+    return dataset
+
+
+def count_labels(dataset):
+    """流式统计各标签的样本数，返回 {标签: 数量}"""
+    counts = {}
+    for labels in dataset.map(lambda x, y: y).batch(DECODE_BATCH).as_numpy_iterator():
+        values, frequencies = np.unique(labels, return_counts=True)
+        for value, frequency in zip(values, frequencies):
+            counts[int(value)] = counts.get(int(value), 0) + int(frequency)
+    return counts
+
+
+def build_model(task, num_classes, hidden_units=None, dropouts=None, learning_rate=None):
+    """
+    构建分类网络（默认结构与训练notebook一致）
+
+    参数:
+        task: 'keypoint' / 'point_history'
+        num_classes: 类别数
+        hidden_units: 各隐藏层宽度，默认使用任务的结构
+        dropouts: 各隐藏层之前的Dropout比例
+        learning_rate: Adam学习率，默认使用Keras默认值
+    """
+    config = TASKS[task]
+    hidden_units = hidden_units or config['hidden_units']
+    dropouts = dropouts or config['dropouts']
+
+    layers = [tf.keras.layers.Input((config['num_features'],))]
+    for index, units in enumerate(hidden_units):
+        if index < len(dropouts) and dropouts[index] > 0:
+            layers.append(tf.keras.layers.Dropout(dropouts[index]))
+        layers.append(tf.keras.layers.Dense(units, activation='relu'))
+    layers.append(tf.keras.layers.Dense(num_classes, activation='softmax'))
+
+    model = tf.keras.models.Sequential(layers)
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate) if learning_rate else 'adam',
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
+
+
+def export_tflite(model, tflite_save_path, quantization='dynamic', representative_data=None):
+    """
+    转换为TFLite
+
+    参数:
+        model: Keras模型
+        tflite_save_path: 保存路径
+        quantization: 'float'（不量化）/ 'dynamic'（动态范围量化，权重int8）/
+                      'int8'（全整数量化，输入输出和计算均为int8）
+        representative_data: int8量化使用的代表性样本 (N, num_features)，用于校准激活值范围
+
+    返回:
+        int: 模型字节数
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization != 'float':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'int8':
+        if representative_data is None or len(representative_data) == 0:
+            raise ValueError('int8量化需要代表性样本')
+
+        def representative_dataset():
+            for sample in representative_data:
+                yield [sample[np.newaxis].astype(np.float32)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    tflite_model = converter.convert()
+    with open(tflite_save_path, 'wb') as f:
+        f.write(tflite_model)
+    return len(tflite_model)
+
+
+def load_samples(dataset, limit=None):
+    """将样本流读取为numpy数组 (features, labels)，limit限制最多读取的样本数"""
+    if limit is not None:
+        dataset = dataset.take(limit)
+    features, labels = [], []
+    for batch_features, batch_labels in dataset.batch(DECODE_BATCH).as_numpy_iterator():
+        features.append(batch_features)
+        labels.append(batch_labels)
+    if not features:
+        return np.empty((0, 0), np.float32), np.empty(0, np.int32)
+    return np.concatenate(features), np.concatenate(labels)
+
+
+def load_representative_samples(dataset, limit, seed=RANDOM_SEED):
+    """
+    按标签分层随机抽取int8校准样本
+
+    采集的CSV按标签成段写入，直接取前 limit 行时校准几乎只覆盖前一两个类别，
+    其余类别的激活值范围会被截断。这里读取全部样本后每个类别抽取相同数量
+    （样本不足的类别全部使用，剩余名额从其余样本中随机补足）
+
+    参数:
+        dataset: 逐样本的数据集（make_dataset 的返回值）
+        limit (int): 最多抽取的样本数
+        seed (int): 随机种子
+
+    返回:
+        np.ndarray: 校准样本 (N, num_features)，N <= limit
+    """
+    features, labels = load_samples(dataset)
+    if len(features) <= limit:
+        return features
+    rng = np.random.default_rng(seed)
+    classes = np.unique(labels)
+    quota = limit // len(classes)
+    chosen = [rng.permutation(np.flatnonzero(labels == label))[:quota] for label in classes]
+    chosen = np.concatenate(chosen)
+    remaining = np.setdiff1d(np.arange(len(labels)), chosen)
+    chosen = np.concatenate([chosen, rng.choice(remaining, limit - len(chosen), replace=False)])
+    return features[rng.permutation(chosen)]
+
+
+def make_classifier(task, tflite_path):
+    """以运行时使用的分类器类加载TFLite模型（轨迹分类器关闭置信度阈值，只比较argmax）"""
+    from model import KeyPointClassifier, PointHistoryClassifier
+
+    if task == 'keypoint':
+        return KeyPointClassifier(model_path=tflite_path)
+    return PointHistoryClassifier(model_path=tflite_path, score_th=0.0)
+
+
+def benchmark_tflite(task, tflite_path, features, labels, latency_runs=1000):
+    """
+    评估TFLite模型的大小、准确率和单样本推理延迟
+
+    返回:
+        dict: size, accuracy, latency_us（单样本推理的中位数）, predictions
+    """
+    classifier = make_classifier(task, tflite_path)
+    predictions = classifier.classify_batch(features)
+
+    timings = []
+    for index in range(min(latency_runs, len(features)) or 1):
+        sample = features[index % len(features)]
+        start = time.perf_counter()
+        classifier(sample)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'size': os.path.getsize(tflite_path),
+        'accuracy': float(np.mean(predictions == labels)) if len(labels) else 0.0,
+        'latency_us': float(np.median(timings) * 1e6),
+        'predictions': predictions,
+    }
+
+
+def quantization_report(task, model, tflite_paths, features, labels):
+    """
+    输出各TFLite模型与浮点模型的对比报告（大小、准确率、与浮点模型预测一致率、延迟）
+
+    参数:
+        tflite_paths: {名称: 路径}，如 {'dynamic': ..., 'int8': ...}
+        features, labels: 验证集样本
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        float_path = os.path.join(tmp_dir, 'float32.tflite')
+        export_tflite(model, float_path, quantization='float')
+        results = {'float32': benchmark_tflite(task, float_path, features, labels)}
+    for name, path in tflite_paths.items():
+        results[name] = benchmark_tflite(task, path, features, labels)
+
+    reference = results['float32']
+    print(f"量化对比（验证集 {len(labels)} 个样本，延迟为单样本推理中位数）")
+    print(f"{'模型':<10}{'大小(KB)':>10}{'准确率':>10}{'一致率':>10}{'延迟(µs)':>12}")
+    for name, result in results.items():
+        agreement = float(np.mean(result['predictions'] == reference['predictions']))
+        print(f"{name:<10}{result['size'] / 1024:>10.1f}{result['accuracy']:>10.4f}"
+              f"{agreement:>10.4f}{result['latency_us']:>12.1f}")
+    return results
+
+
+def augment_batches(dataset, augmenter, copies):
+    """
+    在线数据增强：每个批次附加 copies 份随机增强的样本（整批NumPy运算）
+    每轮重新生成，模型不会重复看到相同的增强样本
+    """
+    num_features = int(np.prod(augmenter.shape))
+
+    def augment(features, labels):
+        repeated_features = np.tile(features, (copies, 1))
+        repeated_labels = np.tile(labels, copies)
+        augmented_features, augmented_labels = augmenter(repeated_features, repeated_labels)
+        return (np.concatenate([features, augmented_features]),
+                np.concatenate([labels, augmented_labels]))
+
+    def apply(features, labels):
+        features, labels = tf.numpy_function(augment, [features, labels], [tf.float32, tf.int32])
+        features.set_shape([None, num_features])
+        labels.set_shape([None])
+        return features, labels
+
+    return dataset.map(apply, num_parallel_calls=tf.data.AUTOTUNE)
+
+
+class ThroughputCallback(tf.keras.callbacks.Callback):
+    """按轮输出训练吞吐量（样本/秒）"""
+
+    def __init__(self, train_samples):
+        super().__init__()
+        self.train_samples = train_samples
+        self._epoch_start = None
+        self.samples_per_sec = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._epoch_start
+        rate = self.train_samples / elapsed if elapsed > 0 else 0.0
+        self.samples_per_sec.append(rate)
+        logs = logs or {}
+        print(f"epoch {epoch + 1}: {elapsed:.2f}s，{rate:,.0f} 样本/秒，"
+              f"loss {logs.get('loss', 0):.4f} acc {logs.get('accuracy', 0):.4f} "
+              f"val_loss {logs.get('val_loss', 0):.4f} val_acc {logs.get('val_accuracy', 0):.4f}")
+
+
+def print_confusion_matrix(y_true, y_pred, num_classes):
+    """以文本形式输出混淆矩阵和各类别的精确率/召回率"""
+    matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
+    np.add.at(matrix, (y_true, y_pred), 1)
+
+    width = max(5, len(str(matrix.max())) + 1)
+    print('混淆矩阵（行: 真实标签，列: 预测标签）')
+    print(' ' * 4 + ''.join(f'{label:>{width}}' for label in range(num_classes)))
+    for label in range(num_classes):
+        print(f'{label:>4}' + ''.join(f'{value:>{width}}' for value in matrix[label]))
+
+    print('类别  精确率  召回率  样本数')
+    for label in range(num_classes):
+        support = matrix[label].sum()
+        predicted = matrix[:, label].sum()
+        precision = matrix[label, label] / predicted if predicted else 0.0
+        recall = matrix[label, label] / support if support else 0.0
+        print(f'{label:>4}  {precision:6.3f}  {recall:6.3f}  {support:>6}')
+
+
+def main():
+    args = get_args()
+    config = TASKS[args.task]
+
+    if args.threads > 0:
+        tf.config.threading.set_inter_op_parallelism_threads(args.threads)
+        tf.config.threading.set_intra_op_parallelism_threads(args.threads)
+    tf.keras.utils.set_random_seed(args.seed)
+
+    files = resolve_dataset_files(args.dataset or [config['dataset']])
+    model_save_path = args.model_save_path or config['model_save_path']
+    tflite_save_path = args.tflite_save_path or os.path.splitext(model_save_path)[0] + '.tflite'
+    backup_dir = args.backup_dir or model_save_path + '.backup'
+    os.makedirs(os.path.dirname(os.path.abspath(model_save_path)), exist_ok=True)
+
+    # 数据管道 ###############################################################
+    cache_train = args.cache if args.cache in ('memory', 'none') else args.cache + '.train'
+    cache_val = args.cache if args.cache in ('memory', 'none') else args.cache + '.val'
+    split = dict(train_size=args.train_size, seed=args.seed, threads=args.threads)
+    train_samples_ds = make_dataset(files, config['num_features'], 'train', cache=cache_train, **split)
+    val_samples_ds = make_dataset(files, config['num_features'], 'val', cache=cache_val, **split)
+
+    start = time.perf_counter()
+    train_counts = count_labels(train_samples_ds)
+    val_counts = count_labels(val_samples_ds)
+    train_samples = sum(train_counts.values())
+    val_samples = sum(val_counts.values())
+    if train_samples == 0 or val_samples == 0:
+        raise SystemExit('数据集为空或样本过少，无法划分训练集和验证集')
+    num_classes = args.num_classes or max(max(train_counts), max(val_counts)) + 1
+    print(f"数据集: {', '.join(files)}")
+    print(f"训练 {train_samples} 个样本，验证 {val_samples} 个样本，{num_classes} 个类别，"
+          f"首次解析 {time.perf_counter() - start:.2f}s")
+    for label in range(num_classes):
+        print(f"  类别 {label}: 训练 {train_counts.get(label, 0)}，验证 {val_counts.get(label, 0)}")
+
+    # 已知样本数后声明数据集长度，Keras可据此确定每轮的步数
+    train_samples_ds = train_samples_ds.apply(tf.data.experimental.assert_cardinality(train_samples))
+    val_samples_ds = val_samples_ds.apply(tf.data.experimental.assert_cardinality(val_samples))
+    train_ds = train_samples_ds.shuffle(min(args.shuffle_buffer, train_samples), seed=args.seed,
+                                        reshuffle_each_iteration=True) \
+        .batch(args.batch_size)
+    if args.augment_copies > 0:
+        augmenter = LandmarkAugmenter(args.task, mirror_label_map=parse_label_map(args.mirror_labels),
+                                      seed=args.seed)
+        train_ds = augment_batches(train_ds, augmenter, args.augment_copies)
+        print(f"在线增强: 每个样本每轮附加 {args.augment_copies} 份增强样本")
+    train_ds = train_ds.prefetch(tf.data.AUTOTUNE)
+    val_ds = val_samples_ds.batch(max(args.batch_size, 1024)).prefetch(tf.data.AUTOTUNE)
+
+    # 训练 ###################################################################
+    model = build_model(args.task, num_classes)
+    model.summary()
+
+    throughput = ThroughputCallback(train_samples * (args.augment_copies + 1))
+    callbacks = [
+        # 中断后重新运行同一命令，从最近一轮的状态继续
+        tf.keras.callbacks.BackupAndRestore(backup_dir),
+        tf.keras.callbacks.ModelCheckpoint(model_save_path, monitor='val_loss', save_best_only=True),
+        tf.keras.callbacks.EarlyStopping(patience=args.patience, restore_best_weights=True, verbose=1),
+        throughput,
+    ]
+    if os.path.isdir(backup_dir):
+        print(f"发现断点目录 {backup_dir}，将从中断处继续训练")
+
+    start = time.perf_counter()
+    model.fit(train_ds, validation_data=val_ds, epochs=args.epochs, callbacks=callbacks, verbose=0)
+    elapsed = time.perf_counter() - start
+    if throughput.samples_per_sec:
+        print(f"训练完成: {len(throughput.samples_per_sec)} 轮，{elapsed:.1f}s，"
+              f"中位吞吐量 {np.median(throughput.samples_per_sec):,.0f} 样本/秒")
+
+    # 评估 ###################################################################
+    val_loss, val_acc = model.evaluate(val_ds, verbose=0)
+    print(f"验证集: loss {val_loss:.4f}，accuracy {val_acc:.4f}")
+
+    y_true = np.concatenate([labels for _, labels in val_ds.as_numpy_iterator()])
+    y_pred = np.argmax(model.predict(val_ds, verbose=0), axis=1)
+    print_confusion_matrix(y_true, y_pred, num_classes)
+
+    # 保存为推理专用模型并转换为TFLite ########################################
+    model.save(model_save_path, include_optimizer=False)
+    tflite_bytes = export_tflite(model, tflite_save_path)
+    print(f"模型已保存: {model_save_path}")
+    print(f"TFLite已保存: {tflite_save_path}（{tflite_bytes / 1024:.1f} KB）")
+
+    if args.int8:
+        int8_save_path = os.path.splitext(tflite_save_path)[0] + '_int8.tflite'
+        representative_data = load_representative_samples(
+            train_samples_ds, args.representative_samples, args.seed)
+        int8_bytes = export_tflite(model, int8_save_path, quantization='int8',
+                                   representative_data=representative_data)
+        print(f"int8 TFLite已保存: {int8_save_path}（{int8_bytes / 1024:.1f} KB）")
+
+        val_features, val_labels = load_samples(val_samples_ds)
+        quantization_report(args.task, model, {'dynamic': tflite_save_path, 'int8': int8_save_path},
+                            val_features, val_labels)
+
+
+if __name__ == '__main__':
+    main()
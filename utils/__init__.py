@@ -1 +1,9 @@
-from utils.cvfpscalc import CvFpsCalc
\ No newline at end of file
+from utils.cvfpscalc import CvFpsCalc
+from utils.landmark_log import LandmarkRecorder, read_landmark_log
+from utils.augmentation import LandmarkAugmenter, parse_label_map
+from utils.perf_stats import PerfStats, RollingStats
+from utils.trace import TraceRecorder
+from utils.smoothing import LandmarkSmoother, SMOOTHING_METHODS
+from utils.voting import ConfidenceVoter
+from utils.runtime_config import RuntimeConfig, RUNTIME_OPTIONS
+from utils.camera_capture import CameraCapture, CAPTURE_BACKENDS
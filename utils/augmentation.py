@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+关键点数据增强模块
+==========================================
+功能：对预处理后的训练样本整批进行数据增强（全部为NumPy广播运算，没有逐样本的Python循环）
+- 静态手势（42维，以手腕为原点、按最大绝对值归一化）：旋转、长宽比缩放、抖动、镜像
+- 动态轨迹（32维，16个时间步，以首点为原点、按图像宽高归一化）：时间扭曲、旋转、缩放、抖动、镜像
+- 按类别过采样，缓解采集数据的类别不平衡
+"""
+
+import numpy as np
+
+TASK_SHAPES = {
+    'keypoint': (21, 2),
+    'point_history': (16, 2),
+}
+
+
+def parse_label_map(text):
+    """解析镜像标签映射，如 '1:2,2:1' -> {1: 2, 2: 1}"""
+    if not text:
+        return None
+    label_map = {}
+    for item in text.split(','):
+        source, target = item.split(':')
+        label_map[int(source)] = int(target)
+    return label_map
+
+
+class LandmarkAugmenter(object):
+    """
+    批量数据增强器
+
+    使用示例:
+        augmenter = LandmarkAugmenter('keypoint', seed=0)
+        features, labels = augmenter(features, labels)
+    """
+
+    def __init__(
+        self,
+        task,
+        rotation=15.0,          # 最大旋转角度（度）
+        scale=0.1,              # 最大缩放幅度（静态手势为长宽比缩放，整体缩放会被归一化抵消）
+        jitter=0.01,            # 每个点的高斯抖动标准差
+        mirror_prob=0.5,        # 镜像（左右手互换）概率
+        time_warp=0.2,          # 时间扭曲强度（仅动态轨迹）
+        mirror_label_map=None,  # 镜像后的标签映射（如顺时针<->逆时针），动态轨迹未提供时不做镜像
+        seed=None,
+    ):
+        if task not in TASK_SHAPES:
+            raise ValueError(f'未知任务: {task}')
+        self.task = task
+        self.shape = TASK_SHAPES[task]
+        self.rotation = np.deg2rad(rotation)
+        self.scale = scale
+        self.jitter = jitter
+        self.time_warp = time_warp
+        self.mirror_label_map = mirror_label_map
+        # 轨迹镜像会改变方向语义（顺时针变为逆时针），必须提供标签映射
+        self.mirror_prob = mirror_prob if task == 'keypoint' or mirror_label_map else 0.0
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, features, labels):
+        """
+        对一批样本做随机增强
+
+        参数:
+            features: (N, 42) 或 (N, 32) 预处理后的特征
+            labels: (N,) 标签
+
+        返回:
+            tuple: (增强后的特征 float32, 标签 int32)
+        """
+        points = np.array(features, dtype=np.float32).reshape((-1,) + self.shape)
+        labels = np.array(labels, dtype=np.int32)
+        n = len(points)
+        if n == 0:
+            return points.reshape(0, -1), labels
+
+        if self.task == 'point_history' and self.time_warp > 0:
+            points = self._time_warp(points)
+
+        # 绕原点（手腕 / 轨迹首点）旋转
+        if self.rotation > 0:
+            angle = self.rng.uniform(-self.rotation, self.rotation, n).astype(np.float32)
+            cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+            x, y = points[..., 0].copy(), points[..., 1]
+            points[..., 0] = cos * x - sin * y
+            points[..., 1] = sin * x + cos * y
+
+        # 缩放：静态手势按x/y分别缩放（改变长宽比），轨迹整体缩放（改变移动幅度）
+        if self.scale > 0:
+            factor_shape = (n, 1, 2) if self.task == 'keypoint' else (n, 1, 1)
+            points *= self.rng.uniform(1 - self.scale, 1 + self.scale, factor_shape).astype(np.float32)
+
+        # 抖动后重新以首点为原点
+        if self.jitter > 0:
+            points += self.rng.normal(0, self.jitter, points.shape).astype(np.float32)
+            points -= points[:, :1]
+
+        if self.mirror_prob > 0:
+            mirrored = self.rng.random(n) < self.mirror_prob
+            points[mirrored, :, 0] *= -1
+            if self.mirror_label_map:
+                lookup = np.arange(max(labels.max(), max(self.mirror_label_map)) + 1, dtype=np.int32)
+                for source, target in self.mirror_label_map.items():
+                    lookup[source] = target
+                labels = np.where(mirrored, lookup[labels], labels)
+
+        # 静态手势与运行时预处理一致：按最大绝对值归一化
+        if self.task == 'keypoint':
+            max_value = np.abs(points).reshape(n, -1).max(axis=1)
+            points /= np.where(max_value > 0, max_value, 1)[:, None, None]
+
+        return points.reshape(n, -1), labels
+
+    def _time_warp(self, points):
+        """以随机单调映射重采样16个时间步（线性插值），模拟手势速度变化"""
+        n, steps = points.shape[:2]
+        grid = np.linspace(0, 1, steps, dtype=np.float32)
+        gamma = np.exp(self.rng.normal(0, self.time_warp, (n, 1))).astype(np.float32)
+        positions = grid[None, :] ** gamma * (steps - 1)
+
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.minimum(lower + 1, steps - 1)
+        frac = (positions - lower)[..., None]
+        start = np.take_along_axis(points, lower[..., None], axis=1)
+        end = np.take_along_axis(points, upper[..., None], axis=1)
+        return start + (end - start) * frac
+
+    def expand(self, features, labels, copies=1, balance=False, batch_size=65536):
+        """
+        生成增强数据集（保留原始样本）
+
+        参数:
+            features, labels: 原始样本
+            copies: 每个原始样本生成的增强样本数
+            balance: 是否按类别过采样，使各类别的样本数相同
+            batch_size: 每批处理的样本数（控制内存占用）
+
+        返回:
+            tuple: (features, labels)，原始样本在前
+        """
+        features = np.asarray(features, dtype=np.float32)
+        labels = np.asarray(labels, dtype=np.int32)
+        source = self.sample_indices(labels, copies, balance)
+
+        out_features = np.empty((len(labels) + len(source), features.shape[1]), dtype=np.float32)
+        out_labels = np.empty(len(labels) + len(source), dtype=np.int32)
+        out_features[:len(labels)] = features
+        out_labels[:len(labels)] = labels
+        for start in range(0, len(source), batch_size):
+            index = source[start:start + batch_size]
+            end = len(labels) + start + len(index)
+            out_features[len(labels) + start:end], out_labels[len(labels) + start:end] = \
+                self(features[index], labels[index])
+        return out_features, out_labels
+
+    def sample_indices(self, labels, copies=1, balance=False):
+        """
+        选出要增强的原始样本下标
+        balance时按类别有放回抽样，使每个类别（原始+增强）都达到 最大类别样本数 × (copies + 1)
+        """
+        if not balance:
+            return np.tile(np.arange(len(labels)), copies)
+        classes, counts = np.unique(labels, return_counts=True)
+        target = counts.max() * (copies + 1)
+        index = [self.rng.choice(np.flatnonzero(labels == label), target - count)
+                 for label, count in zip(classes, counts)]
+        return np.concatenate(index) if index else np.empty(0, dtype=np.int64)
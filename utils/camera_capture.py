@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+低延迟摄像头采集模块
+==========================================
+功能：代替直接使用 cv.VideoCapture，减少画面滞后
+- 可选择采集后端（V4L2 / FFmpeg 等）、像素格式（FOURCC，如 MJPG）、驱动缓冲区数量和目标帧率
+  （YUYV 在 960x540 以上受USB带宽限制，MJPG 可以达到更高帧率）
+- 采集线程持续取帧，只保留最新的一帧：处理慢于摄像头时丢弃旧帧，而不是在驱动缓冲区中排队
+- 三缓冲：采集线程写入后台缓冲区，与最新帧交换，读取时再与前台缓冲区交换，取帧不复制也不分配
+- 每帧记录取到的时间（perf_counter_ns），用于计算采集到结果的延迟
+"""
+
+import threading
+import time
+
+import cv2 as cv
+
+# 名称 -> OpenCV 采集后端编号
+CAPTURE_BACKENDS = {
+    'auto': cv.CAP_ANY,
+    'v4l2': cv.CAP_V4L2,
+    'ffmpeg': cv.CAP_FFMPEG,
+    'gstreamer': cv.CAP_GSTREAMER,
+    'dshow': cv.CAP_DSHOW,
+    'msmf': cv.CAP_MSMF,
+    'avfoundation': cv.CAP_AVFOUNDATION,
+}
+
+
+def decode_fourcc(value):
+    """将 CAP_PROP_FOURCC 的数值转换为四字符字符串（如 'MJPG'）"""
+    value = int(value)
+    return ''.join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00')
+
+
+class CameraCapture(object):
+    """
+    低延迟摄像头采集（接口与 cv.VideoCapture 的 read / release 相同）
+
+    使用示例:
+        capture = CameraCapture(0, width=960, height=540, backend='v4l2', fourcc='MJPG')
+        ret, image = capture.read()          # 最新的一帧（线程模式下不会读到排队的旧帧）
+        latency_ms = (time.perf_counter_ns() - capture.capture_ns) / 1e6
+        capture.release()
+
+    线程模式下返回的图像在下一次 read() 前有效，之后其缓冲区会被复用，需要保留时请复制
+    """
+
+    def __init__(
+        self,
+        source=0,               # 摄像头编号或视频文件路径
+        width=None,             # 请求的分辨率（驱动可能选择最接近的支持值）
+        height=None,
+        backend='auto',         # 采集后端，见 CAPTURE_BACKENDS
+        fourcc='MJPG',          # 像素格式，None或空字符串表示使用驱动默认格式
+        buffer_size=1,          # 驱动缓冲区数量（CAP_PROP_BUFFERSIZE），None表示不设置
+        fps=None,               # 目标帧率，None表示不设置
+        threaded=None,          # 是否使用采集线程，None时摄像头使用、视频文件不使用（避免跳帧）
+        tracer=None,            # utils.trace.TraceRecorder，记录采集线程的 grab 事件
+    ):
+        if backend not in CAPTURE_BACKENDS:
+            raise ValueError(f'未知的采集后端: {backend}，可选 {", ".join(CAPTURE_BACKENDS)}')
+        if fourcc and len(fourcc) != 4:
+            raise ValueError(f'FOURCC 必须为4个字符: {fourcc}')
+        self.source = source
+        self.backend = backend
+        self.tracer = tracer
+        self.threaded = isinstance(source, int) if threaded is None else threaded
+
+        self.cap = cv.VideoCapture(source, CAPTURE_BACKENDS[backend])
+        if not self.cap.isOpened():
+            raise RuntimeError(f'无法打开视频源 {source}（后端 {backend}）')
+        # V4L2 需要先设置像素格式，再设置分辨率，否则可能回落到该格式不支持的分辨率
+        if fourcc:
+            self.cap.set(cv.CAP_PROP_FOURCC, cv.VideoWriter_fourcc(*fourcc))
+        if width:
+            self.cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv.CAP_PROP_FPS, fps)
+        if buffer_size is not None:
+            self.cap.set(cv.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        self.capture_ns = 0         # 最近一次 read() 返回的帧被取到的时间
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._back = None           # 采集线程正在写入的缓冲区
+        self._latest = None         # 最新的完整帧
+        self._latest_ns = 0
+        self._front = None          # 调用方持有的帧
+        self._seq = 0               # 已取到的帧数
+        self._read_seq = 0          # 最近一次 read() 返回的帧序号
+        self._stopped = False
+        self._dropped = 0
+        self._started_ns = time.perf_counter_ns()
+        self._thread = None
+        if self.threaded:
+            self._thread = threading.Thread(target=self._grab_loop, name='camera-grab', daemon=True)
+            self._thread.start()
+
+    @property
+    def settings(self):
+        """驱动实际采用的设置（可能与请求的不同）"""
+        return {
+            'backend': self.cap.getBackendName(),
+            'width': int(self.cap.get(cv.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.cap.get(cv.CAP_PROP_FRAME_HEIGHT)),
+            'fourcc': decode_fourcc(self.cap.get(cv.CAP_PROP_FOURCC)),
+            'fps': round(self.cap.get(cv.CAP_PROP_FPS), 2),
+            'buffer_size': int(self.cap.get(cv.CAP_PROP_BUFFERSIZE)),
+            'threaded': self.threaded,
+        }
+
+    def describe(self):
+        """单行描述（启动时打印）"""
+        settings = self.settings
+        return (f"{settings['backend']} {settings['width']}x{settings['height']} {settings['fourcc'] or '-'} "
+                f"{settings['fps']}fps buffer={settings['buffer_size']} "
+                f"{'grab thread' if self.threaded else 'direct'}")
+
+    def _grab_loop(self):
+        while True:
+            start_ns = time.perf_counter_ns()
+            # grab() 返回时帧已到达，在解码（retrieve）之前记录时间
+            if self._stopped or not self.cap.grab():
+                break
+            grabbed_ns = time.perf_counter_ns()
+            ret, frame = self.cap.retrieve(self._back)
+            if not ret:
+                break
+            if self.tracer is not None:
+                self.tracer.add('grab', start_ns, time.perf_counter_ns(), self._seq)
+            with self._new_frame:
+                if self._seq > self._read_seq:
+                    self._dropped += 1      # 上一帧还没被读取就被覆盖
+                # 与最新帧交换：刚写完的帧成为最新帧，旧的最新帧作为下一次的后台缓冲区
+                self._back, self._latest = self._latest, frame
+                self._latest_ns = grabbed_ns
+                self._seq += 1
+                self._new_frame.notify_all()
+        with self._new_frame:
+            self._stopped = True
+            self._new_frame.notify_all()
+
+    def read(self, timeout=None):
+        """
+        读取一帧
+
+        线程模式下等待一帧比上次返回的更新的帧，返回时直接交换缓冲区（不复制）
+
+        参数:
+            timeout (float): 最长等待时间（秒），None为一直等待
+
+        返回:
+            tuple: (是否成功, BGR图像)，视频源结束或超时时为 (False, None)
+        """
+        if not self.threaded:
+            ret, frame = self.cap.read(self._front)
+            if ret:
+                self._front = frame
+                self.capture_ns = time.perf_counter_ns()
+                self._seq += 1
+                self._read_seq = self._seq
+            return ret, frame if ret else None
+
+        with self._new_frame:
+            if not self._new_frame.wait_for(lambda: self._seq > self._read_seq or self._stopped, timeout):
+                return False, None
+            if self._seq == self._read_seq:
+                return False, None      # 已停止且没有新帧
+            # 调用方上次持有的缓冲区交给采集线程复用
+            self._front, self._latest = self._latest, self._front
+            self._read_seq = self._seq
+            self.capture_ns = self._latest_ns
+            return True, self._front
+
+    def get_stats(self):
+        """
+        采集统计
+
+        返回:
+            dict: grabbed（取到的帧数）/ dropped（未被读取即被新帧覆盖的帧数）/ grab_fps（采集帧率）
+        """
+        with self._lock:
+            grabbed = self._seq
+            dropped = self._dropped
+        elapsed = (time.perf_counter_ns() - self._started_ns) / 1e9
+        return {
+            'grabbed': grabbed,
+            'dropped': dropped,
+            'drop_rate': round(dropped / grabbed, 4) if grabbed else 0.0,
+            'grab_fps': round(grabbed / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+    def release(self):
+        """停止采集线程并释放摄像头"""
+        self._stopped = True
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.cap.release()
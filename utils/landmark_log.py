@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+关键点录制日志模块
+==========================================
+功能：以紧凑的定长二进制格式录制每帧的原始MediaPipe关键点（含z坐标）、
+左右手信息和时间戳，并支持一次性读取为NumPy结构化数组，用于离线回放
+"""
+
+import struct
+
+import numpy as np
+
+# 文件头：魔数、版本号、关键点数量、坐标维度
+MAGIC = b'HGLM'
+VERSION = 1
+NUM_LANDMARKS = 21
+NUM_DIMS = 3
+_HEADER = struct.Struct('<4sHHH')
+
+HANDEDNESS_LABELS = ('Left', 'Right')
+HANDEDNESS_UNKNOWN = 255
+
+# 每帧记录（定长 266 字节），未检测到手时 hand=0 且关键点全为0
+FRAME_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('width', '<u2'),
+    ('height', '<u2'),
+    ('hand', 'u1'),
+    ('handedness', 'u1'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, NUM_DIMS)),
+])
+
+
+class LandmarkRecorder(object):
+    """
+    关键点录制器
+
+    使用示例:
+        with LandmarkRecorder('session.hglm') as recorder:
+            recorder.write_frame(timestamp, width, height, landmarks, 'Right')
+    """
+
+    def __init__(self, path, buffering=1 << 16):
+        self.path = path
+        self.frame_count = 0
+        self._record = np.zeros(1, dtype=FRAME_DTYPE)
+        self._file = open(path, 'wb', buffering=buffering)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS, NUM_DIMS))
+
+    def write_frame(self, timestamp, width, height, landmarks=None, handedness=None):
+        """
+        写入一帧
+
+        参数:
+            timestamp (float): 帧时间戳（秒）
+            width, height (int): 图像尺寸
+            landmarks: 归一化关键点 (21, 3)，未检测到手时为None
+            handedness (str): 'Left' / 'Right'
+        """
+        record = self._record[0]
+        record['timestamp'] = timestamp
+        record['width'] = width
+        record['height'] = height
+        if landmarks is None:
+            record['hand'] = 0
+            record['handedness'] = HANDEDNESS_UNKNOWN
+            record['landmarks'] = 0
+        else:
+            landmarks = np.asarray(landmarks, dtype=np.float32)
+            record['hand'] = 1
+            record['handedness'] = (HANDEDNESS_LABELS.index(handedness)
+                                    if handedness in HANDEDNESS_LABELS else HANDEDNESS_UNKNOWN)
+            record['landmarks'] = 0
+            record['landmarks'][:, :landmarks.shape[1]] = landmarks
+        self._file.write(self._record.tobytes())
+        self.frame_count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_landmark_log(path):
+    """
+    读取关键点日志
+
+    返回:
+        np.ndarray: FRAME_DTYPE 结构化数组，每个元素为一帧
+    """
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError(f'关键点日志文件头不完整: {path}')
+        magic, version, num_landmarks, num_dims = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f'不是关键点日志文件: {path}')
+        if version != VERSION or (num_landmarks, num_dims) != (NUM_LANDMARKS, NUM_DIMS):
+            raise ValueError(f'不支持的关键点日志版本: v{version} ({num_landmarks}x{num_dims})')
+        data = f.read()
+
+    # 忽略末尾未写完整的记录（例如录制进程被中断）
+    frame_count = len(data) // FRAME_DTYPE.itemsize
+    return np.frombuffer(data, dtype=FRAME_DTYPE, count=frame_count)
+
+
+def handedness_label(code):
+    """将日志中的左右手编码转换为标签"""
+    return HANDEDNESS_LABELS[code] if code < len(HANDEDNESS_LABELS) else None
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+滚动性能统计模块
+==========================================
+功能：以O(1)代价记录每帧耗时与各阶段耗时
+- 滑动窗口内的均值（累加和随环形缓冲区增量更新）
+- 滑动窗口内的分位数（固定大小的对数分桶直方图，无需排序）
+- 命名阶段计时器，找出耗时占比最高的阶段
+"""
+
+import math
+import threading
+import time
+
+import numpy as np
+
+# 直方图范围：0.001ms ~ 10s，对数分桶（96个桶时相邻桶边界相差约18%）
+_MIN_MS = 0.001
+_MAX_MS = 10000.0
+
+
+class RollingStats(object):
+    """
+    滑动窗口统计（单位：毫秒）
+
+    使用示例:
+        stats = RollingStats(window=120)
+        stats.add(16.7)
+        p95 = stats.percentile(95)
+    """
+
+    def __init__(self, window=120, bins=96):
+        self.window = window
+        self._values = np.zeros(window, dtype=np.float64)
+        self._bin_of = np.zeros(window, dtype=np.int32)
+        self._hist = np.zeros(bins, dtype=np.int32)
+        self._log_min = math.log(_MIN_MS)
+        self._bin_width = (math.log(_MAX_MS) - self._log_min) / bins
+        # 每个桶的代表值取几何中点
+        self._bin_value = np.exp(self._log_min + (np.arange(bins) + 0.5) * self._bin_width)
+        self._pos = 0
+        self._count = 0
+        self._sum = 0.0
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def _bin(self, value):
+        if value <= _MIN_MS:
+            return 0
+        index = int((math.log(value) - self._log_min) / self._bin_width)
+        return min(index, len(self._hist) - 1)
+
+    def add(self, value):
+        """记录一个值：替换窗口中最旧的值，同步更新累加和与直方图"""
+        index = self._bin(value)
+        with self._lock:
+            pos = self._pos
+            if self._count == self.window:
+                self._sum -= self._values[pos]
+                self._hist[self._bin_of[pos]] -= 1
+            else:
+                self._count += 1
+            self._values[pos] = value
+            self._bin_of[pos] = index
+            self._hist[index] += 1
+            self._sum += value
+            self._last = value
+            self._pos = (pos + 1) % self.window
+            if self._pos == 0:
+                # 每绕一圈重新求和一次，消除浮点累加误差
+                self._sum = float(self._values.sum())
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def last(self):
+        return self._last
+
+    @property
+    def mean(self):
+        return self._sum / self._count if self._count else 0.0
+
+    @property
+    def total(self):
+        """窗口内的总和"""
+        return self._sum
+
+    def percentile(self, p):
+        """按直方图估计第p百分位数（误差在一个桶宽以内）"""
+        with self._lock:
+            if self._count == 0:
+                return 0.0
+            rank = max(1, math.ceil(self._count * p / 100.0))
+            index = int(np.searchsorted(np.cumsum(self._hist), rank))
+        return float(self._bin_value[index])
+
+    def as_dict(self):
+        return {
+            'last': round(self._last, 3),
+            'mean': round(self.mean, 3),
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'p99': round(self.percentile(99), 3),
+            'count': self._count,
+        }
+
+
+class _StageTimer(object):
+    """
+    可复用的阶段计时上下文（每个阶段一个实例，不在每帧创建对象）
+    同一帧内多次进入的耗时会累加，由 PerfStats.tick 每帧记录一次
+    同一阶段不能在多个线程中同时计时，多线程场景请使用 PerfStats.record
+    """
+
+    def __init__(self, perf, name):
+        self.pending = 0.0
+        self._perf = perf
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        self.pending += (end - self._start) / 1e6
+        tracer = self._perf.tracer
+        if tracer is not None:
+            tracer.add(self._name, self._start, end, self._perf.frame_index)
+        return False
+
+
+class PerfStats(object):
+    """
+    帧率与分阶段耗时统计
+
+    使用示例:
+        perf = PerfStats()
+        while True:
+            fps = perf.tick()
+            with perf.stage('detect'):
+                results = hands.process(image)
+        perf.snapshot()  # {'fps', 'frame_ms', 'stages', 'dominant_stage'}
+
+    传入 tracer（utils.trace.TraceRecorder）时，每帧和每个阶段同时记录为时间线事件
+    """
+
+    def __init__(self, window=120, tracer=None):
+        self.window = window
+        self.tracer = tracer
+        self.frame = RollingStats(window)
+        self.stages = {}
+        self.frame_index = -1
+        self._timers = {}
+        self._last_tick = None
+        self._lock = threading.Lock()
+
+    def tick(self):
+        """
+        标记一帧开始：记录与上一帧的间隔，以及上一帧中各阶段计时器的累计耗时
+        （本帧未执行的阶段记为0，使各阶段的窗口覆盖相同的帧）
+
+        返回:
+            float: 当前帧率
+        """
+        now = time.perf_counter_ns()
+        if self._last_tick is not None:
+            self.frame.add((now - self._last_tick) / 1e6)
+            for name, timer in self._timers.items():
+                self.stages[name].add(timer.pending)
+                timer.pending = 0.0
+            if self.tracer is not None:
+                self.tracer.add('frame', self._last_tick, now, self.frame_index)
+        self._last_tick = now
+        self.frame_index += 1
+        return self.fps()
+
+    def _get_stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(name, RollingStats(self.window))
+        return stats
+
+    def stage(self, name):
+        """返回阶段计时器，用于单线程帧循环中的 with 语句"""
+        timer = self._timers.get(name)
+        if timer is None:
+            self._get_stats(name)
+            timer = self._timers.setdefault(name, _StageTimer(self, name))
+        return timer
+
+    def record(self, name, ms):
+        """直接记录一个阶段耗时（毫秒），可在多个线程中调用"""
+        self._get_stats(name).add(ms)
+
+    def record_frame(self, ms):
+        """直接记录一帧的处理耗时（毫秒），用于没有单一帧循环的服务端"""
+        self.frame.add(ms)
+
+    def fps(self):
+        mean = self.frame.mean
+        return round(1000.0 / mean, 2) if mean > 0 else 0.0
+
+    def dominant_stage(self):
+        """
+        窗口内累计耗时最高的阶段
+
+        返回:
+            tuple: (阶段名, 占各阶段总耗时的比例)，没有数据时为 (None, 0.0)
+        """
+        totals = {name: stats.total for name, stats in list(self.stages.items())}
+        overall = sum(totals.values())
+        if overall <= 0:
+            return None, 0.0
+        name = max(totals, key=totals.get)
+        return name, totals[name] / overall
+
+    def snapshot(self):
+        dominant, share = self.dominant_stage()
+        return {
+            'fps': self.fps(),
+            'frame_ms': self.frame.as_dict(),
+            'stages': {name: stats.as_dict() for name, stats in list(self.stages.items())},
+            'dominant_stage': {'name': dominant, 'share': round(share, 3)},
+        }
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+运行时配置模块
+==========================================
+功能：集中管理各推理引擎的线程与加速选项，按主机调优时无需修改代码
+- TFLite：每个解释器的线程数、是否使用XNNPACK委托、解释器池大小
+- MediaPipe Hands：模型复杂度、检测/跟踪置信度
+- OpenCV：线程池大小（cv.setNumThreads）
+来源优先级：默认值 < 配置文件 < 环境变量（GESTURE_<名称大写>）< 命令行参数，
+effective() 返回每项的生效值与来源
+"""
+
+import os
+
+import cv2 as cv
+
+# 名称 -> (类型, 默认值, 命令行参数, 说明)
+RUNTIME_OPTIONS = {
+    'tflite_threads': (int, 1, '--tflite_threads', 'TFLite每个解释器的推理线程数'),
+    'tflite_xnnpack': (bool, True, '--tflite_xnnpack', 'TFLite是否使用XNNPACK委托（on/off）'),
+    'interpreter_pool_size': (int, 1, '--interpreter_pool_size', '每个模型预先分配的TFLite解释器数量'),
+    'mp_model_complexity': (int, 1, '--model_complexity', 'MediaPipe Hands模型复杂度（0更快，1更准）'),
+    'mp_min_detection_confidence': (float, 0.7, '--min_detection_confidence', 'MediaPipe检测置信度阈值'),
+    'mp_min_tracking_confidence': (float, 0.5, '--min_tracking_confidence', 'MediaPipe跟踪置信度阈值'),
+    'opencv_threads': (int, None, '--opencv_threads', 'OpenCV线程池大小（不设置时保持OpenCV默认，0为关闭多线程）'),
+}
+
+ENV_PREFIX = 'GESTURE_'
+
+
+def parse_bool(value):
+    """解析布尔配置（1/0、true/false、on/off、yes/no）"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'on', 'yes'):
+        return True
+    if text in ('0', 'false', 'off', 'no'):
+        return False
+    raise ValueError(f'无法解析的布尔值: {value}')
+
+
+class RuntimeConfig(object):
+    """
+    运行时配置（各推理引擎的线程与加速选项）
+
+    使用示例:
+        runtime = RuntimeConfig().update_from_env().update_from_args(args).apply()
+        hands = mp_hands.Hands(max_num_hands=1, **runtime.hands_options())
+        classifier = KeyPointClassifier(**runtime.classifier_options())
+    """
+
+    def __init__(self, **defaults):
+        """
+        参数:
+            **defaults: 覆盖内置默认值（如后端默认使用更大的解释器池），来源仍记为 default
+        """
+        self._values = {name: spec[1] for name, spec in RUNTIME_OPTIONS.items()}
+        self._sources = {name: 'default' for name in RUNTIME_OPTIONS}
+        self.update(defaults, 'default')
+
+    def __getitem__(self, name):
+        return self._values[name]
+
+    def update(self, values, source):
+        """
+        按名称更新配置，值为None的项忽略
+
+        参数:
+            values (dict): {名称: 值}
+            source (str): 来源名称（config / env / args 等），用于 effective() 报告
+
+        返回:
+            RuntimeConfig: self（便于链式调用）
+        """
+        for name, value in (values or {}).items():
+            if value is None:
+                continue
+            if name not in RUNTIME_OPTIONS:
+                raise ValueError(f'未知的运行时配置项: {name}，可选 {", ".join(RUNTIME_OPTIONS)}')
+            self._values[name] = self._coerce(name, value)
+            self._sources[name] = source
+        return self
+
+    def update_from_env(self, environ=None):
+        """读取环境变量 GESTURE_<名称大写>（如 GESTURE_TFLITE_THREADS）"""
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name in RUNTIME_OPTIONS:
+            value = environ.get(ENV_PREFIX + name.upper())
+            if value not in (None, ''):
+                values[name] = value
+        return self.update(values, 'env')
+
+    def update_from_args(self, args):
+        """读取 add_arguments() 添加的命令行参数（未指定的参数为None，不覆盖）"""
+        return self.update({name: getattr(args, name, None) for name in RUNTIME_OPTIONS}, 'args')
+
+    @staticmethod
+    def add_arguments(parser):
+        """向 argparse 解析器添加全部运行时配置参数（默认值为None，由配置层决定）"""
+        group = parser.add_argument_group('runtime')
+        for name, (value_type, default, flag, help_text) in RUNTIME_OPTIONS.items():
+            group.add_argument(flag, dest=name, type=parse_bool if value_type is bool else value_type,
+                               default=None, help=f'{help_text}（默认 {default}）')
+        return parser
+
+    def apply(self):
+        """应用进程级设置（OpenCV线程池），返回self"""
+        if self._values['opencv_threads'] is not None:
+            cv.setNumThreads(self._values['opencv_threads'])
+        return self
+
+    def hands_options(self):
+        """MediaPipe Hands 的构造参数"""
+        return {
+            'model_complexity': self._values['mp_model_complexity'],
+            'min_detection_confidence': self._values['mp_min_detection_confidence'],
+            'min_tracking_confidence': self._values['mp_min_tracking_confidence'],
+        }
+
+    def classifier_options(self):
+        """KeyPointClassifier / PointHistoryClassifier 的构造参数"""
+        return {
+            'num_threads': self._values['tflite_threads'],
+            'use_xnnpack': self._values['tflite_xnnpack'],
+            'pool_size': self._values['interpreter_pool_size'],
+        }
+
+    def effective(self):
+        """
+        生效的配置
+
+        返回:
+            dict: settings（每项的 value / source / env 变量名）、opencv（实际线程数）、cpu_count
+        """
+        return {
+            'settings': {
+                name: {'value': self._values[name], 'source': self._sources[name],
+                       'env': ENV_PREFIX + name.upper()}
+                for name in RUNTIME_OPTIONS
+            },
+            'opencv': {'num_threads': cv.getNumThreads(), 'optimized': cv.useOptimized()},
+            'cpu_count': os.cpu_count(),
+        }
+
+    def describe(self):
+        """单行描述（启动时打印）"""
+        items = [f'{name}={self._values[name]}' + ('' if self._sources[name] == 'default' else f'({self._sources[name]})')
+                 for name in RUNTIME_OPTIONS]
+        return ' '.join(items) + f' opencv_effective_threads={cv.getNumThreads()}'
+
+    @staticmethod
+    def _coerce(name, value):
+        value_type = RUNTIME_OPTIONS[name][0]
+        try:
+            value = parse_bool(value) if value_type is bool else value_type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'运行时配置项 {name} 的值无效: {value!r}')
+        if name in ('tflite_threads', 'interpreter_pool_size') and value < 1:
+            raise ValueError(f'{name} 至少为1')
+        if name == 'mp_model_complexity' and value not in (0, 1):
+            raise ValueError('mp_model_complexity 只能为0或1')
+        return value
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+关键点平滑模块
+==========================================
+功能：对每帧的全部关键点整体做时间域平滑（NumPy数组运算，状态保持为浮点数）
+- one_euro：One Euro 滤波，静止时截止频率低（抑制抖动），快速移动时截止频率随速度升高（减少延迟）
+- ema：固定系数的指数移动平均
+- none：不平滑
+使用真实帧时间戳计算时间间隔，每个会话持有独立的滤波器实例
+"""
+
+import math
+
+import numpy as np
+
+SMOOTHING_METHODS = ('one_euro', 'ema', 'none')
+
+
+class LandmarkSmoother(object):
+    """
+    关键点平滑器（输入建议使用归一化坐标，参数与图像分辨率无关）
+
+    使用示例:
+        smoother = LandmarkSmoother('one_euro', min_cutoff=1.0, beta=5.0)
+        smoothed = smoother(landmarks[:, :2], timestamp)
+    """
+
+    def __init__(
+        self,
+        method='one_euro',
+        min_cutoff=1.0,     # One Euro：静止时的截止频率（Hz），越小越平滑
+        beta=5.0,           # One Euro：截止频率随速度（归一化坐标/秒）的增长系数，越大快速移动时延迟越低
+        d_cutoff=1.0,       # One Euro：速度估计的截止频率（Hz）
+        alpha=0.5,          # EMA：平滑系数，1为不平滑
+        default_fps=30.0,   # 没有有效时间戳时假定的帧率
+        max_gap=0.5,        # 两帧间隔超过该值（秒）时重新开始，避免手重新出现时被拉回旧位置
+    ):
+        if method not in SMOOTHING_METHODS:
+            raise ValueError(f'未知平滑方式: {method}，可选 {", ".join(SMOOTHING_METHODS)}')
+        self.method = method
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.alpha = alpha
+        self.default_fps = default_fps
+        self.max_gap = max_gap
+        self.reset()
+
+    def spawn(self):
+        """创建参数相同、状态独立的新实例（用于新会话）"""
+        return LandmarkSmoother(self.method, self.min_cutoff, self.beta, self.d_cutoff,
+                                self.alpha, self.default_fps, self.max_gap)
+
+    def reset(self):
+        self._value = None
+        self._speed = None
+        self._timestamp = None
+
+    def __call__(self, points, timestamp=None):
+        """
+        平滑一帧关键点
+
+        参数:
+            points: (N, D) 当前帧关键点
+            timestamp (float): 帧时间戳（秒），为None时按 default_fps 推算
+
+        返回:
+            np.ndarray: 平滑后的关键点 (N, D) float64（每次调用返回新数组，请勿原地修改）
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if self.method == 'none':
+            return points
+
+        dt = None
+        if timestamp is not None and self._timestamp is not None:
+            dt = timestamp - self._timestamp
+        if self._value is None or self._value.shape != points.shape or (dt is not None and dt > self.max_gap):
+            self._value = points.copy()
+            self._speed = np.zeros_like(self._value)
+            self._timestamp = timestamp
+            return self._value
+        if dt is None or dt <= 0:
+            dt = 1.0 / self.default_fps
+        self._timestamp = timestamp
+
+        delta = points - self._value
+        if self.method == 'ema':
+            delta *= self.alpha
+            self._value = self._value + delta
+            return self._value
+
+        # One Euro（逐坐标）：先平滑速度，再按速度确定截止频率
+        # 平滑系数 alpha = 1 / (1 + tau / dt) = w / (w + 1)，其中 w = 2π·dt·cutoff
+        speed_alpha = self._smoothing_factor(self.d_cutoff, dt)
+        self._speed *= 1.0 - speed_alpha
+        self._speed += (speed_alpha / dt) * np.abs(delta)
+        scale = 2 * math.pi * dt
+        weight = (scale * self.beta) * self._speed
+        weight += scale * self.min_cutoff
+        weight /= weight + 1.0
+        weight *= delta
+        self._value = self._value + weight
+        return self._value
+
+    @staticmethod
+    def _smoothing_factor(cutoff, dt):
+        """alpha = 1 / (1 + tau / dt)，tau = 1 / (2π·cutoff)"""
+        return 1.0 / (1.0 + 1.0 / (2 * math.pi * dt * cutoff))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+时间线追踪模块
+==========================================
+功能：将每帧各处理阶段的开始/结束时间记录到内存环形缓冲区，
+并导出为 Chrome Trace JSON（可在 chrome://tracing 或 https://ui.perfetto.dev 中打开），
+用于查看尾延迟尖峰时各帧的采集、检测、分类、绘制如何在线程间交错
+
+记录一个事件只是一次元组写入（无锁，依赖GIL下 itertools.count 与列表赋值的原子性），
+关闭时 span() 返回共享的空上下文
+"""
+
+import contextlib
+import itertools
+import json
+import os
+import threading
+import time
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span(object):
+    """单个阶段的计时上下文"""
+
+    __slots__ = ('_tracer', '_name', '_frame', '_start')
+
+    def __init__(self, tracer, name, frame):
+        self._tracer = tracer
+        self._name = name
+        self._frame = frame
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._tracer.add(self._name, self._start, time.perf_counter_ns(), self._frame)
+        return False
+
+
+class TraceRecorder(object):
+    """
+    环形缓冲区时间线记录器（缓冲区满后覆盖最旧的事件）
+
+    使用示例:
+        tracer = TraceRecorder()
+        frame = tracer.next_frame()
+        with tracer.span('detect', frame):
+            results = hands.process(image)
+        tracer.dump('trace.json')
+    """
+
+    def __init__(self, capacity=65536, enabled=True):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._events = [None] * capacity
+        self._slots = itertools.count()
+        self._frames = itertools.count()
+        self._thread_names = {}
+        self._written = 0
+
+    def next_frame(self):
+        """分配一个帧编号（线程安全）"""
+        return next(self._frames)
+
+    def span(self, name, frame=None):
+        """返回阶段计时上下文，用于 with 语句"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, frame)
+
+    def add(self, name, start_ns, end_ns, frame=None):
+        """
+        记录一个完整事件
+
+        参数:
+            name (str): 阶段名称
+            start_ns, end_ns (int): time.perf_counter_ns() 时间戳
+            frame (int): 帧编号，可选
+        """
+        if not self.enabled:
+            return
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_names:
+            self._thread_names[thread_id] = threading.current_thread().name
+        slot = next(self._slots)
+        self._events[slot % self.capacity] = (name, start_ns, end_ns - start_ns, thread_id, frame)
+        self._written = slot + 1
+
+    def clear(self):
+        self._events = [None] * self.capacity
+        self._slots = itertools.count()
+        self._written = 0
+
+    @property
+    def event_count(self):
+        return min(self._written, self.capacity)
+
+    @property
+    def dropped_count(self):
+        """因缓冲区已满被覆盖的事件数"""
+        return max(0, self._written - self.capacity)
+
+    def events(self):
+        """按开始时间排序的事件列表 [(name, start_ns, duration_ns, thread_id, frame), ...]"""
+        events = [event for event in list(self._events) if event is not None]
+        events.sort(key=lambda event: event[1])
+        return events
+
+    def to_chrome_trace(self):
+        """
+        导出 Chrome Trace Event 格式
+
+        返回:
+            dict: {'traceEvents': [...], 'displayTimeUnit': 'ms', 'otherData': {...}}
+        """
+        events = self.events()
+        pid = os.getpid()
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id, 'args': {'name': name}}
+            for thread_id, name in list(self._thread_names.items())
+        ]
+        origin = events[0][1] if events else 0
+        for name, start_ns, duration_ns, thread_id, frame in events:
+            event = {
+                'name': name,
+                'cat': 'gesture',
+                'ph': 'X',
+                'ts': (start_ns - origin) / 1000.0,
+                'dur': duration_ns / 1000.0,
+                'pid': pid,
+                'tid': thread_id,
+            }
+            if frame is not None:
+                event['args'] = {'frame': frame}
+            trace_events.append(event)
+        return {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'event_count': len(events), 'dropped_count': self.dropped_count},
+        }
+
+    def dump(self, path):
+        """
+        写出 Chrome Trace JSON 文件
+
+        返回:
+            int: 写出的事件数
+        """
+        trace = self.to_chrome_trace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        return trace['otherData']['event_count']
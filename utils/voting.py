@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+==========================================
+置信度加权投票模块
+==========================================
+功能：代替逐帧ID的多数投票（Counter），对最近若干帧的类别概率做置信度加权累加
+- 每帧的票为 置信度 × 概率向量，模糊的帧影响小
+- 窗口内累加和随环形缓冲区增量更新
+- 提前确认：同一类别连续帧的累计置信度达到阈值时立即切换输出，不必等待窗口内的多数
+"""
+
+import numpy as np
+
+
+class ConfidenceVoter(object):
+    """
+    置信度加权投票器（每个会话一个实例）
+
+    使用示例:
+        voter = ConfidenceVoter(window=16, commit_threshold=2.5)
+        class_id, confidence = voter.update(scores)
+    """
+
+    def __init__(self, window=16, commit_threshold=2.5):
+        """
+        参数:
+            window (int): 投票窗口（帧）
+            commit_threshold (float): 连续同类帧的累计置信度达到该值时立即确认该类别，
+                                      为0或None时只使用窗口内的加权多数
+        """
+        self.window = window
+        self.commit_threshold = commit_threshold
+        self._votes = None
+        self.reset()
+
+    def spawn(self):
+        """创建参数相同、状态独立的新实例（用于新会话）"""
+        return ConfidenceVoter(self.window, self.commit_threshold)
+
+    def reset(self):
+        self._votes = None
+        self._weights = np.zeros(self.window, dtype=np.float64)
+        self._totals = None
+        self._weight_total = 0.0
+        self._pos = 0
+        self._streak_class = -1
+        self._streak_length = 0
+        self._streak_confidence = 0.0
+        self._current = (-1, 0.0)
+
+    @property
+    def scores(self):
+        """窗口内按置信度加权平均的类别概率（尚无数据时为None）"""
+        if self._totals is None or self._weight_total <= 0:
+            return None
+        return self._totals / self._weight_total
+
+    def update(self, scores):
+        """
+        加入一帧的类别概率
+
+        参数:
+            scores: 类别概率 (C,)
+
+        返回:
+            tuple: (投票后的类别编号, 该类别的加权平均概率)
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        if self._votes is None or self._votes.shape[1] != len(scores):
+            self._votes = np.zeros((self.window, len(scores)), dtype=np.float64)
+            self._totals = np.zeros(len(scores), dtype=np.float64)
+
+        best = int(np.argmax(scores))
+        confidence = float(scores[best])
+
+        # 替换窗口中最旧的一帧
+        pos = self._pos
+        self._totals -= self._votes[pos]
+        self._weight_total -= self._weights[pos]
+        np.multiply(scores, confidence, out=self._votes[pos])
+        self._weights[pos] = confidence
+        self._totals += self._votes[pos]
+        self._weight_total += confidence
+        self._pos = (pos + 1) % self.window
+        if self._pos == 0:
+            # 每绕一圈重新求和一次，消除浮点累加误差
+            self._totals = self._votes.sum(axis=0)
+            self._weight_total = float(self._weights.sum())
+
+        if best == self._streak_class:
+            self._streak_length += 1
+            self._streak_confidence += confidence
+        else:
+            self._streak_class, self._streak_length, self._streak_confidence = best, 1, confidence
+
+        if (self.commit_threshold and best != self._current[0]
+                and self._streak_confidence >= self.commit_threshold):
+            # 提前确认：丢弃连续段之前的票，窗口内的加权多数立即变为新类别
+            self._keep_latest(min(self._streak_length, self.window))
+
+        mean_scores = self._totals / self._weight_total if self._weight_total > 0 else self._totals
+        best = int(np.argmax(mean_scores))
+        self._current = (best, float(mean_scores[best]))
+        return self._current
+
+    def _keep_latest(self, count):
+        """只保留最近 count 帧的票"""
+        keep = (self._pos - 1 - np.arange(count)) % self.window
+        mask = np.zeros(self.window, dtype=bool)
+        mask[keep] = True
+        self._votes[~mask] = 0
+        self._weights[~mask] = 0
+        self._totals = self._votes.sum(axis=0)
+        self._weight_total = float(self._weights.sum())